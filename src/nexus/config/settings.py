@@ -1,6 +1,7 @@
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Set
 
 def get_project_root() -> Path:
     """Find project root, with Docker-aware fallback."""
@@ -23,65 +24,84 @@ def get_project_root() -> Path:
     
     raise RuntimeError("Project root not found")
 
+# Directories already created by this process
+_dirs_made: Set[Path] = set()
+
+
 class Settings:
     """Configuration settings with Docker support."""
     
     def __init__(self):
+        # Snapshot the environment once instead of hitting os.environ per key
+        env = os.environ.copy()
+        
         # Base paths with environment variable override
-        self.BASE_DIR = Path(os.environ.get("PROJECT_ROOT", get_project_root()))
+        self.BASE_DIR = Path(env.get("PROJECT_ROOT") or get_project_root())
         
         # Data directory configuration
-        self.DATA_DIR = Path(os.environ.get("DATA_DIR", self.BASE_DIR / "data"))
-        self.CONFIG_DIR = Path(os.environ.get("CONFIG_DIR", self.BASE_DIR / "config"))
-        
-        # Ensure directories exist
-        self.DATA_DIR.mkdir(parents=True, exist_ok=True)
-        self.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        self.DATA_DIR = Path(env.get("DATA_DIR", self.BASE_DIR / "data"))
+        self.CONFIG_DIR = Path(env.get("CONFIG_DIR", self.BASE_DIR / "config"))
         
         # Data paths
         self.raw_data_path = self.DATA_DIR / "raw"
         self.processed_data_path = self.DATA_DIR / "processed"
         
-        # Ensure data directories exist
-        self.raw_data_path.mkdir(parents=True, exist_ok=True)
-        self.processed_data_path.mkdir(parents=True, exist_ok=True)
-        
         # File names with environment variable override
-        self.excel_file = os.environ.get("EXCEL_FILE", "global_05212025.xlsx")
-        self.database_name = os.environ.get("DATABASE_NAME", "forest.db")
+        self.excel_file = env.get("EXCEL_FILE", "global_05212025.xlsx")
+        self.database_name = env.get("DATABASE_NAME", "forest.db")
         
         # Database path - can be overridden entirely via env var
-        db_path_env = os.environ.get("DATABASE_PATH")
+        db_path_env = env.get("DATABASE_PATH")
         if db_path_env:
             self.sqlite_db_path = Path(db_path_env)
         else:
             self.sqlite_db_path = self.processed_data_path / self.database_name
         
-        # Ensure database directory exists
-        self.sqlite_db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Resolve once; resolve() walks every parent directory
+        self._abs_db_path = str(self.sqlite_db_path.resolve())
         
         # Metadata paths
         self.semantic_metadata_path = self.CONFIG_DIR / "semantic"
         self.runtime_metadata_path = self.CONFIG_DIR / "runtime"
         
-        # Ensure metadata directories exist
-        self.semantic_metadata_path.mkdir(parents=True, exist_ok=True)
-        self.runtime_metadata_path.mkdir(parents=True, exist_ok=True)
+        # Ensure directories exist
+        self._ensure_directories()
         
         # Data validation thresholds
-        self.min_completeness_score = float(os.environ.get("MIN_COMPLETENESS_SCORE", "0.70"))
-        self.max_null_percentage = float(os.environ.get("MAX_NULL_PERCENTAGE", "0.40"))
+        self.min_completeness_score = float(env.get("MIN_COMPLETENESS_SCORE", "0.70"))
+        self.max_null_percentage = float(env.get("MAX_NULL_PERCENTAGE", "0.40"))
         
         # Logging
-        self.log_level = os.environ.get("LOG_LEVEL", "INFO")
+        self.log_level = env.get("LOG_LEVEL", "INFO")
         
         # Server configuration
-        self.mcp_host = os.environ.get("MCP_HOST", "0.0.0.0")
-        self.mcp_port = int(os.environ.get("MCP_PORT", "8007"))
+        self.mcp_host = env.get("MCP_HOST", "0.0.0.0")
+        self.mcp_port = int(env.get("MCP_PORT", "8007"))
         
+    def _ensure_directories(self):
+        """Create data, database and metadata directories (once per process)."""
+        dirs = {
+            self.DATA_DIR,
+            self.CONFIG_DIR,
+            self.raw_data_path,
+            self.processed_data_path,
+            self.sqlite_db_path.parent,
+            self.semantic_metadata_path,
+            self.runtime_metadata_path,
+        } - _dirs_made
+        
+        # mkdir(parents=True) on a leaf also creates its ancestors, so skip
+        # any directory that is a parent of another one in the set
+        leaves = {d for d in dirs if not any(d in other.parents for other in dirs)}
+        
+        for directory in leaves:
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        _dirs_made.update(dirs)
+    
     def get_absolute_db_path(self) -> str:
         """Return absolute database path as string."""
-        return str(self.sqlite_db_path.resolve())
+        return self._abs_db_path
     
     def validate_paths(self) -> bool:
         """Validate that critical paths exist."""
@@ -111,10 +131,21 @@ class Settings:
   Log Level: {self.log_level}
   MCP Server: {self.mcp_host}:{self.mcp_port}"""
 
-# Initialize settings
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance, created on first use."""
+    instance = Settings()
+    
+    # Optional: Print configuration in debug mode
+    if os.environ.get("DEBUG") == "true":
+        print(instance)
+        instance.validate_paths()
+    
+    return instance
+
 
-# Optional: Print configuration in debug mode
-if os.environ.get("DEBUG") == "true":
-    print(settings)
-    settings.validate_paths()
\ No newline at end of file
+def __getattr__(name: str):
+    """Resolve the legacy module-level ``settings`` lazily."""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,11 @@
+-- Generated by tools/build_schema_sql.py; do not edit.
+BEGIN;
+CREATE TABLE IF NOT EXISTS fact_tree_cover_loss ("country" TEXT NOT NULL, "year" INTEGER NOT NULL, "threshold" INTEGER NOT NULL, "tree_cover_loss_ha" REAL, "extent_2000_ha" REAL, "extent_2010_ha" REAL, "gain_2000-2012_ha" REAL, "area_ha" REAL, "loss_rate_pct" REAL, "data_quality_flag" TEXT, PRIMARY KEY ("country", "year", "threshold"));
+CREATE TABLE IF NOT EXISTS fact_primary_forest ("country" TEXT NOT NULL, "year" INTEGER NOT NULL, "threshold" INTEGER DEFAULT 30, "primary_forest_loss_ha" REAL, "is_tropical" BOOLEAN, "loss_status" TEXT, PRIMARY KEY ("country", "year")) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fact_carbon ("country" TEXT NOT NULL, "year" INTEGER NOT NULL, "threshold" INTEGER NOT NULL CHECK (threshold IN (30,50,75)), "carbon_emissions_mg_co2e" REAL, "carbon_emissions_annual_avg" REAL, "carbon_removals_annual_avg" REAL, "carbon_net_flux_annual_avg" REAL, "carbon_density_mg_c_ha" REAL, "carbon_flux_status" TEXT, "carbon_role" TEXT GENERATED ALWAYS AS (CASE WHEN carbon_net_flux_annual_avg < 0 THEN 'Carbon Sink' WHEN carbon_net_flux_annual_avg > 0 THEN 'Carbon Source' ELSE 'Carbon Neutral' END) STORED, PRIMARY KEY ("country", "year", "threshold"));
+CREATE TABLE IF NOT EXISTS dim_location ("country" TEXT, "region" TEXT, "subregion" TEXT, "is_tropical" BOOLEAN, "iso_code" TEXT, PRIMARY KEY ("country")) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS dim_time ("year" INTEGER, "decade" TEXT, "period" TEXT, PRIMARY KEY ("year")) WITHOUT ROWID;
+CREATE VIEW IF NOT EXISTS v_primary_forest_percentage AS SELECT t.country, t.year, t.tree_cover_loss_ha, p.primary_forest_loss_ha, CASE WHEN t.tree_cover_loss_ha > 0 THEN ROUND((p.primary_forest_loss_ha / t.tree_cover_loss_ha) * 100, 2) ELSE NULL END as primary_percentage FROM fact_tree_cover_loss t LEFT JOIN fact_primary_forest p ON t.country = p.country AND t.year = p.year WHERE t.threshold = 30;
+CREATE VIEW IF NOT EXISTS v_carbon_intensity AS SELECT t.country, t.year, t.threshold, t.tree_cover_loss_ha, c.carbon_emissions_mg_co2e, CASE WHEN t.tree_cover_loss_ha > 0 THEN ROUND(c.carbon_emissions_mg_co2e / t.tree_cover_loss_ha, 2) ELSE NULL END as carbon_per_hectare FROM fact_tree_cover_loss t INNER JOIN fact_carbon c ON t.country = c.country AND t.year = c.year AND t.threshold = c.threshold;
+CREATE VIEW IF NOT EXISTS v_annual_summary AS SELECT year, COUNT(DISTINCT country) as countries_reporting, SUM(tree_cover_loss_ha) as total_loss_ha, AVG(tree_cover_loss_ha) as avg_loss_ha, MAX(tree_cover_loss_ha) as max_loss_ha FROM fact_tree_cover_loss WHERE threshold = 30 GROUP BY year;
+COMMIT;
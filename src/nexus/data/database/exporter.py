@@ -6,8 +6,9 @@ Database exporter for saving transformed data to SQLite.
 """
 import logging
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List, Tuple
 import polars as pl
 
 from nexus.config.settings import settings
@@ -15,6 +16,41 @@ from nexus.data.database.schema import SchemaManager
 
 logger = logging.getLogger(__name__)
 
+# Connection settings for bulk loading. The database is rebuilt from the
+# source Excel file on every pipeline run, so durability is traded for speed.
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA mmap_size = 268435456",
+]
+
+# Free-page ratio above which the post-export VACUUM is worth its full rewrite
+VACUUM_FREELIST_RATIO = 0.1
+
+# Rows handed to each executemany call
+EXPORT_BATCH_SIZE = 10000
+
+
+@lru_cache(maxsize=32)
+def build_insert_sql(table_name: str, columns: Tuple[str, ...]) -> str:
+    """Build (and memoize) the parameterized INSERT for a table's columns."""
+    quoted_columns = ", ".join(f'"{col}"' for col in columns)
+    placeholders = ",".join("?" * len(columns))
+    return f"INSERT INTO {table_name} ({quoted_columns}) VALUES ({placeholders})"
+
+
+def iter_row_batches(df: pl.DataFrame, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    """
+    Yield a DataFrame's rows as lists of tuples, one batch at a time.
+    
+    Only the current batch is ever converted to Python objects, so memory
+    stays bounded regardless of the frame's height.
+    """
+    for chunk in df.iter_slices(n_rows=batch_size):
+        yield chunk.rows()
+
 
 class DatabaseExporter:
     """Export transformed data to SQLite database."""
@@ -28,6 +64,21 @@ class DatabaseExporter:
         """
         self.db_path = db_path or settings.sqlite_db_path
         self.schema_manager = SchemaManager(self.db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        
+    def _get_conn(self) -> sqlite3.Connection:
+        """Return the shared connection, opening it on first use."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            self._apply_bulk_load_pragmas(self._conn)
+        return self._conn
+        
+    def close(self):
+        """Close the shared connection and any the schema manager opened."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self.schema_manager.close()
         
     def initialize_database(self, drop_existing: bool = False):
         """
@@ -39,63 +90,59 @@ class DatabaseExporter:
         # Ensure directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        connection = sqlite3.connect(self.db_path)
-        try:
-            if drop_existing:
-                logger.warning("Dropping existing tables")
-                self.schema_manager.drop_all_tables(connection)
-                
-            logger.info("Creating database schema")
-            self.schema_manager.create_all_tables(connection)
-            
-            # ✅ ADD THIS: Final commit to ensure everything is persisted
-            connection.commit()
-            logger.info("Database schema created and committed successfully")
+        connection = self._get_conn()
+        
+        if drop_existing:
+            logger.warning("Dropping existing tables")
+            self.schema_manager.drop_all_tables(connection)
             
-        finally:
-            connection.close()
+        logger.info("Creating database schema")
+        # Fact table indexes are built by export_all_tables after the load
+        self.schema_manager.create_all_tables(connection, defer_indexes=True)
+        
+        # Schema optimization sets general-purpose pragmas; restore bulk load ones
+        self._apply_bulk_load_pragmas(connection)
+        
+        # ✅ ADD THIS: Final commit to ensure everything is persisted
+        connection.commit()
+        logger.info("Database schema created and committed successfully")
+        
     def export_dataframe(
     self, 
     df: pl.DataFrame, 
     table_name: str,
-    if_exists: str = "replace"
+    if_exists: str = "replace",
+    connection: Optional[sqlite3.Connection] = None
 ) -> int:
         """Export a Polars DataFrame to SQLite table."""
         logger.info(f"Exporting {len(df)} rows to {table_name}")
         
-        connection = sqlite3.connect(self.db_path)
-        cursor = connection.cursor()
+        connection = connection or self._get_conn()
         
         try:
+            # Single transaction for the delete and all insert batches
+            connection.execute("BEGIN IMMEDIATE")
+            
             # ✅ FIXED: Delete data instead of dropping table
             if if_exists == "replace":
-                cursor.execute(f"DELETE FROM {table_name}")  # ← Keep table structure!
+                connection.execute(f"DELETE FROM {table_name}")  # ← Keep table structure!
             
             # ✅ REMOVED: Don't recreate table!
-            # The table (with indexes) already exists from initialize_database()
-            
-            # Get columns and quote them for SQL
-            columns = df.columns
-            quoted_columns = [f'"{col}"' for col in columns]
+            # The table already exists from initialize_database()
             
             # Insert data
-            placeholders = ','.join(['?' for _ in columns])
-            insert_sql = f"INSERT INTO {table_name} ({', '.join(quoted_columns)}) VALUES ({placeholders})"
-            
-            # Convert to list of tuples for SQLite
-            data_tuples = list(df.iter_rows())
+            insert_sql = build_insert_sql(table_name, tuple(df.columns))
             
-            # Insert in batches
-            batch_size = 10000
-            for i in range(0, len(data_tuples), batch_size):
-                batch = data_tuples[i:i + batch_size]
-                cursor.executemany(insert_sql, batch)
+            # Insert in batches streamed from the frame
+            for batch in iter_row_batches(df):
+                connection.executemany(insert_sql, batch)
             
             connection.commit()
             
             # Verify
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            row_count = cursor.fetchone()[0]
+            row_count = connection.execute(
+                f"SELECT COUNT(*) FROM {table_name}"
+            ).fetchone()[0]
             
             logger.info(f"Successfully exported {row_count} rows to {table_name}")
             return row_count
@@ -106,8 +153,10 @@ class DatabaseExporter:
             connection.rollback()
             raise
             
-        finally:
-            connection.close()
+    def _apply_bulk_load_pragmas(self, connection: sqlite3.Connection):
+        """Configure a connection for fast bulk inserts."""
+        for pragma in BULK_LOAD_PRAGMAS:
+            connection.execute(pragma)
             
     def export_all_tables(
     self,
@@ -129,229 +178,296 @@ class DatabaseExporter:
             Dictionary with row counts for each table
         """
         results = {}
+        connection = self._get_conn()
         
-        # Export fact tables
-        results["fact_tree_cover_loss"] = self.export_dataframe(
-            tree_cover_df, "fact_tree_cover_loss"
-        )
-        
-        results["fact_primary_forest"] = self.export_dataframe(
-            primary_forest_df, "fact_primary_forest"
-        )
-        
-        results["fact_carbon"] = self.export_dataframe(
-            carbon_df, "fact_carbon"
-        )
-        
-        # Export dimension tables if provided
-        if dimension_dfs:
-            for table_name, df in dimension_dfs.items():
-                results[table_name] = self.export_dataframe(df, table_name)
-        
-        # ============= ADD THIS SECTION HERE =============
-        # Verify indexes were created and persist
-        logger.info("Verifying database indexes...")
-        connection = sqlite3.connect(self.db_path)
         try:
-            cursor = connection.cursor()
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type = 'index' AND sql IS NOT NULL
-                ORDER BY name
-            """)
-            indexes = cursor.fetchall()
+            # Drop any secondary indexes left from a previous run so inserts
+            # are plain appends; they are rebuilt once over the loaded data below
+            self._drop_indexes(connection)
             
-            if not indexes:
-                logger.error("NO INDEXES FOUND - Critical failure!")
-                logger.error("Attempting to recreate indexes...")
-                # Try to recreate indexes
-                self.schema_manager.create_all_tables(connection)
-            else:
-                logger.info(f"Verified {len(indexes)} indexes exist: {[idx[0] for idx in indexes]}")
-        finally:
-            connection.close()
-        # ============= END OF ADDED SECTION =============
+            try:
+                # Export fact tables
+                results["fact_tree_cover_loss"] = self.export_dataframe(
+                    tree_cover_df, "fact_tree_cover_loss", connection=connection
+                )
+                
+                results["fact_primary_forest"] = self.export_dataframe(
+                    primary_forest_df, "fact_primary_forest", connection=connection
+                )
+                
+                results["fact_carbon"] = self.export_dataframe(
+                    carbon_df, "fact_carbon", connection=connection
+                )
                 
-        # Create indexes and optimize
-        self._post_export_optimization()
+                # Export dimension tables if provided
+                if dimension_dfs:
+                    for table_name, df in dimension_dfs.items():
+                        results[table_name] = self.export_dataframe(
+                            df, table_name, connection=connection
+                        )
+            finally:
+                self.schema_manager.finalize_indexes(connection)
+            
+            # Compact and checkpoint
+            self._post_export_optimization(connection)
+            
+        finally:
+            self.close()
         
         return results
         
-    def _post_export_optimization(self):
-        """Perform post-export optimizations."""
-        connection = sqlite3.connect(self.db_path)
-        try:
-            cursor = connection.cursor()
-            
-            # Update statistics
-            cursor.execute("ANALYZE")
+    def _drop_indexes(self, connection: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Drop all user-defined indexes ahead of a bulk load.
+        
+        Args:
+            connection: Optional database connection to use
             
-            # Vacuum to reclaim space
-            cursor.execute("VACUUM")
+        Returns:
+            Number of indexes dropped
+        """
+        connection = connection or self._get_conn()
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type = 'index' AND sql IS NOT NULL
+            ORDER BY name
+        """)
+        indexes = cursor.fetchall()
+        
+        for (name,) in indexes:
+            cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
             
-            connection.commit()
-            logger.info("Database optimized after export")
+        connection.commit()
+        logger.info(f"Dropped {len(indexes)} indexes before bulk load")
+        return len(indexes)
             
-        finally:
-            connection.close()
+    def _post_export_optimization(self, connection: Optional[sqlite3.Connection] = None):
+        """Perform post-export optimizations."""
+        connection = connection or self._get_conn()
+        cursor = connection.cursor()
+        
+        # Statistics were refreshed by SchemaManager.finalize_indexes
+        
+        # Vacuum only when enough pages are free to justify rewriting the file
+        free_pages = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        total_pages = cursor.execute("PRAGMA page_count").fetchone()[0]
+        
+        if free_pages / max(total_pages, 1) > VACUUM_FREELIST_RATIO:
+            logger.info(f"Vacuuming database ({free_pages}/{total_pages} pages free)")
+            cursor.execute("VACUUM")
+        
+        # Fold the WAL back into the main database file and truncate it
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        
+        logger.info("Database optimized after export")
             
-    def validate_export(self) -> Dict[str, Dict]:
+    def validate_export(self, connection: Optional[sqlite3.Connection] = None) -> Dict[str, Dict]:
         """
         Validate exported data.
         
+        Args:
+            connection: Optional database connection to use
+            
         Returns:
             Validation results for each table
         """
         results = {}
-        connection = sqlite3.connect(self.db_path)
+        connection = connection or self._get_conn()
         
-        try:
-            cursor = connection.cursor()
-            
-            # Check fact_tree_cover_loss
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_rows,
-                    COUNT(DISTINCT country) as countries,
-                    COUNT(DISTINCT year) as years,
-                    COUNT(DISTINCT threshold) as thresholds,
-                    SUM(CASE WHEN tree_cover_loss_ha IS NULL THEN 1 ELSE 0 END) as nulls
-                FROM fact_tree_cover_loss
-            """)
-            results["fact_tree_cover_loss"] = dict(zip(
-                ["total_rows", "countries", "years", "thresholds", "nulls"],
-                cursor.fetchone()
-            ))
-            
-            # Check fact_primary_forest
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_rows,
-                    COUNT(DISTINCT country) as countries,
-                    COUNT(DISTINCT year) as years,
-                    SUM(CASE WHEN is_tropical = 1 THEN 1 ELSE 0 END) as tropical_rows,
-                    SUM(CASE WHEN primary_forest_loss_ha IS NULL THEN 1 ELSE 0 END) as nulls
-                FROM fact_primary_forest
-            """)
-            results["fact_primary_forest"] = dict(zip(
-                ["total_rows", "countries", "years", "tropical_rows", "nulls"],
-                cursor.fetchone()
-            ))
-            
-            # Check fact_carbon
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_rows,
-                    COUNT(DISTINCT country) as countries,
-                    COUNT(DISTINCT year) as years,
-                    COUNT(DISTINCT threshold) as thresholds,
-                    SUM(CASE WHEN carbon_emissions_mg_co2e IS NULL THEN 1 ELSE 0 END) as nulls
-                FROM fact_carbon
-            """)
-            results["fact_carbon"] = dict(zip(
-                ["total_rows", "countries", "years", "thresholds", "nulls"],
-                cursor.fetchone()
-            ))
-            
-            # Add validation status
-            for table, stats in results.items():
-                if table == "fact_tree_cover_loss":
-                    expected_rows = 165 * 24 * 8  # Approximate
-                    results[table]["validation"] = "PASS" if stats["total_rows"] > 30000 else "FAIL"
-                elif table == "fact_primary_forest":
-                    expected_rows = 75 * 23  # Approximate
-                    results[table]["validation"] = "PASS" if stats["total_rows"] > 1500 else "FAIL"
-                elif table == "fact_carbon":
-                    expected_rows = 165 * 24 * 3  # Approximate
-                    results[table]["validation"] = "PASS" if stats["total_rows"] > 10000 else "FAIL"
-                    
-        finally:
-            connection.close()
-            
+        cursor = connection.cursor()
+        
+        # Check fact_tree_cover_loss
+        cursor.execute("""
+            SELECT 
+                COUNT(*) as total_rows,
+                COUNT(DISTINCT country) as countries,
+                COUNT(DISTINCT year) as years,
+                COUNT(DISTINCT threshold) as thresholds,
+                COUNT(*) - COUNT(tree_cover_loss_ha) as nulls
+            FROM fact_tree_cover_loss
+        """)
+        results["fact_tree_cover_loss"] = dict(zip(
+            ["total_rows", "countries", "years", "thresholds", "nulls"],
+            cursor.fetchone()
+        ))
+        
+        # Check fact_primary_forest
+        cursor.execute("""
+            SELECT 
+                COUNT(*) as total_rows,
+                COUNT(DISTINCT country) as countries,
+                COUNT(DISTINCT year) as years,
+                COUNT(*) FILTER (WHERE is_tropical = 1) as tropical_rows,
+                COUNT(*) - COUNT(primary_forest_loss_ha) as nulls
+            FROM fact_primary_forest
+        """)
+        results["fact_primary_forest"] = dict(zip(
+            ["total_rows", "countries", "years", "tropical_rows", "nulls"],
+            cursor.fetchone()
+        ))
+        
+        # Check fact_carbon
+        cursor.execute("""
+            SELECT 
+                COUNT(*) as total_rows,
+                COUNT(DISTINCT country) as countries,
+                COUNT(DISTINCT year) as years,
+                COUNT(DISTINCT threshold) as thresholds,
+                COUNT(*) - COUNT(carbon_emissions_mg_co2e) as nulls
+            FROM fact_carbon
+        """)
+        results["fact_carbon"] = dict(zip(
+            ["total_rows", "countries", "years", "thresholds", "nulls"],
+            cursor.fetchone()
+        ))
+        
+        # Add validation status
+        for table, stats in results.items():
+            if table == "fact_tree_cover_loss":
+                expected_rows = 165 * 24 * 8  # Approximate
+                results[table]["validation"] = "PASS" if stats["total_rows"] > 30000 else "FAIL"
+            elif table == "fact_primary_forest":
+                expected_rows = 75 * 23  # Approximate
+                results[table]["validation"] = "PASS" if stats["total_rows"] > 1500 else "FAIL"
+            elif table == "fact_carbon":
+                expected_rows = 165 * 24 * 3  # Approximate
+                results[table]["validation"] = "PASS" if stats["total_rows"] > 10000 else "FAIL"
+
         return results
         
-    def create_dimension_tables(self) -> Dict[str, pl.DataFrame]:
+    def create_dimension_tables(
+        self,
+        connection: Optional[sqlite3.Connection] = None,
+        fact_dfs: Optional[Dict[str, pl.DataFrame]] = None
+    ) -> Dict[str, pl.DataFrame]:
         """
         Create dimension tables from fact tables.
         
+        Args:
+            connection: Optional database connection to use
+            fact_dfs: Optional in-memory fact tables keyed by table name.
+                When given, dimensions are derived from these frames
+                instead of scanning the exported tables.
+            
         Returns:
             Dictionary of dimension DataFrames
         """
-        connection = sqlite3.connect(self.db_path)
+        connection = connection or self._get_conn()
         dimensions = {}
         
-        try:
-            # Create location dimension
-            query = """
-                SELECT DISTINCT 
-                    country,
-                    MAX(CASE WHEN is_tropical = 1 THEN 1 ELSE 0 END) as is_tropical
-                FROM (
-                    SELECT country, 0 as is_tropical FROM fact_tree_cover_loss
-                    UNION ALL
-                    SELECT country, is_tropical FROM fact_primary_forest
+        if fact_dfs is not None:
+            countries, years = self._dimension_sources_from_frames(fact_dfs)
+        else:
+            countries, years = self._dimension_sources_from_db(connection)
+        
+        if not countries.is_empty():
+            dimensions["dim_location"] = self._build_location_dimension(countries)
+        
+        if not years.is_empty():
+            dimensions["dim_time"] = self._build_time_dimension(years)
+        
+        # Export dimension tables
+        for table_name, df in dimensions.items():
+            self.export_dataframe(df, table_name, if_exists="replace", connection=connection)
+
+        return dimensions
+        
+    @staticmethod
+    def _dimension_sources_from_frames(
+        fact_dfs: Dict[str, pl.DataFrame]
+    ) -> Tuple[pl.DataFrame, pl.Series]:
+        """Collect (country, is_tropical) pairs and years from in-memory facts."""
+        country_frames = []
+        if "fact_tree_cover_loss" in fact_dfs:
+            country_frames.append(
+                fact_dfs["fact_tree_cover_loss"].select(
+                    pl.col("country"),
+                    pl.lit(0, dtype=pl.Int64).alias("is_tropical")
                 )
-                GROUP BY country
-                ORDER BY country
-            """
-            cursor = connection.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            # Convert to Polars DataFrame
-            if rows:
-                countries = [row[0] for row in rows]
-                is_tropical = [row[1] for row in rows]
-                dimensions["dim_location"] = pl.DataFrame({
-                    "country": countries,
-                    "is_tropical": is_tropical
-                })
-            
-            # Create time dimension
-            query = """
-                SELECT DISTINCT 
-                    year,
-                    CASE 
-                        WHEN year BETWEEN 2000 AND 2009 THEN '2000s'
-                        WHEN year BETWEEN 2010 AND 2019 THEN '2010s'
-                        WHEN year BETWEEN 2020 AND 2029 THEN '2020s'
-                    END as decade,
-                    CASE 
-                        WHEN year <= 2005 THEN 'Early 2000s'
-                        WHEN year <= 2010 THEN 'Late 2000s'
-                        WHEN year <= 2015 THEN 'Early 2010s'
-                        WHEN year <= 2020 THEN 'Late 2010s'
-                        ELSE 'Early 2020s'
-                    END as period
-                FROM (
-                    SELECT DISTINCT year FROM fact_tree_cover_loss
-                    UNION
-                    SELECT DISTINCT year FROM fact_primary_forest
-                    UNION
-                    SELECT DISTINCT year FROM fact_carbon
+            )
+        if "fact_primary_forest" in fact_dfs:
+            country_frames.append(
+                fact_dfs["fact_primary_forest"].select(
+                    pl.col("country"),
+                    pl.col("is_tropical").cast(pl.Int64)
                 )
-                ORDER BY year
+            )
+        
+        countries = (
+            pl.concat(country_frames)
+            if country_frames
+            else pl.DataFrame(schema={"country": pl.Utf8, "is_tropical": pl.Int64})
+        )
+        year_series = [df["year"].cast(pl.Int64) for df in fact_dfs.values()]
+        years = (
+            pl.concat(year_series).unique()
+            if year_series
+            else pl.Series("year", [], dtype=pl.Int64)
+        )
+        
+        return countries, years
+        
+    @staticmethod
+    def _dimension_sources_from_db(
+        connection: sqlite3.Connection
+    ) -> Tuple[pl.DataFrame, pl.Series]:
+        """Read (country, is_tropical) pairs and distinct years from the fact tables."""
+        # Tropical flag is only known from primary forest
+        countries = pl.read_database(
             """
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            if rows:
-                years = [row[0] for row in rows]
-                decades = [row[1] for row in rows]
-                periods = [row[2] for row in rows]
-                dimensions["dim_time"] = pl.DataFrame({
-                    "year": years,
-                    "decade": decades,
-                    "period": periods
-                })
-            
-            # Export dimension tables
-            for table_name, df in dimensions.items():
-                self.export_dataframe(df, table_name, if_exists="replace")
-                
-        finally:
-            connection.close()
-            
-        return dimensions
+            SELECT country, 0 as is_tropical FROM fact_tree_cover_loss
+            UNION ALL
+            SELECT country, is_tropical FROM fact_primary_forest
+            """,
+            connection,
+            schema_overrides={"country": pl.Utf8, "is_tropical": pl.Int64}
+        )
+        
+        years = pl.read_database(
+            """
+            SELECT year FROM fact_tree_cover_loss
+            UNION
+            SELECT year FROM fact_primary_forest
+            UNION
+            SELECT year FROM fact_carbon
+            """,
+            connection,
+            schema_overrides={"year": pl.Int64}
+        )["year"]
+        
+        return countries, years
+        
+    @staticmethod
+    def _build_location_dimension(countries: pl.DataFrame) -> pl.DataFrame:
+        """Collapse (country, is_tropical) pairs to one row per country."""
+        return (
+            countries
+            .group_by("country")
+            .agg((pl.col("is_tropical") == 1).any().cast(pl.Int64).alias("is_tropical"))
+            .sort("country")
+        )
+        
+    @staticmethod
+    def _build_time_dimension(years: pl.Series) -> pl.DataFrame:
+        """Derive decade and period labels for each distinct year."""
+        year = pl.col("year")
+        return (
+            pl.DataFrame({"year": years})
+            .unique()
+            .sort("year")
+            .with_columns(
+                pl.when(year.is_between(2000, 2009)).then(pl.lit("2000s"))
+                .when(year.is_between(2010, 2019)).then(pl.lit("2010s"))
+                .when(year.is_between(2020, 2029)).then(pl.lit("2020s"))
+                .alias("decade"),
+                pl.when(year <= 2005).then(pl.lit("Early 2000s"))
+                .when(year <= 2010).then(pl.lit("Late 2000s"))
+                .when(year <= 2015).then(pl.lit("Early 2010s"))
+                .when(year <= 2020).then(pl.lit("Late 2010s"))
+                .otherwise(pl.lit("Early 2020s"))
+                .alias("period"),
+            )
+        )
 
 
@@ -4,35 +4,52 @@
 """
 Safe query executor with parameterized queries to prevent SQL injection.
 """
+import atexit
 import logging
+import os
+import re
 import sqlite3
+import threading
+import weakref
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple  # THIS LINE NEEDS Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 from contextlib import contextmanager
+from itertools import groupby
 import time
-import os
-import sys
-from nexus.config.settings import settings
+
+from nexus.config.settings import get_settings
 
 logger = logging.getLogger(__name__) 
 
+# Compiled statements kept per connection. The sqlite3 module reuses a
+# prepared statement whenever the same SQL text is executed again on a
+# connection, so long-lived connections skip re-parsing repeat queries.
+STATEMENT_CACHE_SIZE = 256
+
+# Valid SQL identifier for columns used in generated WHERE clauses
+_COLUMN_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Executors still alive, closed at interpreter exit; weak so that exit
+# cleanup doesn't keep discarded executors and their connections around
+_live_executors: "weakref.WeakSet[QueryExecutor]" = weakref.WeakSet()
 
-# Debug logging
-DATABASE_PATH = os.environ.get("DATABASE_PATH", "/app/data/processed/forest.db")
-sys.stderr.write(f"DATABASE_PATH from env: {DATABASE_PATH}\n")
-sys.stderr.write(f"Path exists: {Path(DATABASE_PATH).exists()}\n")
-sys.stderr.write(f"Path absolute: {Path(DATABASE_PATH).absolute()}\n")
 
-# Try to import settings and see what it has
-try:
-    from nexus.config.settings import settings
-    sys.stderr.write(f"Settings db path: {settings.sqlite_db_path}\n")
-except Exception as e:
-    sys.stderr.write(f"Settings import error: {e}\n")
+@atexit.register
+def _close_live_executors():
+    """Close the connections of every executor still alive at exit."""
+    for executor in list(_live_executors):
+        executor.close()
+
+
+def _debug_paths(db_path: Path):
+    """Log how the database path was resolved (DEBUG=true only)."""
+    if os.environ.get("DEBUG") != "true" or not logger.isEnabledFor(logging.DEBUG):
+        return
+    
+    logger.debug(f"DATABASE_PATH from env: {os.environ.get('DATABASE_PATH')}")
+    logger.debug(f"Settings db path: {get_settings().sqlite_db_path}")
+    logger.debug(f"Executor db path: {db_path.absolute()} (exists: {db_path.exists()})")
 
-# Initialize with explicit path
-# from nexus.data.database.query_executor import QueryExecutor
-# query_executor = QueryExecutor(db_path=Path(DATABASE_PATH))
 
 class QueryExecutor:
     """
@@ -49,12 +66,27 @@ class QueryExecutor:
         Args:
             db_path: Path to SQLite database
         """
-        self.db_path = db_path or settings.sqlite_db_path
+        if db_path is None:
+            settings = get_settings()
+            self.db_path = settings.sqlite_db_path
+            self._abs_db_path = settings.get_absolute_db_path()
+        else:
+            self.db_path = db_path
+            self._abs_db_path = str(db_path.resolve())
+        
+        _debug_paths(self.db_path)
         self._validate_db_exists()
+        
+        # One read-only and one writable connection per thread, reused
+        # across queries instead of reopening the database every call
+        self._tls = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        _live_executors.add(self)
     
     def _validate_db_exists(self):
         """Ensure database file exists."""
-        if not self.db_path.exists():
+        if not os.path.exists(self._abs_db_path):
             raise FileNotFoundError(f"Database not found: {self.db_path}")
     
     @contextmanager
@@ -68,25 +100,63 @@ class QueryExecutor:
         Yields:
             Database connection
         """
+        attr = "readonly_conn" if readonly else "write_conn"
+        conn = getattr(self._tls, attr, None)
+        
+        if conn is None:
+            conn = self._open_connection(readonly)
+            setattr(self._tls, attr, conn)
+        
+        try:
+            yield conn
+        finally:
+            # Discard anything left uncommitted, as closing used to
+            if conn.in_transaction:
+                conn.rollback()
+    
+    def _open_connection(self, readonly: bool) -> sqlite3.Connection:
+        """Open and register a new connection for the calling thread."""
         # Build connection URL with appropriate mode
-
+        mode = "ro" if readonly else "rwc"
+        db_uri = f"{Path(self._abs_db_path).as_uri()}?mode={mode}"
+        
+        conn = sqlite3.connect(
+            db_uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
         
-        conn = sqlite3.connect(str(self.db_path))
+        if readonly:
+            # Reject writes even if the file itself is writable
+            conn.execute("PRAGMA query_only = 1")
         
         # Enable row factory for dictionary-like results
         conn.row_factory = sqlite3.Row
         
-        try:
-            yield conn
-        finally:
+        with self._connections_lock:
+            self._connections.append(conn)
+        
+        return conn
+    
+    def close(self):
+        """Close every connection opened by this executor."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        
+        for conn in connections:
             conn.close()
+        
+        self._tls = threading.local()
     
     def execute_query(
         self, 
         sql: str, 
         params: Optional[Tuple] = None,
-        readonly: bool = True
-    ) -> List[Dict[str, Any]]:
+        readonly: bool = True,
+        iter_batches: bool = False,
+        batch_size: int = 4096
+    ) -> Union[List[sqlite3.Row], Iterator[List[sqlite3.Row]]]:
         """
         Execute a SQL query with parameters.
         
@@ -97,15 +167,24 @@ class QueryExecutor:
             sql: SQL query with ? placeholders for parameters
             params: Tuple of parameter values
             readonly: Whether this is a read-only query
+            iter_batches: If True, return an iterator of row batches instead
+                of fetching the whole result at once
+            batch_size: Number of rows per batch when iter_batches is set
             
         Returns:
-            List of result dictionaries
+            List of result rows. Each sqlite3.Row supports access by
+            column name (row["country"]) and converts with dict(row).
+            With iter_batches, an iterator yielding lists of at most
+            batch_size rows.
             
         Example:
             sql = "SELECT * FROM users WHERE country = ? AND year = ?"
             params = ("Brazil", 2023)
             results = executor.execute_query(sql, params)
         """
+        if iter_batches:
+            return self._iter_query_batches(sql, params, readonly, batch_size)
+        
         start_time = time.time()
         
         try:
@@ -121,8 +200,8 @@ class QueryExecutor:
                 else:
                     cursor.execute(sql)
                 
-                # Fetch all results
-                results = [dict(row) for row in cursor.fetchall()]
+                # Fetch all results as rows sharing one column description
+                results = cursor.fetchall()
                 
                 # Log execution time
                 execution_time = (time.time() - start_time) * 1000
@@ -139,6 +218,34 @@ class QueryExecutor:
             logger.error(f"SQL: {sql}")
             raise
     
+    def _iter_query_batches(
+        self,
+        sql: str,
+        params: Optional[Tuple],
+        readonly: bool,
+        batch_size: int
+    ) -> Iterator[List[sqlite3.Row]]:
+        """Stream query results with fetchmany so memory stays bounded."""
+        with self.get_connection(readonly=readonly) as conn:
+            cursor = conn.cursor()
+            logger.debug(f"Streaming query: {sql[:100]}...")
+            
+            try:
+                cursor.execute(sql, params or ())
+                
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    yield batch
+                    
+            except Exception as e:
+                logger.error(f"Query execution failed: {e}")
+                logger.error(f"SQL: {sql}")
+                raise
+            finally:
+                cursor.close()
+    
     def execute_transaction(
         self,
         operations: List[Tuple[str, Optional[Tuple]]]
@@ -147,6 +254,8 @@ class QueryExecutor:
         Execute multiple operations in a transaction.
         
         Ensures all operations succeed or all fail (ACID compliance).
+        Consecutive operations sharing the same SQL are sent as a single
+        executemany call.
         
         Args:
             operations: List of (sql, params) tuples
@@ -167,11 +276,12 @@ class QueryExecutor:
                 conn.execute("BEGIN TRANSACTION")
                 cursor = conn.cursor()
                 
-                for sql, params in operations:
-                    if params:
-                        cursor.execute(sql, params)
+                for sql, group in groupby(operations, key=lambda op: op[0]):
+                    batch = [params or () for _, params in group]
+                    if len(batch) == 1:
+                        cursor.execute(sql, batch[0])
                     else:
-                        cursor.execute(sql)
+                        cursor.executemany(sql, batch)
                 
                 # Commit if all successful
                 conn.commit()
@@ -216,7 +326,7 @@ class QueryExecutor:
         """
         
         results = self.execute_query(stats_sql)
-        return results[0] if results else {}
+        return dict(results[0]) if results else {}
     
     def build_where_clause(
         self,
@@ -245,14 +355,14 @@ class QueryExecutor:
         
         for column, value in conditions.items():
             # Validate column name (alphanumeric and underscore only)
-            if not column.replace('_', '').isalnum():
+            if not _COLUMN_NAME_RE.fullmatch(column):
                 raise ValueError(f"Invalid column name: {column}")
             
             if value is None:
                 where_parts.append(f"{column} IS NULL")
             elif isinstance(value, (list, tuple)):
                 # Handle IN clause
-                placeholders = ','.join('?' * len(value))
+                placeholders = ("?," * len(value))[:-1]
                 where_parts.append(f"{column} IN ({placeholders})")
                 params.extend(value)
             else:
@@ -289,7 +399,7 @@ class QueryExecutor:
             integrity_sql = "PRAGMA integrity_check"
             integrity = self.execute_query(integrity_sql)
             
-            if integrity[0].get("integrity_check") != "ok":
+            if integrity[0]["integrity_check"] != "ok":
                 results["issues"].append("Database integrity check failed")
                 results["status"] = "unhealthy"
                 
@@ -5,8 +5,13 @@
 SQLite database schema definitions with FIXED index creation.
 """
 import logging
-from typing import List, Dict, Any
-from dataclasses import dataclass
+import os
+import re
+import threading
+from functools import lru_cache
+from importlib import resources
+from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
 import sqlite3
 from pathlib import Path
 
@@ -14,21 +19,133 @@ from nexus.config.settings import settings
 
 CARBON_THRESHOLDS = [30, 50, 75]  # Only these have carbon data
 
+# Prepared statements kept per pooled connection
+STATEMENT_CACHE_SIZE = 256
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def schema_cache_key(connection: sqlite3.Connection) -> Optional[Tuple[str, int, int, int]]:
+    """
+    Identify a database file's current schema for caching catalog lookups.
+    
+    PRAGMA schema_version is bumped by SQLite on every DDL change within a
+    file. A file deleted or replaced at the same path starts counting again,
+    so the file's inode and modification time are part of the key as well.
+    
+    Args:
+        connection: Database connection to inspect
+        
+    Returns:
+        Cache key, or None for in-memory and temporary databases
+    """
+    db_file = connection.execute("PRAGMA database_list").fetchone()[2]
+    if not db_file:
+        return None
+    try:
+        stat = os.stat(db_file)
+    except OSError:
+        return None
+    version = connection.execute("PRAGMA schema_version").fetchone()[0]
+    return db_file, stat.st_ino, stat.st_mtime_ns, version
+
+
+# Quoted literal or identifier (kept verbatim), or a run of whitespace and
+# line comments (collapsed to one space)
+_SQL_TOKEN_RE = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|((?:\s|--[^\n]*)+)""")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a SQL statement to a canonical single-line form.
+    
+    Comments are dropped and whitespace collapsed outside quoted literals and
+    identifiers, so a statement always has the same text for SQLite's
+    per-connection statement cache however the source string was indented.
+    
+    Args:
+        sql: SQL text, possibly multi-line
+        
+    Returns:
+        Normalized SQL text
+    """
+    return _SQL_TOKEN_RE.sub(
+        lambda match: " " if match.group(1) else match.group(0), sql
+    ).strip()
+
+
+def build_drop_script(objects: List[Tuple[str, str]]) -> str:
+    """
+    Build a single-transaction script dropping catalog objects.
+    
+    Args:
+        objects: (type, name) pairs from sqlite_master, in drop order
+        
+    Returns:
+        Script suitable for executescript
+    """
+    drops = [f'DROP {obj_type.upper()} IF EXISTS "{name}";' for obj_type, name in objects]
+    return "\n".join(["BEGIN;", *drops, "COMMIT;"])
+
+
+@dataclass(frozen=True, slots=True)
+class IndexSpec:
+    """Represents an index on a table schema."""
+    name: str
+    columns: Tuple[str, ...]
+    # Predicate for a partial index, None to index every row
+    where: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
 class TableSchema:
     """Represents a database table schema."""
     name: str
-    columns: List[tuple]  # (column_name, data_type, constraints)
-    primary_key: List[str]
-    indexes: List[Dict[str, Any]]
+    columns: Tuple[Tuple[str, str, str], ...]  # (column_name, data_type, constraints)
+    primary_key: Tuple[str, ...]
+    indexes: Tuple[IndexSpec, ...]
+    # Store rows in the primary key B-tree instead of behind a rowid
+    without_rowid: bool = False
+    
+    # DDL compiled once from the fields above when the schema is defined
+    create_sql: str = field(init=False, repr=False)
+    index_sqls: Tuple[str, ...] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        """Build the CREATE TABLE and CREATE INDEX statements."""
+        # Quote column names to handle special characters
+        columns_sql = [
+            normalize_sql(f'"{col_name}" {col_type} {constraints}')
+            for col_name, col_type, constraints in self.columns
+        ]
+        if self.primary_key:
+            quoted_pk = [f'"{col}"' for col in self.primary_key]
+            columns_sql.append(f"PRIMARY KEY ({', '.join(quoted_pk)})")
+            
+        create_sql = f"CREATE TABLE IF NOT EXISTS {self.name} ({', '.join(columns_sql)})"
+        if self.without_rowid:
+            create_sql += " WITHOUT ROWID"
+        
+        index_sqls = []
+        for index in self.indexes:
+            quoted_cols = [f'"{col}"' for col in index.columns]
+            index_sql = (
+                f"CREATE INDEX IF NOT EXISTS {index.name} "
+                f"ON {self.name} ({', '.join(quoted_cols)})"
+            )
+            # Partial index restricted to the rows matching the predicate
+            if index.where:
+                index_sql += f" WHERE {index.where}"
+            index_sqls.append(index_sql)
+        
+        # Frozen instances are assigned through object.__setattr__
+        object.__setattr__(self, "create_sql", create_sql)
+        object.__setattr__(self, "index_sqls", tuple(index_sqls))
     
 
 FACT_TREE_COVER_SCHEMA = TableSchema(
     name="fact_tree_cover_loss",
-    columns=[
+    columns=(
         ("country", "TEXT", "NOT NULL"),
         ("year", "INTEGER", "NOT NULL"),
         ("threshold", "INTEGER", "NOT NULL"),
@@ -39,35 +156,44 @@ FACT_TREE_COVER_SCHEMA = TableSchema(
         ("area_ha", "REAL", ""),
         ("loss_rate_pct", "REAL", ""),
         ("data_quality_flag", "TEXT", ""),
-    ],
-    primary_key=["country", "year", "threshold"],
-    indexes=[
-        {"name": "idx_tcl_country_year", "columns": ["country", "year"]},
-        {"name": "idx_tcl_threshold", "columns": ["threshold"]},
-        {"name": "idx_tcl_year", "columns": ["year"]},
-    ]
+    ),
+    primary_key=("country", "year", "threshold"),
+    indexes=(
+        IndexSpec("idx_tcl_threshold_country_year", ("threshold", "country", "year")),
+        IndexSpec("idx_tcl_year", ("year",)),
+        # Covers the threshold = 30 aggregates in the views as index-only scans.
+        # threshold is listed last only because SQLite needs every referenced
+        # column in the index to treat it as covering.
+        IndexSpec(
+            "idx_tcl_t30_covering",
+            ("country", "year", "tree_cover_loss_ha", "threshold"),
+            where="threshold = 30",
+        ),
+    ),
 )
 
 FACT_PRIMARY_FOREST_SCHEMA = TableSchema(
     name="fact_primary_forest",
-    columns=[
+    columns=(
         ("country", "TEXT", "NOT NULL"),
         ("year", "INTEGER", "NOT NULL"),
         ("threshold", "INTEGER", "DEFAULT 30"),
         ("primary_forest_loss_ha", "REAL", ""),
         ("is_tropical", "BOOLEAN", ""),
         ("loss_status", "TEXT", ""),
-    ],
-    primary_key=["country", "year"],
-    indexes=[
-        {"name": "idx_pf_country_year", "columns": ["country", "year"]},
-        {"name": "idx_pf_tropical", "columns": ["is_tropical"]},
-    ]
+    ),
+    primary_key=("country", "year"),
+    indexes=(
+        IndexSpec("idx_pf_country_year", ("country", "year")),
+        IndexSpec("idx_pf_tropical", ("is_tropical",)),
+        IndexSpec("idx_pf_tropical_country", ("country",), where="is_tropical = 1"),
+    ),
+    without_rowid=True,
 )
 
 FACT_CARBON_SCHEMA = TableSchema(
     name="fact_carbon",
-    columns=[
+    columns=(
         ("country", "TEXT", "NOT NULL"),
         ("year", "INTEGER", "NOT NULL"),
         ("threshold", "INTEGER", f"NOT NULL CHECK (threshold IN ({','.join(map(str, CARBON_THRESHOLDS))}))"),
@@ -77,128 +203,352 @@ FACT_CARBON_SCHEMA = TableSchema(
         ("carbon_net_flux_annual_avg", "REAL", ""),
         ("carbon_density_mg_c_ha", "REAL", ""),
         ("carbon_flux_status", "TEXT", ""),
-    ],
-    primary_key=["country", "year", "threshold"],
-    indexes=[
-        {"name": "idx_carbon_country_year", "columns": ["country", "year", "threshold"]},
-        {"name": "idx_carbon_threshold", "columns": ["threshold"]},
-        {"name": "idx_carbon_status", "columns": ["carbon_flux_status"]},
-    ]
+        # Evaluated once per row at insert time instead of in every view query
+        ("carbon_role", "TEXT", """GENERATED ALWAYS AS (CASE
+            WHEN carbon_net_flux_annual_avg < 0 THEN 'Carbon Sink'
+            WHEN carbon_net_flux_annual_avg > 0 THEN 'Carbon Source'
+            ELSE 'Carbon Neutral'
+        END) STORED"""),
+    ),
+    primary_key=("country", "year", "threshold"),
+    indexes=(
+        IndexSpec("idx_carbon_threshold_country_year", ("threshold", "country", "year")),
+        IndexSpec("idx_carbon_status", ("carbon_flux_status",)),
+        IndexSpec(
+            "idx_carbon_t30_covering",
+            (
+                "country", "year", "carbon_emissions_mg_co2e",
+                "carbon_net_flux_annual_avg", "threshold",
+            ),
+            where="threshold = 30",
+        ),
+    ),
 )
 
 DIM_LOCATION_SCHEMA = TableSchema(
     name="dim_location",
-    columns=[
+    columns=(
         ("country", "TEXT", ""),
         ("region", "TEXT", ""),
         ("subregion", "TEXT", ""),
         ("is_tropical", "BOOLEAN", ""),
         ("iso_code", "TEXT", ""),
-    ],
-    primary_key=["country"],
-    indexes=[]
+    ),
+    primary_key=("country",),
+    indexes=(),
+    without_rowid=True,
 )
 
 DIM_TIME_SCHEMA = TableSchema(
     name="dim_time",
-    columns=[
+    columns=(
         ("year", "INTEGER", ""),
         ("decade", "TEXT", ""),
         ("period", "TEXT", ""),
-    ],
-    primary_key=["year"],
-    indexes=[]
+    ),
+    primary_key=("year",),
+    indexes=(),
+    without_rowid=True,
 )
 
-ALL_SCHEMAS = [
+ALL_SCHEMAS: Tuple[TableSchema, ...] = (
     FACT_TREE_COVER_SCHEMA,
     FACT_PRIMARY_FOREST_SCHEMA,
     FACT_CARBON_SCHEMA,
     DIM_LOCATION_SCHEMA,
     DIM_TIME_SCHEMA,
+)
+
+# Indexes from earlier schema versions, superseded by the threshold-first
+# composites above (country-leading lookups are served by the primary keys)
+RETIRED_INDEXES = [
+    "idx_tcl_country_year",
+    "idx_tcl_threshold",
+    "idx_carbon_country_year",
+    "idx_carbon_threshold",
 ]
 
-FACT_TABLE_SCHEMAS = [
+FACT_TABLE_SCHEMAS: Tuple[TableSchema, ...] = (
     FACT_TREE_COVER_SCHEMA,
     FACT_PRIMARY_FOREST_SCHEMA,
     FACT_CARBON_SCHEMA,
+)
+
+# Basic views created with the schema; ViewManager replaces them with
+# richer definitions
+SCHEMA_VIEWS_SQL = """
+CREATE VIEW IF NOT EXISTS v_primary_forest_percentage AS
+SELECT
+    t.country,
+    t.year,
+    t.tree_cover_loss_ha,
+    p.primary_forest_loss_ha,
+    CASE
+        WHEN t.tree_cover_loss_ha > 0
+        THEN ROUND((p.primary_forest_loss_ha / t.tree_cover_loss_ha) * 100, 2)
+        ELSE NULL
+    END as primary_percentage
+FROM fact_tree_cover_loss t
+LEFT JOIN fact_primary_forest p
+    ON t.country = p.country
+    AND t.year = p.year
+WHERE t.threshold = 30;
+
+CREATE VIEW IF NOT EXISTS v_carbon_intensity AS
+SELECT
+    t.country,
+    t.year,
+    t.threshold,
+    t.tree_cover_loss_ha,
+    c.carbon_emissions_mg_co2e,
+    CASE
+        WHEN t.tree_cover_loss_ha > 0
+        THEN ROUND(c.carbon_emissions_mg_co2e / t.tree_cover_loss_ha, 2)
+        ELSE NULL
+    END as carbon_per_hectare
+FROM fact_tree_cover_loss t
+INNER JOIN fact_carbon c
+    ON t.country = c.country
+    AND t.year = c.year
+    AND t.threshold = c.threshold;
+
+CREATE VIEW IF NOT EXISTS v_annual_summary AS
+SELECT
+    year,
+    COUNT(DISTINCT country) as countries_reporting,
+    SUM(tree_cover_loss_ha) as total_loss_ha,
+    AVG(tree_cover_loss_ha) as avg_loss_ha,
+    MAX(tree_cover_loss_ha) as max_loss_ha
+FROM fact_tree_cover_loss
+WHERE threshold = 30
+GROUP BY year;
+"""
+
+# Views probed by verify_query_plans with a country/year lookup
+PLAN_CHECK_VIEWS = [
+    "v_primary_forest_percentage",
+    "v_carbon_intensity",
+    "v_annual_summary",
+    "v_country_summary",
+    "v_trend_analysis",
+    "v_top_emitters",
 ]
 
+# Named index (or primary key) in an EXPLAIN QUERY PLAN detail line
+_PLAN_INDEX_RE = re.compile(r"USING (?:COVERING )?INDEX (\S+)|USING (?:INTEGER )?PRIMARY KEY")
+# Full pass over a table or subquery, either directly or by walking a whole index
+_PLAN_SCAN_RE = re.compile(r"SCAN (?:TABLE )?(\S+)(?: USING (?:COVERING )?INDEX (\S+))?$")
+# Table (or CTE) named in a FROM/JOIN clause, with its optional alias
+_FROM_ALIAS_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+# Words that can follow a table name in FROM/JOIN without being its alias
+_NOT_ALIASES = {
+    "where", "on", "using", "join", "inner", "left", "right", "full", "cross",
+    "natural", "outer", "group", "order", "limit", "union", "except", "intersect",
+    "having", "window",
+}
+
+
+def plan_aliases(view_sql: str) -> Dict[str, str]:
+    """
+    Map the names a query plan can use for a view's sources to the source names.
+    
+    Args:
+        view_sql: CREATE VIEW statement from sqlite_master
+        
+    Returns:
+        Dictionary of alias (or bare name) to table or CTE name
+    """
+    aliases = {}
+    for name, alias in _FROM_ALIAS_RE.findall(view_sql):
+        aliases[name] = name
+        if alias and alias.lower() not in _NOT_ALIASES:
+            aliases[alias] = name
+    return aliases
+
+# Prebuilt DDL script shipped next to this module, generated from the
+# definitions above by tools/build_schema_sql.py
+SCHEMA_SQL_RESOURCE = "_schema.sql"
+
+
+def render_schema_sql() -> str:
+    """
+    Render the table and view DDL as a single transactional script.
+    
+    Indexes are left out so bulk loads can defer them; they are created from
+    TableSchema.index_sqls.
+    
+    Returns:
+        Script suitable for executescript
+    """
+    statements = [f"{schema.create_sql};" for schema in ALL_SCHEMAS]
+    # One normalized statement per line (the view bodies contain no semicolons)
+    statements += [
+        f"{normalize_sql(view_sql)};"
+        for view_sql in SCHEMA_VIEWS_SQL.split(";") if view_sql.strip()
+    ]
+    return "\n".join([
+        "-- Generated by tools/build_schema_sql.py; do not edit.",
+        "BEGIN;",
+        *statements,
+        "COMMIT;",
+        "",
+    ])
+
+
+@lru_cache(maxsize=1)
+def load_schema_sql() -> str:
+    """Read the prebuilt schema script shipped with the package."""
+    return resources.files(__package__).joinpath(SCHEMA_SQL_RESOURCE).read_text()
+
 
 class SchemaManager:
     """Manages database schema creation and updates."""
     
+    # verify_indexes results, keyed by schema_cache_key
+    _indexes_cache: Dict[Tuple[str, int, int, int], Dict[str, List[str]]] = {}
+    _indexes_cache_lock = threading.Lock()
+    
     def __init__(self, db_path: Path = None):
         """Initialize schema manager."""
         self.db_path = db_path or settings.sqlite_db_path
         
-    def create_schema(self, schema: TableSchema, connection: sqlite3.Connection):
-        """Create a table from schema definition with proper index creation."""
-        cursor = connection.cursor()
+        # One connection per thread, reused across calls instead of
+        # reopening the database (and replaying its setup) every time
+        self._tls = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         
-        # Build CREATE TABLE statement
-        columns_sql = []
-        for col_name, col_type, constraints in schema.columns:
-            # Quote column names to handle special characters
-            columns_sql.append(f'"{col_name}" {col_type} {constraints}'.strip())
+    def _get_conn(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+            conn.execute("PRAGMA busy_timeout = 5000")
+            conn.execute("PRAGMA journal_mode = WAL")
+            
+            self._tls.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+        
+    def close(self):
+        """Close every connection opened by this manager."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
             
-        # Add primary key
-        if schema.primary_key:
-            quoted_pk = [f'"{col}"' for col in schema.primary_key]
-            pk_sql = f"PRIMARY KEY ({', '.join(quoted_pk)})"
-            columns_sql.append(pk_sql)
+        for conn in connections:
+            conn.close()
             
-        create_sql = f"""
-        CREATE TABLE IF NOT EXISTS {schema.name} (
-            {', '.join(columns_sql)}
-        )
+        self._tls = threading.local()
+        
+    def create_schema(
+        self,
+        schema: TableSchema,
+        connection: sqlite3.Connection,
+        create_indexes: bool = True
+    ):
+        """
+        Create a table from schema definition.
+        
+        Args:
+            schema: Table definition to create
+            connection: Database connection to use
+            create_indexes: Whether to build the table's indexes now; pass False
+                ahead of a bulk load and call finalize_indexes afterwards
         """
+        logger.debug("Creating table %s", schema.name)
+        connection.execute(schema.create_sql)
+        self._add_generated_columns(schema, connection)
         
-        logger.debug(f"Creating table {schema.name}")
-        cursor.execute(create_sql)
-        
-        # Create indexes IMMEDIATELY after table creation
-        index_count = 0
-        for index in schema.indexes:
-            quoted_cols = [f'"{col}"' for col in index['columns']]
-            index_sql = f"""
-            CREATE INDEX IF NOT EXISTS {index['name']}
-            ON {schema.name} ({', '.join(quoted_cols)})
-            """
-            cursor.execute(index_sql)
-            index_count += 1
-            logger.debug(f"Created index {index['name']} on {schema.name}")
+        index_count = self.create_indexes(schema, connection) if create_indexes else 0
         
         # DON'T commit here - let the caller manage transactions
-        logger.info(f"Created table {schema.name} with {index_count} indexes")
-        
-    def create_all_tables(self, connection: sqlite3.Connection = None):
-        """Create all tables in the database with proper transaction management."""
-        if connection is None:
-            connection = sqlite3.connect(self.db_path)
-            close_connection = True
-        else:
-            close_connection = False
+        logger.info("Created table %s with %d indexes", schema.name, index_count)
+        
+    def _add_generated_columns(self, schema: TableSchema, connection: sqlite3.Connection):
+        """
+        Add generated columns missing from a table created by an older schema.
+        
+        SQLite cannot add STORED columns to an existing table, so these are
+        added as VIRTUAL; new databases get the STORED definition.
+        
+        Args:
+            schema: Table definition to compare against
+            connection: Database connection to use
+        """
+        existing = {row[1] for row in connection.execute(f"PRAGMA table_xinfo({schema.name})")}
+        
+        for col_name, col_type, constraints in schema.columns:
+            if col_name in existing or "GENERATED" not in constraints:
+                continue
+                
+            virtual = constraints.replace(" STORED", " VIRTUAL")
+            connection.execute(
+                f'ALTER TABLE {schema.name} ADD COLUMN "{col_name}" {col_type} {virtual}'
+            )
+            logger.info(f"Added generated column {col_name} to {schema.name}")
+        
+    def create_indexes(self, schema: TableSchema, connection: sqlite3.Connection) -> int:
+        """
+        Create the indexes declared for a table.
+        
+        Args:
+            schema: Table definition whose indexes should be created
+            connection: Database connection to use
             
+        Returns:
+            Number of indexes issued
+        """
+        for index_sql in schema.index_sqls:
+            connection.execute(index_sql)
+        
+        logger.debug("Created %d indexes on %s", len(schema.index_sqls), schema.name)
+        return len(schema.index_sqls)
+        
+    def create_all_tables(
+        self,
+        connection: sqlite3.Connection = None,
+        defer_indexes: bool = False
+    ):
+        """
+        Create all tables in the database with proper transaction management.
+        
+        Args:
+            connection: Optional database connection to use
+            defer_indexes: Skip fact table indexes so a following bulk load
+                appends without B-tree maintenance; the loader must then call
+                finalize_indexes once the data is in
+        """
+        connection = connection or self._get_conn()
+        
         try:
+            self._pre_create_pragmas(connection)
+            
+            # Tables and views in one prebuilt script and transaction
+            connection.executescript(load_schema_sql())
+            logger.info("Created tables and views from schema script")
+            
             # Start explicit transaction
             connection.execute("BEGIN IMMEDIATE")
             
             for schema in ALL_SCHEMAS:
-                self.create_schema(schema, connection)
+                self._add_generated_columns(schema, connection)
+                if not (defer_indexes and schema in FACT_TABLE_SCHEMAS):
+                    self.create_indexes(schema, connection)
             
-            # Create views
-            self._create_views(connection)
-            
-            # CRITICAL: Verify indexes were created
-            cursor = connection.cursor()
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type = 'index' AND sql IS NOT NULL
-                ORDER BY name
-            """)
-            indexes = cursor.fetchall()
-            logger.info(f"Created {len(indexes)} indexes total: {[idx[0] for idx in indexes]}")
+            # Report the indexes now in place (skip the catalog query when
+            # nobody would see the result)
+            if logger.isEnabledFor(logging.INFO):
+                indexes = [row[0] for row in connection.execute("""
+                    SELECT name FROM sqlite_master 
+                    WHERE type = 'index' AND sql IS NOT NULL
+                    ORDER BY name
+                """)]
+                logger.info(f"Created {len(indexes)} indexes total: {indexes}")
             
             # Commit the entire transaction
             connection.commit()
@@ -211,67 +561,16 @@ class SchemaManager:
             connection.rollback()
             logger.error(f"Failed to create schema: {e}")
             raise
-        finally:
-            if close_connection:
-                connection.close()
                 
-    def _create_views(self, connection: sqlite3.Connection):
-        """Create useful database views for common queries."""
+    def _pre_create_pragmas(self, connection: sqlite3.Connection):
+        """Set pragmas that only take effect before the first table is created."""
         cursor = connection.cursor()
         
-        cursor.execute("""
-        CREATE VIEW IF NOT EXISTS v_primary_forest_percentage AS
-        SELECT 
-            t.country,
-            t.year,
-            t.tree_cover_loss_ha,
-            p.primary_forest_loss_ha,
-            CASE 
-                WHEN t.tree_cover_loss_ha > 0 
-                THEN ROUND((p.primary_forest_loss_ha / t.tree_cover_loss_ha) * 100, 2)
-                ELSE NULL 
-            END as primary_percentage
-        FROM fact_tree_cover_loss t
-        LEFT JOIN fact_primary_forest p
-            ON t.country = p.country 
-            AND t.year = p.year
-        WHERE t.threshold = 30
-        """)
-        
-        cursor.execute("""
-        CREATE VIEW IF NOT EXISTS v_carbon_intensity AS
-        SELECT 
-            t.country,
-            t.year,
-            t.threshold,
-            t.tree_cover_loss_ha,
-            c.carbon_emissions_mg_co2e,
-            CASE 
-                WHEN t.tree_cover_loss_ha > 0 
-                THEN ROUND(c.carbon_emissions_mg_co2e / t.tree_cover_loss_ha, 2)
-                ELSE NULL 
-            END as carbon_per_hectare
-        FROM fact_tree_cover_loss t
-        INNER JOIN fact_carbon c
-            ON t.country = c.country
-            AND t.year = c.year
-            AND t.threshold = c.threshold
-        """)
-        
-        cursor.execute("""
-        CREATE VIEW IF NOT EXISTS v_annual_summary AS
-        SELECT 
-            year,
-            COUNT(DISTINCT country) as countries_reporting,
-            SUM(tree_cover_loss_ha) as total_loss_ha,
-            AVG(tree_cover_loss_ha) as avg_loss_ha,
-            MAX(tree_cover_loss_ha) as max_loss_ha
-        FROM fact_tree_cover_loss
-        WHERE threshold = 30
-        GROUP BY year
-        """)
+        # Page size is fixed once the database has content
+        cursor.execute("PRAGMA page_size = 4096")
         
-        logger.info("Created database views")
+        # Wait on concurrent writers instead of failing with SQLITE_BUSY
+        cursor.execute("PRAGMA busy_timeout = 5000")
         
     def _optimize_database(self, connection: sqlite3.Connection):
         """Optimize database for performance."""
@@ -283,70 +582,218 @@ class SchemaManager:
         # Set pragmas for performance
         cursor.execute("PRAGMA journal_mode = WAL")
         cursor.execute("PRAGMA synchronous = NORMAL")
-        cursor.execute("PRAGMA cache_size = 10000")
+        cursor.execute("PRAGMA cache_size = -131072")  # 128 MB
         cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.execute("PRAGMA mmap_size = 268435456")
+        cursor.execute("PRAGMA journal_size_limit = 6144000")
+        
+        # Checkpoint less often so bulk ingest does fewer fsyncs
+        cursor.execute("PRAGMA wal_autocheckpoint = 10000")
         
         connection.commit()
         logger.info("Database optimized")
         
-    def verify_indexes(self, connection: sqlite3.Connection = None) -> Dict[str, List[str]]:
-        """Verify that indexes exist in the database."""
-        if connection is None:
-            connection = sqlite3.connect(self.db_path)
-            close_connection = True
-        else:
-            close_connection = False
+    def finalize_indexes(self, connection: sqlite3.Connection = None) -> int:
+        """
+        Build all declared indexes and refresh planner statistics.
+        
+        Called once after a bulk load into tables created with
+        defer_indexes=True. Safe to re-run since every index uses IF NOT EXISTS.
+        
+        Args:
+            connection: Optional database connection to use
             
-        try:
-            cursor = connection.cursor()
+        Returns:
+            Number of indexes issued
+        """
+        connection = connection or self._get_conn()
+        
+        index_count = sum(
+            self.create_indexes(schema, connection) for schema in ALL_SCHEMAS
+        )
+        connection.commit()
+        
+        # Statistics are only meaningful once the data and indexes exist
+        connection.execute("ANALYZE")
+        connection.commit()
+        
+        logger.info(f"Finalized {index_count} indexes")
+        return index_count
+        
+    def missing_indexes(self, connection: sqlite3.Connection = None) -> List[str]:
+        """
+        List declared indexes that are absent from the database.
+        
+        Args:
+            connection: Optional database connection to use
             
-            # Get all indexes grouped by table
-            cursor.execute("""
-                SELECT tbl_name, name 
-                FROM sqlite_master 
-                WHERE type = 'index' AND sql IS NOT NULL
-                ORDER BY tbl_name, name
-            """)
+        Returns:
+            Names of missing indexes on existing tables, empty when the
+            schema is complete
+        """
+        connection = connection or self._get_conn()
+        
+        existing = {
+            row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'index')"
+            )
+        }
+        return [
+            index.name
+            for schema in ALL_SCHEMAS
+            if schema.name in existing
+            for index in schema.indexes
+            if index.name not in existing
+        ]
+        
+    def ensure_indexes(self, connection: sqlite3.Connection = None) -> bool:
+        """
+        Bring a database's indexes in line with the declared schema.
+        
+        Drops indexes retired by schema changes and rebuilds any that are
+        missing, such as after a load that crashed before finalize_indexes.
+        Run on startup.
+        
+        Args:
+            connection: Optional database connection to use
             
-            indexes_by_table = {}
-            for table, index in cursor.fetchall():
-                if table not in indexes_by_table:
-                    indexes_by_table[table] = []
-                indexes_by_table[table].append(index)
+        Returns:
+            True if indexes had to be rebuilt
+        """
+        connection = connection or self._get_conn()
+        
+        retired = [
+            row[0] for row in connection.execute(
+                f"SELECT name FROM sqlite_master WHERE type = 'index' "
+                f"AND name IN ({','.join('?' * len(RETIRED_INDEXES))})",
+                RETIRED_INDEXES
+            )
+        ]
+        for name in retired:
+            connection.execute(f"DROP INDEX IF EXISTS {name}")
+        if retired:
+            connection.commit()
+            logger.info(f"Dropped retired indexes: {retired}")
+        
+        missing = self.missing_indexes(connection)
+        if not missing:
+            return False
             
-            # Log results
-            for table, indexes in indexes_by_table.items():
-                logger.info(f"Table {table} has indexes: {indexes}")
+        logger.warning(f"Rebuilding missing indexes: {missing}")
+        self.finalize_indexes(connection)
+        return True
+        
+    def verify_indexes(self, connection: sqlite3.Connection = None) -> Dict[str, List[str]]:
+        """Verify that indexes exist in the database."""
+        connection = connection or self._get_conn()
+        
+        cache_key = schema_cache_key(connection)
+        with self._indexes_cache_lock:
+            cached = self._indexes_cache.get(cache_key)
+        if cached is not None:
+            return {table: list(indexes) for table, indexes in cached.items()}
             
-            return indexes_by_table
+        cursor = connection.cursor()
+        
+        # Get all indexes grouped by table
+        cursor.execute("""
+            SELECT tbl_name, name 
+            FROM sqlite_master 
+            WHERE type = 'index' AND sql IS NOT NULL
+            ORDER BY tbl_name, name
+        """)
+        
+        indexes_by_table = {}
+        for table, index in cursor.fetchall():
+            if table not in indexes_by_table:
+                indexes_by_table[table] = []
+            indexes_by_table[table].append(index)
+        
+        # Log results
+        for table, indexes in indexes_by_table.items():
+            logger.info("Table %s has indexes: %s", table, indexes)
+        
+        if cache_key is not None:
+            with self._indexes_cache_lock:
+                self._indexes_cache[cache_key] = {
+                    table: list(indexes) for table, indexes in indexes_by_table.items()
+                }
+        
+        return indexes_by_table
+        
+    def verify_query_plans(self, connection: sqlite3.Connection = None) -> Dict[str, List[str]]:
+        """
+        Check that the planner uses indexes for country/year lookups on views.
+        
+        Runs EXPLAIN QUERY PLAN for each existing view in PLAN_CHECK_VIEWS,
+        filtered on whichever of country and year it exposes, and logs a
+        warning for every full scan of a table, including scans that walk a
+        whole index instead of searching it. Plans name aliased tables by
+        their alias, which is resolved through the view's FROM/JOIN clauses;
+        scans of CTEs and subqueries are not flagged.
+        
+        Args:
+            connection: Optional database connection to use
             
-        finally:
-            if close_connection:
-                connection.close()
+        Returns:
+            Dictionary of view name to the indexes its plan uses
+        """
+        connection = connection or self._get_conn()
+        
+        catalog = connection.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE type IN ('table', 'view')"
+        ).fetchall()
+        existing = {name: sql for obj_type, name, sql in catalog if obj_type == "view"}
+        tables = {name for obj_type, name, _ in catalog if obj_type == "table"}
+        probe_values = {"country": "BRA", "year": 2020}
+        
+        plans = {}
+        for view in PLAN_CHECK_VIEWS:
+            if view not in existing:
+                continue
                 
-    def drop_all_tables(self, connection: sqlite3.Connection = None):
-        """Drop all tables (use with caution)."""
-        if connection is None:
-            connection = sqlite3.connect(self.db_path)
-            close_connection = True
-        else:
-            close_connection = False
-            
-        try:
-            cursor = connection.cursor()
+            columns = {row[1] for row in connection.execute(f"PRAGMA table_info({view})")}
+            filters = [column for column in probe_values if column in columns]
+            where = " AND ".join(f"{column} = ?" for column in filters)
             
-            # Drop views first
-            cursor.execute("DROP VIEW IF EXISTS v_primary_forest_percentage")
-            cursor.execute("DROP VIEW IF EXISTS v_carbon_intensity")
-            cursor.execute("DROP VIEW IF EXISTS v_annual_summary")
+            details = [
+                row[3] for row in connection.execute(
+                    f"EXPLAIN QUERY PLAN SELECT * FROM {view}" + (f" WHERE {where}" if where else ""),
+                    [probe_values[column] for column in filters]
+                )
+            ]
             
-            # Drop tables
-            for schema in ALL_SCHEMAS:
-                cursor.execute(f"DROP TABLE IF EXISTS {schema.name}")
-                
-            connection.commit()
-            logger.info("All tables dropped")
+            aliases = plan_aliases(existing[view])
+            indexes = []
+            for detail in details:
+                index = _PLAN_INDEX_RE.search(detail)
+                if index:
+                    indexes.append(index.group(1) or "PRIMARY KEY")
+                    
+                scan = _PLAN_SCAN_RE.match(detail)
+                table = aliases.get(scan.group(1), scan.group(1)) if scan else None
+                if table in tables and scan.group(2):
+                    logger.warning(f"{view} plan scans all of {table} through {scan.group(2)}")
+                elif table in tables:
+                    logger.warning(f"{view} plan scans {table} without an index")
+                    
+            plans[view] = indexes
+            logger.debug("%s plan uses indexes: %s", view, indexes)
             
-        finally:
-            if close_connection:
-                connection.close()
\ No newline at end of file
+        return plans
+        
+    def drop_all_tables(self, connection: sqlite3.Connection = None):
+        """Drop all tables (use with caution)."""
+        connection = connection or self._get_conn()
+        
+        # Reflect the catalog so objects added outside ALL_SCHEMAS are
+        # dropped too; views go first since they depend on tables
+        objects = connection.execute("""
+            SELECT type, name FROM sqlite_master
+            WHERE type IN ('view', 'table', 'index')
+            AND name NOT LIKE 'sqlite_%'
+            ORDER BY CASE type WHEN 'view' THEN 0 WHEN 'index' THEN 1 ELSE 2 END
+        """).fetchall()
+        
+        connection.executescript(build_drop_script(objects))
+        logger.info(f"Dropped {len(objects)} tables, views and indexes")
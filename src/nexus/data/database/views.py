@@ -3,17 +3,51 @@ Optimized database views for common query patterns.
 """
 import logging
 import sqlite3
+import threading
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, Union
 
 from nexus.config.settings import settings
+from nexus.data.database.schema import (
+    STATEMENT_CACHE_SIZE,
+    build_drop_script,
+    normalize_sql,
+    schema_cache_key,
+)
 
 logger = logging.getLogger(__name__)
 
+# Aggregate views backed by a table, mapped to the columns indexed on it
+MATERIALIZED_VIEWS = {
+    "v_country_summary": ["country"],
+    "v_trend_analysis": ["country", "year"],
+    "v_top_emitters": ["country", "year"],
+}
+
+# Views created by ViewManager; the only names query_view will read
+ALLOWED_VIEWS = frozenset({
+    "v_intensity",
+    "v_primary_forest_percentage",
+    "v_carbon_intensity",
+    "v_annual_summary",
+    "v_country_summary",
+    "v_trend_analysis",
+    "v_top_emitters",
+})
+
+
+def materialized_table_name(view_name: str) -> str:
+    """Return the backing table name for a materialized view."""
+    return "mv_" + view_name[len("v_"):]
+
 
 class ViewManager:
     """Manages creation and maintenance of database views."""
     
+    # View name -> definition, keyed by schema_cache_key
+    _views_cache: Dict[Tuple[str, int, int, int], Dict[str, str]] = {}
+    _views_cache_lock = threading.Lock()
+    
     def __init__(self, db_path: Optional[Path] = None):
         """
         Initialize view manager.
@@ -23,57 +57,158 @@ class ViewManager:
         """
         self.db_path = db_path or settings.sqlite_db_path
         
-    def create_all_views(self, connection: Optional[sqlite3.Connection] = None):
+        # One connection per thread, reused across calls instead of
+        # reopening the database (and replaying its setup) every time
+        self._tls = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        
+    def _get_conn(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+            conn.execute("PRAGMA busy_timeout = 5000")
+            conn.execute("PRAGMA journal_mode = WAL")
+            
+            self._tls.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+        
+    def close(self):
+        """Close every connection opened by this manager."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            
+        for conn in connections:
+            conn.close()
+            
+        self._tls = threading.local()
+        
+    def create_all_views(
+        self,
+        connection: Optional[sqlite3.Connection] = None,
+        materialized: bool = False
+    ):
         """
         Create all optimized views in the database.
         
         Args:
             connection: Optional database connection to use
+            materialized: Store the heavy aggregate views as indexed tables
         """
-        if connection is None:
-            connection = sqlite3.connect(self.db_path)
-            close_connection = True
-        else:
-            close_connection = False
-            
+        connection = connection or self._get_conn()
+        
         try:
-            cursor = connection.cursor()
-            
-            # Create each view
-            self._create_primary_forest_percentage_view(cursor)
-            self._create_carbon_intensity_view(cursor)
-            self._create_annual_summary_view(cursor)
-            self._create_country_summary_view(cursor)
-            self._create_trend_analysis_view(cursor)
-            self._create_top_emitters_view(cursor)
-            
-            connection.commit()
+            # All view DDL goes to SQLite as one script in one transaction
+            connection.executescript("\n".join([
+                "BEGIN;",
+                self._combined_intensity_view_sql(),
+                self._primary_forest_percentage_view_sql(),
+                self._carbon_intensity_view_sql(),
+                self._annual_summary_view_sql(),
+                self._country_summary_view_sql(materialized),
+                self._trend_analysis_view_sql(materialized),
+                self._top_emitters_view_sql(materialized),
+                "COMMIT;",
+            ]))
             logger.info("All database views created successfully")
             
         except Exception as e:
+            connection.rollback()
             logger.error(f"Failed to create views: {e}")
             raise
+        
+    def refresh_materialized_views(self, connection: Optional[sqlite3.Connection] = None):
+        """
+        Rebuild the materialized aggregate views from the fact tables.
+        
+        Each backing table is recreated and analyzed in a single transaction,
+        and the v_* view names are kept as thin views over them so callers
+        are unaffected. Run after every load.
+        
+        Args:
+            connection: Optional database connection to use
+        """
+        connection = connection or self._get_conn()
+        
+        try:
+            connection.executescript("\n".join([
+                "BEGIN IMMEDIATE;",
+                self._country_summary_view_sql(materialized=True),
+                self._trend_analysis_view_sql(materialized=True),
+                self._top_emitters_view_sql(materialized=True),
+                *(f"ANALYZE {materialized_table_name(view)};" for view in MATERIALIZED_VIEWS),
+                "COMMIT;",
+            ]))
+            logger.info(f"Refreshed {len(MATERIALIZED_VIEWS)} materialized views")
+            
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Failed to refresh materialized views: {e}")
+            raise
+        
+    def _view_ddl(self, view_name: str, select_sql: str, materialized: bool = False) -> str:
+        """
+        Build the script that (re)creates a view.
+        
+        Args:
+            view_name: Name of the view to create
+            select_sql: Query defining the view
+            materialized: Store the query result in an indexed table and
+                point the view at it
             
-        finally:
-            if close_connection:
-                connection.close()
+        Returns:
+            Semicolon-terminated DDL statements
+        """
+        select_sql = normalize_sql(select_sql)
+        statements = [f"DROP VIEW IF EXISTS {view_name}"]
+        
+        if view_name in MATERIALIZED_VIEWS:
+            table_name = materialized_table_name(view_name)
+            statements.append(f"DROP TABLE IF EXISTS {table_name}")
+            
+            if materialized:
+                index_columns = MATERIALIZED_VIEWS[view_name]
+                statements.append(f"CREATE TABLE {table_name} AS {select_sql}")
+                statements.append(
+                    f"CREATE INDEX {table_name}_{'_'.join(index_columns)} "
+                    f"ON {table_name} ({', '.join(index_columns)})"
+                )
+                select_sql = f"SELECT * FROM {table_name}"
                 
-    def _create_primary_forest_percentage_view(self, cursor: sqlite3.Cursor):
-        """Create view for primary forest percentage calculations."""
-        cursor.execute("DROP VIEW IF EXISTS v_primary_forest_percentage")
+        statements.append(f"CREATE VIEW {view_name} AS {select_sql}")
+        return ";\n".join(statements) + ";"
         
+    def _combined_intensity_view_sql(self) -> str:
+        """Build DDL for the view combining primary forest and carbon ratios."""
         sql = """
-        CREATE VIEW v_primary_forest_percentage AS
         SELECT 
             t.country,
             t.year,
+            t.threshold,
             t.tree_cover_loss_ha,
             p.primary_forest_loss_ha,
+            c.carbon_emissions_mg_co2e,
+            c.carbon_net_flux_annual_avg,
+            c.carbon_flux_status,
+            c.carbon_role,
+            c.country IS NOT NULL as has_carbon_data,
             CASE 
                 WHEN t.tree_cover_loss_ha > 0 
                 THEN ROUND((p.primary_forest_loss_ha / t.tree_cover_loss_ha) * 100, 2)
                 ELSE NULL 
             END as primary_percentage,
+            CASE 
+                WHEN t.tree_cover_loss_ha > 0 
+                THEN ROUND(c.carbon_emissions_mg_co2e / t.tree_cover_loss_ha, 2)
+                ELSE NULL 
+            END as carbon_per_hectare,
             CASE
                 WHEN t.tree_cover_loss_ha > 0 AND p.primary_forest_loss_ha > 0
                 THEN 'Both'
@@ -87,52 +222,52 @@ class ViewManager:
         LEFT JOIN fact_primary_forest p
             ON t.country = p.country 
             AND t.year = p.year
-        WHERE t.threshold = 30
+        LEFT JOIN fact_carbon c
+            ON t.country = c.country
+            AND t.year = c.year
+            AND t.threshold = c.threshold
         """
         
-        cursor.execute(sql)
-        logger.debug("Created v_primary_forest_percentage view")
-        
-    def _create_carbon_intensity_view(self, cursor: sqlite3.Cursor):
-        """Create view for carbon intensity calculations."""
-        cursor.execute("DROP VIEW IF EXISTS v_carbon_intensity")
+        return self._view_ddl("v_intensity", sql)
         
+    def _primary_forest_percentage_view_sql(self) -> str:
+        """Build DDL for the primary forest percentage view over v_intensity."""
         sql = """
-        CREATE VIEW v_carbon_intensity AS
         SELECT 
-            t.country,
-            t.year,
-            t.threshold,
-            t.tree_cover_loss_ha,
-            c.carbon_emissions_mg_co2e,
-            c.carbon_net_flux_annual_avg,
-            c.carbon_flux_status,
-            CASE 
-                WHEN t.tree_cover_loss_ha > 0 
-                THEN ROUND(c.carbon_emissions_mg_co2e / t.tree_cover_loss_ha, 2)
-                ELSE NULL 
-            END as carbon_per_hectare,
-            CASE
-                WHEN c.carbon_net_flux_annual_avg < 0 THEN 'Carbon Sink'
-                WHEN c.carbon_net_flux_annual_avg > 0 THEN 'Carbon Source'
-                ELSE 'Carbon Neutral'
-            END as carbon_role
-        FROM fact_tree_cover_loss t
-        INNER JOIN fact_carbon c
-            ON t.country = c.country
-            AND t.year = c.year
-            AND t.threshold = c.threshold
+            country,
+            year,
+            tree_cover_loss_ha,
+            primary_forest_loss_ha,
+            primary_percentage,
+            loss_type
+        FROM v_intensity
+        WHERE threshold = 30
         """
         
-        cursor.execute(sql)
-        logger.debug("Created v_carbon_intensity view")
+        return self._view_ddl("v_primary_forest_percentage", sql)
         
-    def _create_annual_summary_view(self, cursor: sqlite3.Cursor):
-        """Create view for annual summaries."""
-        cursor.execute("DROP VIEW IF EXISTS v_annual_summary")
+    def _carbon_intensity_view_sql(self) -> str:
+        """Build DDL for the carbon intensity view over v_intensity."""
+        sql = """
+        SELECT 
+            country,
+            year,
+            threshold,
+            tree_cover_loss_ha,
+            carbon_emissions_mg_co2e,
+            carbon_net_flux_annual_avg,
+            carbon_flux_status,
+            carbon_per_hectare,
+            carbon_role
+        FROM v_intensity
+        WHERE has_carbon_data
+        """
+        
+        return self._view_ddl("v_carbon_intensity", sql)
         
+    def _annual_summary_view_sql(self) -> str:
+        """Build DDL for the annual summary view."""
         sql = """
-        CREATE VIEW v_annual_summary AS
         SELECT 
             year,
             COUNT(DISTINCT country) as countries_reporting,
@@ -146,15 +281,11 @@ class ViewManager:
         GROUP BY year
         """
         
-        cursor.execute(sql)
-        logger.debug("Created v_annual_summary view")
-        
-    def _create_country_summary_view(self, cursor: sqlite3.Cursor):
-        """Create view for country-level summaries."""
-        cursor.execute("DROP VIEW IF EXISTS v_country_summary")
+        return self._view_ddl("v_annual_summary", sql)
         
+    def _country_summary_view_sql(self, materialized: bool = False) -> str:
+        """Build DDL for the country-level summary view."""
         sql = """
-        CREATE VIEW v_country_summary AS
         WITH country_stats AS (
             SELECT 
                 country,
@@ -201,15 +332,11 @@ class ViewManager:
         LEFT JOIN carbon_stats ca ON cs.country = ca.country
         """
         
-        cursor.execute(sql)
-        logger.debug("Created v_country_summary view")
-        
-    def _create_trend_analysis_view(self, cursor: sqlite3.Cursor):
-        """Create view for trend analysis."""
-        cursor.execute("DROP VIEW IF EXISTS v_trend_analysis")
+        return self._view_ddl("v_country_summary", sql, materialized)
         
+    def _trend_analysis_view_sql(self, materialized: bool = False) -> str:
+        """Build DDL for the trend analysis view."""
         sql = """
-        CREATE VIEW v_trend_analysis AS
         WITH yearly_data AS (
             SELECT 
                 country,
@@ -219,14 +346,25 @@ class ViewManager:
             WHERE threshold = 30
             GROUP BY country, year
         ),
+        -- (country, year, threshold) is the primary key, so yearly_data has
+        -- exactly one fact row per (country, year) and earlier years can be
+        -- looked up with index seeks instead of a sorted window
         lagged_data AS (
             SELECT 
-                country,
-                year,
-                annual_loss,
-                LAG(annual_loss, 1) OVER (PARTITION BY country ORDER BY year) as prev_year_loss,
-                LAG(annual_loss, 5) OVER (PARTITION BY country ORDER BY year) as five_year_ago_loss
-            FROM yearly_data
+                y.country,
+                y.year,
+                y.annual_loss,
+                p1.tree_cover_loss_ha as prev_year_loss,
+                p5.tree_cover_loss_ha as five_year_ago_loss
+            FROM yearly_data y
+            LEFT JOIN fact_tree_cover_loss p1
+                ON p1.threshold = 30
+                AND p1.country = y.country
+                AND p1.year = y.year - 1
+            LEFT JOIN fact_tree_cover_loss p5
+                ON p5.threshold = 30
+                AND p5.country = y.country
+                AND p5.year = y.year - 5
         )
         SELECT 
             country,
@@ -252,15 +390,11 @@ class ViewManager:
         FROM lagged_data
         """
         
-        cursor.execute(sql)
-        logger.debug("Created v_trend_analysis view")
-        
-    def _create_top_emitters_view(self, cursor: sqlite3.Cursor):
-        """Create view for top carbon emitters."""
-        cursor.execute("DROP VIEW IF EXISTS v_top_emitters")
+        return self._view_ddl("v_trend_analysis", sql, materialized)
         
+    def _top_emitters_view_sql(self, materialized: bool = False) -> str:
+        """Build DDL for the top carbon emitters view."""
         sql = """
-        CREATE VIEW v_top_emitters AS
         SELECT 
             c.country,
             c.year,
@@ -277,8 +411,7 @@ class ViewManager:
         GROUP BY c.country, c.year
         """
         
-        cursor.execute(sql)
-        logger.debug("Created v_top_emitters view")
+        return self._view_ddl("v_top_emitters", sql, materialized)
         
     def drop_all_views(self, connection: Optional[sqlite3.Connection] = None):
         """
@@ -287,34 +420,49 @@ class ViewManager:
         Args:
             connection: Optional database connection to use
         """
-        if connection is None:
-            connection = sqlite3.connect(self.db_path)
-            close_connection = True
-        else:
-            close_connection = False
-            
-        try:
-            cursor = connection.cursor()
-            
-            views = [
-                "v_primary_forest_percentage",
-                "v_carbon_intensity",
-                "v_annual_summary",
-                "v_country_summary",
-                "v_trend_analysis",
-                "v_top_emitters"
-            ]
+        connection = connection or self._get_conn()
+        
+        # Every view plus the tables backing materialized views
+        objects = connection.execute("""
+            SELECT type, name FROM sqlite_master
+            WHERE type = 'view'
+            OR (type = 'table' AND name LIKE 'mv\\_%' ESCAPE '\\')
+            ORDER BY CASE type WHEN 'view' THEN 0 ELSE 1 END
+        """).fetchall()
+        
+        connection.executescript(build_drop_script(objects))
+        logger.info("All views dropped successfully")
+        
+    def _view_definitions(self) -> Dict[str, str]:
+        """
+        Map every view in the database to its SQL definition.
+        
+        Results are cached until the schema version changes.
+        
+        Returns:
+            Dictionary of view name to CREATE VIEW statement, ordered by name
+        """
+        connection = self._get_conn()
+        
+        cache_key = schema_cache_key(connection)
+        with self._views_cache_lock:
+            cached = self._views_cache.get(cache_key)
+        if cached is not None:
+            return cached
             
-            for view in views:
-                cursor.execute(f"DROP VIEW IF EXISTS {view}")
-                
-            connection.commit()
-            logger.info("All views dropped successfully")
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT name, sql FROM sqlite_master 
+            WHERE type='view' 
+            ORDER BY name
+        """)
+        definitions = dict(cursor.fetchall())
+        
+        if cache_key is not None:
+            with self._views_cache_lock:
+                self._views_cache[cache_key] = definitions
+        return definitions
             
-        finally:
-            if close_connection:
-                connection.close()
-                
     def list_views(self) -> List[str]:
         """
         List all views in the database.
@@ -322,17 +470,7 @@ class ViewManager:
         Returns:
             List of view names
         """
-        connection = sqlite3.connect(self.db_path)
-        try:
-            cursor = connection.cursor()
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='view' 
-                ORDER BY name
-            """)
-            return [row[0] for row in cursor.fetchall()]
-        finally:
-            connection.close()
+        return list(self._view_definitions())
             
     def get_view_definition(self, view_name: str) -> str:
         """
@@ -344,44 +482,42 @@ class ViewManager:
         Returns:
             SQL definition of the view
         """
-        connection = sqlite3.connect(self.db_path)
-        try:
-            cursor = connection.cursor()
-            cursor.execute("""
-                SELECT sql FROM sqlite_master 
-                WHERE type='view' AND name=?
-            """, (view_name,))
-            result = cursor.fetchone()
-            return result[0] if result else ""
-        finally:
-            connection.close()
+        return self._view_definitions().get(view_name, "")
             
-    def query_view(self, view_name: str, limit: Optional[int] = None) -> List[Dict]:
+    def query_view(
+        self,
+        view_name: str,
+        limit: Optional[int] = None,
+        columnar: bool = False
+    ) -> Union[List[Dict], Dict[str, List]]:
         """
         Query a view and return results.
         
         Args:
             view_name: Name of the view to query
             limit: Optional limit on number of rows
+            columnar: Return one list per column instead of one dict per row
             
         Returns:
-            List of dictionaries with query results
-        """
-        connection = sqlite3.connect(self.db_path)
-        connection.row_factory = sqlite3.Row
-        
-        try:
-            cursor = connection.cursor()
+            List of dictionaries with query results, or a dictionary of
+            column name to values when columnar is set
             
-            sql = f"SELECT * FROM {view_name}"
-            if limit:
-                sql += f" LIMIT {limit}"
-                
-            cursor.execute(sql)
+        Raises:
+            ValueError: If view_name is not one of the managed views
+        """
+        if view_name not in ALLOWED_VIEWS:
+            raise ValueError(f"Unknown view: {view_name}")
             
-            # Convert to list of dicts
-            results = [dict(row) for row in cursor.fetchall()]
-            return results
+        cursor = self._get_conn().cursor()
+        
+        # One statement per view; the limit is bound so it stays cacheable
+        sql = f"SELECT * FROM {view_name} LIMIT ?"
+        cursor.execute(sql, (limit if limit is not None else -1,))
+        columns = [description[0] for description in cursor.description]
+        rows = cursor.fetchall()
+        
+        if columnar:
+            values = zip(*rows) if rows else ((),) * len(columns)
+            return {column: list(col_values) for column, col_values in zip(columns, values)}
             
-        finally:
-            connection.close()
\ No newline at end of file
+        return [dict(zip(columns, row)) for row in rows]
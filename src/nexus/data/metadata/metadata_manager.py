@@ -5,27 +5,90 @@
 Centralized metadata management system.
 Handles both semantic (static) and runtime (dynamic) metadata.
 """
-import json
+import atexit
 import logging
+import os
+import pickle
+import threading
+import weakref
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
-from dataclasses import dataclass, asdict
-import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+import orjson
 
 from nexus.config.settings import settings
 # Constants now loaded from semantic.json
 
 logger = logging.getLogger(__name__)
 
+# Indented like the hand-maintained files; tuples and datetimes are
+# serialized natively by orjson
+_JSON_OPTIONS = orjson.OPT_INDENT_2
+
+
+# Thresholds for tables that only have data at some of them; other tables
+# use the semantic metadata thresholds
+_TABLE_THRESHOLDS: Dict[str, Tuple[int, ...]] = {
+    "carbon": (30, 50, 75),
+    "primary_forest": (30,),
+}
+
+# Pickled SemanticMetadata reused while semantic.json is unchanged
+SEMANTIC_CACHE_FILE = "semantic.cache"
+# Bump when SemanticMetadata changes shape so older snapshots are ignored
+SEMANTIC_CACHE_VERSION = 4
+
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    """Identify a file's contents by modification time and size."""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+# One lock per target file so threads never interleave writes to it
+_write_locks: Dict[Path, threading.Lock] = {}
+_write_locks_guard = threading.Lock()
+
 
-@dataclass
+def _atomic_write_bytes(path: Path, data: bytes):
+    """
+    Replace a file's contents so readers see either the old or new file.
+    
+    The data is written and fsynced to a temporary file in the same
+    directory, then renamed over the target; a crash mid-write leaves the
+    previous file intact instead of a truncated one.
+    
+    Args:
+        path: File to write
+        data: Complete new contents
+    """
+    with _write_locks_guard:
+        lock = _write_locks.setdefault(path, threading.Lock())
+        
+    # Per-process temporary name so concurrent writers never share one
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with lock:
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+
+@dataclass(slots=True)
 class SemanticMetadata:
     """Static metadata about the data model and query patterns."""
     
     # Data model metadata
-    thresholds: List[int]
-    tropical_countries: set
+    thresholds: Tuple[int, ...]
+    tropical_countries: frozenset
     year_ranges: Dict[str, tuple]
     
     # Query patterns and mappings
@@ -38,18 +101,37 @@ class SemanticMetadata:
     join_conditions: Dict[str, List[str]]
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        data = asdict(self)
-        data['tropical_countries'] = list(self.tropical_countries)
-        return data
+        """Convert to dictionary for serialization (fields are not copied)."""
+        return {
+            'thresholds': self.thresholds,
+            'tropical_countries': sorted(self.tropical_countries),
+            'year_ranges': self.year_ranges,
+            'sql_templates': self.sql_templates,
+            'nl_column_mappings': self.nl_column_mappings,
+            'query_patterns': self.query_patterns,
+            'table_schemas': self.table_schemas,
+            'join_conditions': self.join_conditions,
+        }
+
+
+@dataclass(slots=True)
+class TableStats:
+    """Runtime statistics for one table, kept together for a single lookup."""
+    
+    row_count: int = 0
+    validation: str = "UNKNOWN"
+
+
+# Returned for tables without recorded statistics; never mutated
+_EMPTY_TABLE_STATS = TableStats()
 
 
-@dataclass
+@dataclass(slots=True)
 class RuntimeMetadata:
     """Dynamic metadata about system state and performance."""
     
     # Database statistics
-    row_counts: Dict[str, int]
+    tables: Dict[str, TableStats]
     last_update: datetime
     data_quality: Dict[str, float]
     
@@ -61,15 +143,82 @@ class RuntimeMetadata:
     # System state
     pipeline_version: str
     last_pipeline_run: Optional[datetime]
-    validation_status: Dict[str, str]
+    
+    @property
+    def row_counts(self) -> Dict[str, int]:
+        """Row count per table."""
+        return {name: stats.row_count for name, stats in self.tables.items()}
+    
+    def table_stats(self, table_name: str) -> TableStats:
+        """
+        Get the statistics entry for a table, creating it if needed.
+        
+        Args:
+            table_name: Name of the table
+            
+        Returns:
+            The table's TableStats, stored in tables
+        """
+        stats = self.tables.get(table_name)
+        if stats is None:
+            stats = self.tables[table_name] = TableStats()
+        return stats
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        data = asdict(self)
-        data['last_update'] = self.last_update.isoformat()
-        if self.last_pipeline_run:
-            data['last_pipeline_run'] = self.last_pipeline_run.isoformat()
-        return data
+        """Convert to dictionary for serialization (fields are not copied)."""
+        return {
+            'tables': {
+                name: {'row_count': stats.row_count, 'validation': stats.validation}
+                for name, stats in self.tables.items()
+            },
+            'last_update': self.last_update.isoformat(),
+            'data_quality': self.data_quality,
+            'avg_query_time': self.avg_query_time,
+            'cache_hit_rate': self.cache_hit_rate,
+            'error_rate': self.error_rate,
+            'pipeline_version': self.pipeline_version,
+            'last_pipeline_run': (
+                self.last_pipeline_run.isoformat() if self.last_pipeline_run else None
+            ),
+        }
+
+
+def _load_table_stats(data: Dict[str, Any]) -> Dict[str, TableStats]:
+    """
+    Read per-table statistics from a runtime.json document.
+    
+    Files written before statistics were grouped per table keep row counts
+    and validation results in separate row_counts and validation_status
+    mappings; those are merged into the same shape.
+    """
+    if 'tables' in data:
+        return {name: TableStats(**stats) for name, stats in data['tables'].items()}
+    
+    tables: Dict[str, TableStats] = {}
+    for name, row_count in data.get('row_counts', {}).items():
+        tables[name] = TableStats(row_count=row_count)
+    for name, validation in data.get('validation_status', {}).items():
+        tables.setdefault(name, TableStats()).validation = validation
+    return tables
+
+
+# Managers still alive, flushed at interpreter exit; weak so that exit
+# cleanup doesn't keep discarded managers around
+_live_managers: "weakref.WeakSet[MetadataManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_managers():
+    """Write buffered runtime statistics of every manager still alive at exit."""
+    for manager in list(_live_managers):
+        manager.flush()
+
+
+def _flush_if_alive(manager_ref: "weakref.ref[MetadataManager]"):
+    """Timer callback: flush the manager unless it has been discarded."""
+    manager = manager_ref()
+    if manager is not None:
+        manager.flush()
 
 
 class MetadataManager:
@@ -77,29 +226,27 @@ class MetadataManager:
     Centralized metadata management.
     
     This manager handles all metadata operations, providing a single source of truth
-    for both static configuration and runtime statistics.
+    for both static configuration and runtime statistics. Use
+    get_metadata_manager() for the shared process-wide instance.
     """
     
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls):
-        """Singleton pattern to ensure single metadata source."""
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
+    # Seconds runtime stat updates are buffered before being written
+    FLUSH_INTERVAL = 1.0
     
     def __init__(self):
         """Initialize metadata manager."""
-        if not hasattr(self, 'initialized'):
-            self.semantic: Optional[SemanticMetadata] = None
-            self.runtime: Optional[RuntimeMetadata] = None
-            self.metadata_dir = Path(settings.CONFIG_DIR) / "metadata"
-            self.metadata_dir.mkdir(parents=True, exist_ok=True)
-            self.initialized = True
-            self._load_metadata()
+        self.semantic: Optional[SemanticMetadata] = None
+        self.runtime: Optional[RuntimeMetadata] = None
+        self.metadata_dir = Path(settings.CONFIG_DIR) / "metadata"
+        self.metadata_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Runtime updates not yet written to runtime.json
+        self._dirty = False
+        self._flush_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        _live_managers.add(self)
+        
+        self._load_metadata()
     
     def _load_metadata(self):
         """Load both semantic and runtime metadata."""
@@ -110,32 +257,74 @@ class MetadataManager:
         """Load or create semantic metadata."""
         semantic_file = self.metadata_dir / "semantic.json"
         
-        if semantic_file.exists():
+        if not semantic_file.exists():
+            self._create_default_semantic_metadata()
+        elif not self._load_semantic_cache(semantic_file):
             try:
-                with open(semantic_file, 'r') as f:
-                    data = json.load(f)
-                    self.semantic = SemanticMetadata(
-                        thresholds=data['thresholds'],
-                        tropical_countries=set(data['tropical_countries']),
-                        year_ranges=data['year_ranges'],
-                        sql_templates=data['sql_templates'],
-                        nl_column_mappings=data['nl_column_mappings'],
-                        query_patterns=data['query_patterns'],
-                        table_schemas=data['table_schemas'],
-                        join_conditions=data['join_conditions']
-                    )
-                    logger.info("Loaded semantic metadata from file")
+                data = orjson.loads(semantic_file.read_bytes())
+                self.semantic = SemanticMetadata(
+                    thresholds=tuple(data['thresholds']),
+                    tropical_countries=frozenset(data['tropical_countries']),
+                    year_ranges=data['year_ranges'],
+                    sql_templates=data['sql_templates'],
+                    nl_column_mappings=data['nl_column_mappings'],
+                    query_patterns=data['query_patterns'],
+                    table_schemas=data['table_schemas'],
+                    join_conditions=data['join_conditions']
+                )
+                logger.info("Loaded semantic metadata from file")
+                self._save_semantic_cache(semantic_file)
             except Exception as e:
                 logger.error(f"Failed to load semantic metadata: {e}")
                 self._create_default_semantic_metadata()
-        else:
-            self._create_default_semantic_metadata()
+    
+    def _load_semantic_cache(self, semantic_file: Path) -> bool:
+        """
+        Load semantic metadata from the pickled snapshot of semantic.json.
+        
+        Args:
+            semantic_file: JSON file the snapshot was taken from
+            
+        Returns:
+            True if the snapshot matched the JSON file and was loaded
+        """
+        cache_file = self.metadata_dir / SEMANTIC_CACHE_FILE
+        if not cache_file.exists():
+            return False
+            
+        try:
+            version, signature, semantic = pickle.loads(cache_file.read_bytes())
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable semantic metadata cache: {e}")
+            return False
+            
+        if version != SEMANTIC_CACHE_VERSION or signature != _file_signature(semantic_file):
+            return False
+            
+        self.semantic = semantic
+        logger.info("Loaded semantic metadata from cache")
+        return True
+    
+    def _save_semantic_cache(self, semantic_file: Path):
+        """
+        Snapshot the loaded semantic metadata for the next process start.
+        
+        Args:
+            semantic_file: JSON file the metadata was loaded from
+        """
+        cache_file = self.metadata_dir / SEMANTIC_CACHE_FILE
+        try:
+            payload = (SEMANTIC_CACHE_VERSION, _file_signature(semantic_file), self.semantic)
+            _atomic_write_bytes(cache_file, pickle.dumps(payload, protocol=5))
+        except OSError as e:
+            # The cache is an optimization; read-only config dirs just skip it
+            logger.debug(f"Could not write semantic metadata cache: {e}")
     
     def _create_default_semantic_metadata(self):
         """Create default semantic metadata."""
         self.semantic = SemanticMetadata(
-            thresholds=[0, 10, 15, 20, 25, 30, 50, 75],
-            tropical_countries=set(),  # Will be loaded from semantic.json
+            thresholds=(0, 10, 15, 20, 25, 30, 50, 75),
+            tropical_countries=frozenset(),  # Will be loaded from semantic.json
             year_ranges={
                 "tree_cover": (2001, 2024),
                 "primary_forest": (2002, 2024),
@@ -174,21 +363,19 @@ class MetadataManager:
         
         if runtime_file.exists():
             try:
-                with open(runtime_file, 'r') as f:
-                    data = json.load(f)
-                    self.runtime = RuntimeMetadata(
-                        row_counts=data['row_counts'],
-                        last_update=datetime.fromisoformat(data['last_update']),
-                        data_quality=data['data_quality'],
-                        avg_query_time=data['avg_query_time'],
-                        cache_hit_rate=data['cache_hit_rate'],
-                        error_rate=data['error_rate'],
-                        pipeline_version=data['pipeline_version'],
-                        last_pipeline_run=datetime.fromisoformat(data['last_pipeline_run']) 
-                            if data.get('last_pipeline_run') else None,
-                        validation_status=data['validation_status']
-                    )
-                    logger.info("Loaded runtime metadata from file")
+                data = orjson.loads(runtime_file.read_bytes())
+                self.runtime = RuntimeMetadata(
+                    tables=_load_table_stats(data),
+                    last_update=datetime.fromisoformat(data['last_update']),
+                    data_quality=data['data_quality'],
+                    avg_query_time=data['avg_query_time'],
+                    cache_hit_rate=data['cache_hit_rate'],
+                    error_rate=data['error_rate'],
+                    pipeline_version=data['pipeline_version'],
+                    last_pipeline_run=datetime.fromisoformat(data['last_pipeline_run']) 
+                        if data.get('last_pipeline_run') else None
+                )
+                logger.info("Loaded runtime metadata from file")
             except Exception as e:
                 logger.error(f"Failed to load runtime metadata: {e}")
                 self._create_default_runtime_metadata()
@@ -198,10 +385,10 @@ class MetadataManager:
     def _create_default_runtime_metadata(self):
         """Create default runtime metadata."""
         self.runtime = RuntimeMetadata(
-            row_counts={
-                "fact_tree_cover_loss": 0,
-                "fact_primary_forest": 0,
-                "fact_carbon": 0
+            tables={
+                "fact_tree_cover_loss": TableStats(),
+                "fact_primary_forest": TableStats(),
+                "fact_carbon": TableStats()
             },
             last_update=datetime.now(),
             data_quality={
@@ -213,51 +400,73 @@ class MetadataManager:
             cache_hit_rate=0.0,
             error_rate=0.0,
             pipeline_version="1.0.0",
-            last_pipeline_run=None,
-            validation_status={
-                "fact_tree_cover_loss": "UNKNOWN",
-                "fact_primary_forest": "UNKNOWN", 
-                "fact_carbon": "UNKNOWN"
-            }
+            last_pipeline_run=None
         )
         self.save_runtime_metadata()
     
     def save_semantic_metadata(self):
         """Persist semantic metadata to disk."""
         semantic_file = self.metadata_dir / "semantic.json"
-        with open(semantic_file, 'w') as f:
-            json.dump(self.semantic.to_dict(), f, indent=2)
+        _atomic_write_bytes(
+            semantic_file,
+            orjson.dumps(self.semantic.to_dict(), option=_JSON_OPTIONS)
+        )
         logger.debug("Saved semantic metadata")
     
     def save_runtime_metadata(self):
         """Persist runtime metadata to disk."""
         runtime_file = self.metadata_dir / "runtime.json"
-        with open(runtime_file, 'w') as f:
-            json.dump(self.runtime.to_dict(), f, indent=2)
+        _atomic_write_bytes(
+            runtime_file,
+            orjson.dumps(self.runtime.to_dict(), option=_JSON_OPTIONS)
+        )
         logger.debug("Saved runtime metadata")
     
     def update_runtime_stats(self, stats: Dict[str, Any]):
         """
         Update runtime statistics.
         
+        Updates are applied in memory immediately and written to disk at
+        most once per FLUSH_INTERVAL; call flush() to write them now.
+        
         Args:
             stats: Dictionary of statistics to update
         """
-        if 'row_counts' in stats:
-            self.runtime.row_counts.update(stats['row_counts'])
-        
-        if 'validation_status' in stats:
-            self.runtime.validation_status.update(stats['validation_status'])
-        
-        if 'data_quality' in stats:
-            self.runtime.data_quality.update(stats['data_quality'])
-        
-        if 'pipeline_run' in stats:
-            self.runtime.last_pipeline_run = datetime.now()
-            self.runtime.pipeline_version = stats.get('version', '1.0.0')
-        
-        self.runtime.last_update = datetime.now()
-        self.save_runtime_metadata()
+        with self._flush_lock:
+            for table_name, row_count in stats.get('row_counts', {}).items():
+                self.runtime.table_stats(table_name).row_count = row_count
+            
+            for table_name, validation in stats.get('validation_status', {}).items():
+                self.runtime.table_stats(table_name).validation = validation
+            
+            if 'data_quality' in stats:
+                self.runtime.data_quality.update(stats['data_quality'])
+            
+            if 'pipeline_run' in stats:
+                self.runtime.last_pipeline_run = datetime.now()
+                self.runtime.pipeline_version = stats.get('version', '1.0.0')
+            
+            self.runtime.last_update = datetime.now()
+            self._dirty = True
+            
+            if self._flush_timer is None:
+                # Weak, so a pending flush doesn't keep a discarded manager alive
+                self._flush_timer = threading.Timer(
+                    self.FLUSH_INTERVAL, _flush_if_alive, [weakref.ref(self)]
+                )
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+                
+    def flush(self):
+        """Write buffered runtime statistics to disk, if there are any."""
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+                
+            if self._dirty:
+                self.save_runtime_metadata()
+                self._dirty = False
         
     def get_table_metadata(self, table_name: str) -> Dict[str, Any]:
         """
@@ -269,10 +478,11 @@ class MetadataManager:
         Returns:
             Table metadata including schema and statistics
         """
+        stats = self.runtime.tables.get(table_name, _EMPTY_TABLE_STATS)
         return {
             "schema": self.semantic.table_schemas.get(table_name, {}),
-            "row_count": self.runtime.row_counts.get(table_name, 0),
-            "validation": self.runtime.validation_status.get(table_name, "UNKNOWN")
+            "row_count": stats.row_count,
+            "validation": stats.validation
         }
     
     def get_query_patterns(self, intent: str) -> List[str]:
@@ -311,7 +521,7 @@ class MetadataManager:
         """
         return country in self.semantic.tropical_countries
     
-    def get_valid_thresholds(self, table_type: str = "tree_cover") -> List[int]:
+    def get_valid_thresholds(self, table_type: str = "tree_cover") -> Tuple[int, ...]:
         """
         Get valid thresholds for a table type.
         
@@ -319,14 +529,9 @@ class MetadataManager:
             table_type: Type of table
             
         Returns:
-            List of valid thresholds
+            Tuple of valid thresholds (shared, not copied)
         """
-        if table_type == "carbon":
-            return [30, 50, 75]
-        elif table_type == "primary_forest":
-            return [30]
-        else:
-            return self.semantic.thresholds
+        return _TABLE_THRESHOLDS.get(table_type, self.semantic.thresholds)
     
     def get_performance_metrics(self) -> Dict[str, float]:
         """Get current performance metrics."""
@@ -337,5 +542,11 @@ class MetadataManager:
         }
 
 
+@lru_cache(maxsize=1)
+def get_metadata_manager() -> MetadataManager:
+    """Return the process-wide MetadataManager, created on first use."""
+    return MetadataManager()
+
+
 # Global singleton instance
-metadata_manager = MetadataManager()
\ No newline at end of file
+metadata_manager = get_metadata_manager()
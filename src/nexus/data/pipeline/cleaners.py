@@ -3,11 +3,166 @@ Data cleaning operations for Global Forest Watch data.
 Simplified version - no artificial filling of NULLs.
 """
 import logging
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
 import polars as pl
 
 logger = logging.getLogger(__name__)
 
+# Country name mappings for standardization
+COUNTRY_MAPPINGS: Dict[str, str] = {
+    # Common variations
+    "USA": "United States",
+    "US": "United States",
+    "United States of America": "United States",
+    "UK": "United Kingdom",
+    "Britain": "United Kingdom",
+    "DRC": "Democratic Republic of the Congo",
+    "Congo, Dem. Rep.": "Democratic Republic of the Congo",
+    "CAR": "Central African Republic",
+    
+    # Regional variations
+    "Burma": "Myanmar",
+    "Holland": "Netherlands",
+    
+    # Spelling variations
+    "Cote d'Ivoire": "Côte d'Ivoire",
+    "Ivory Coast": "Côte d'Ivoire",
+    
+    # Territory corrections
+    "French Guyana": "French Guiana",
+    "Virgin Islands": "U.S. Virgin Islands",
+}
+
+VALID_THRESHOLDS = (0, 10, 15, 20, 25, 30, 50, 75)
+
+# Membership set for is_in, converted to Arrow once at import; imploded so it
+# is matched as one collection rather than element-wise
+_VALID_THRESHOLDS_SET = pl.Series("threshold", VALID_THRESHOLDS).implode()
+
+# Snap lookup: a value at or below _THRESHOLD_MIDPOINTS[i] (and above the
+# previous midpoint) rounds to _VALID_THRESHOLDS_ARRAY[i]
+_VALID_THRESHOLDS_ARRAY = np.array(VALID_THRESHOLDS)
+_THRESHOLD_MIDPOINTS = (_VALID_THRESHOLDS_ARRAY[:-1] + _VALID_THRESHOLDS_ARRAY[1:]) / 2
+
+
+def _country_replacements(countries: pl.Series) -> Tuple[Dict[str, str], int]:
+    """
+    Work out country name standardization on the distinct names only.
+    
+    Args:
+        countries: Country column to standardize
+        
+    Returns:
+        Mapping of each name that changes to its standard form (empty when
+        the column is already clean), and the number of name variations
+        merged away
+    """
+    distinct = countries.unique().drop_nulls()
+    cleaned = distinct.str.strip_chars().replace(COUNTRY_MAPPINGS)
+    
+    replacements = {
+        old: new for old, new in zip(distinct.to_list(), cleaned.to_list()) if old != new
+    }
+    return replacements, distinct.len() - cleaned.n_unique()
+
+
+def _negative_check_columns(available: List[str], columns: List[str]) -> List[str]:
+    """Select the requested columns that exist and must not be negative."""
+    checked = []
+    for col in columns:
+        if col not in available:
+            continue
+            
+        # CRITICAL: Skip columns that can legitimately be negative
+        if "net_flux" in col or "removals" in col:
+            logger.debug(f"Skipping {col} - negative values are valid (carbon sinks)")
+            continue
+            
+        checked.append(col)
+    return checked
+
+
+# Expressions are immutable, so each builder below runs once per distinct
+# argument and every cleaner reuses the result
+
+@lru_cache(maxsize=None)
+def _null_negatives_expr(col: str) -> pl.Expr:
+    """Convert negative values to null (not 0!)."""
+    return pl.when(pl.col(col) < 0).then(None).otherwise(pl.col(col)).alias(col)
+
+
+def _cap_expr(col: str, mask: pl.Expr, capped: pl.Expr) -> pl.Expr:
+    """Replace values matching a limit's mask with the capped value."""
+    return pl.when(mask).then(capped).otherwise(pl.col(col)).alias(col)
+
+
+@lru_cache(maxsize=32)
+def _impossible_value_caps(available: Tuple[str, ...]) -> Tuple[Tuple[str, pl.Expr, pl.Expr, str], ...]:
+    """
+    Build the limits that apply to a frame's columns.
+    
+    Args:
+        available: Column names of the frame
+        
+    Returns:
+        (column, mask, capping expression, description) for each applicable
+        limit
+    """
+    caps = []
+    
+    # Cap tree cover loss at extent
+    if "tree_cover_loss_ha" in available and "extent_2000_ha" in available:
+        # Find cases where loss > extent (physically impossible); a null loss
+        # compares as null, which neither counts nor caps
+        mask = (
+            (pl.col("tree_cover_loss_ha") > pl.col("extent_2000_ha")) &
+            (pl.col("extent_2000_ha") > 0)
+        )
+        caps.append(("tree_cover_loss_ha", mask,
+                     _cap_expr("tree_cover_loss_ha", mask, pl.col("extent_2000_ha")),
+                     "cases where loss exceeds extent"))
+        
+    # Cap loss rate at 100%
+    if "loss_rate_pct" in available:
+        mask = pl.col("loss_rate_pct") > 100
+        caps.append(("loss_rate_pct", mask,
+                     _cap_expr("loss_rate_pct", mask, pl.lit(100.0)),
+                     "loss rates above 100%"))
+        
+    return tuple(caps)
+
+
+@lru_cache(maxsize=None)
+def _invalid_threshold_mask() -> pl.Expr:
+    """Rows whose threshold is not one of VALID_THRESHOLDS."""
+    return ~pl.col("threshold").is_in(_VALID_THRESHOLDS_SET)
+
+
+def _snap_thresholds(thresholds: pl.Series) -> pl.Series:
+    """Round every value to the nearest valid threshold, ties going down."""
+    # One binary search per value over the midpoints between neighbours
+    positions = np.searchsorted(_THRESHOLD_MIDPOINTS, thresholds.to_numpy(), side="left")
+    return pl.Series(thresholds.name, _VALID_THRESHOLDS_ARRAY[positions]).cast(thresholds.dtype)
+
+
+@lru_cache(maxsize=None)
+def _snapped_threshold_expr() -> pl.Expr:
+    """Round invalid thresholds to the nearest valid one."""
+    return (
+        pl.when(_invalid_threshold_mask())
+        .then(pl.col("threshold").map_batches(_snap_thresholds))
+        .otherwise(pl.col("threshold"))
+        .alias("threshold")
+    )
+
+
+@lru_cache(maxsize=32)
+def _valid_year_mask(min_year: int, max_year: int) -> pl.Expr:
+    """Rows whose year lies within the inclusive range."""
+    return (pl.col("year") >= min_year) & (pl.col("year") <= max_year)
+
 
 class DataCleaner:
     """Clean and fix data quality issues in forest data."""
@@ -21,6 +176,103 @@ class DataCleaner:
             "duplicates_removed": 0
         }
         
+    def clean(
+        self,
+        df: pl.DataFrame,
+        negative_columns: Optional[List[str]] = None,
+        deduplicate_on: Optional[List[str]] = None,
+        min_year: int = 2001,
+        max_year: int = 2024
+    ) -> pl.DataFrame:
+        """
+        Run the cleaning steps as one lazy query.
+        
+        Applies, where their columns exist, the same steps as
+        clean_country_names, fix_negative_values, cap_impossible_values,
+        validate_thresholds and validate_years, in that order, then
+        remove_duplicates if deduplicate_on is given. Polars optimizes the
+        steps together and the result and cleaning statistics are
+        materialized in a single collect.
+        
+        Args:
+            df: DataFrame to clean
+            negative_columns: Columns where negative values are invalid
+            deduplicate_on: Key columns for duplicate removal, None to keep
+                duplicates
+            min_year: Minimum valid year
+            max_year: Maximum valid year
+            
+        Returns:
+            Cleaned DataFrame
+        """
+        columns = df.columns
+        lf = df.lazy()
+        # Scalar statistics, each a one-cell query over an intermediate stage
+        stats: Dict[str, pl.LazyFrame] = {}
+        
+        countries_standardized = 0
+        if "country" in columns:
+            replacements, countries_standardized = _country_replacements(df["country"])
+            if replacements:
+                lf = lf.with_columns(pl.col("country").replace(replacements))
+            
+        checked = _negative_check_columns(columns, negative_columns or [])
+        if checked:
+            stats["negative_values_fixed"] = lf.select(
+                pl.sum_horizontal([(pl.col(col) < 0).sum() for col in checked])
+            )
+            lf = lf.with_columns([_null_negatives_expr(col) for col in checked])
+            
+        caps = _impossible_value_caps(tuple(columns))
+        if caps:
+            stats["impossible_values_capped"] = lf.select(
+                pl.sum_horizontal([mask.sum() for _, mask, _, _ in caps])
+            )
+            lf = lf.with_columns([cap_expr for _, _, cap_expr, _ in caps])
+            
+        if "threshold" in columns:
+            stats["invalid_thresholds"] = lf.select(_invalid_threshold_mask().sum())
+            lf = lf.with_columns(_snapped_threshold_expr())
+            
+        if "year" in columns:
+            stats["rows_before_year_filter"] = lf.select(pl.len())
+            lf = lf.filter(_valid_year_mask(min_year, max_year))
+            
+        if deduplicate_on:
+            stats["rows_before_deduplication"] = lf.select(pl.len())
+            lf = lf.unique(subset=deduplicate_on, maintain_order=True)
+            
+        # Shared stages are computed once across the statistics and the result
+        *stat_frames, result = pl.collect_all([*stats.values(), lf])
+        values = {name: frame.item() for name, frame in zip(stats, stat_frames)}
+        
+        self.cleaning_stats = {
+            "countries_standardized": countries_standardized,
+            "negative_values_fixed": values.get("negative_values_fixed", 0),
+            "impossible_values_capped": values.get("impossible_values_capped", 0),
+            "duplicates_removed": (
+                values["rows_before_deduplication"] - result.height if deduplicate_on else 0
+            ),
+        }
+        
+        if self.cleaning_stats["countries_standardized"] > 0:
+            logger.info(f"Standardized {self.cleaning_stats['countries_standardized']} country name variations")
+        if self.cleaning_stats["negative_values_fixed"] > 0:
+            logger.warning(f"Converted {self.cleaning_stats['negative_values_fixed']} negative values to NULL")
+        if self.cleaning_stats["impossible_values_capped"] > 0:
+            logger.warning(f"Capped {self.cleaning_stats['impossible_values_capped']} impossible values")
+        if values.get("invalid_thresholds", 0) > 0:
+            logger.warning(f"Found {values['invalid_thresholds']} rows with invalid thresholds")
+        if "rows_before_year_filter" in values:
+            rows_after_years = values.get("rows_before_deduplication", result.height)
+            removed = values["rows_before_year_filter"] - rows_after_years
+            if removed > 0:
+                logger.warning(f"Removed {removed} rows with years outside range {min_year}-{max_year}")
+        if self.cleaning_stats["duplicates_removed"] > 0:
+            logger.warning(f"Removed {self.cleaning_stats['duplicates_removed']} duplicate rows")
+            
+        return result
+        
     def clean_country_names(self, df: pl.DataFrame) -> pl.DataFrame:
         """
         Standardize country names across datasets.
@@ -35,49 +287,13 @@ class DataCleaner:
             logger.warning("No 'country' column found to clean")
             return df
             
-        # Country name mappings for standardization
-        country_mappings = {
-            # Common variations
-            "USA": "United States",
-            "US": "United States",
-            "United States of America": "United States",
-            "UK": "United Kingdom",
-            "Britain": "United Kingdom",
-            "DRC": "Democratic Republic of the Congo",
-            "Congo, Dem. Rep.": "Democratic Republic of the Congo",
-            "CAR": "Central African Republic",
-            
-            # Regional variations
-            "Burma": "Myanmar",
-            "Holland": "Netherlands",
-            
-            # Spelling variations
-            "Cote d'Ivoire": "Côte d'Ivoire",
-            "Ivory Coast": "Côte d'Ivoire",
-            
-            # Territory corrections
-            "French Guyana": "French Guiana",
-            "Virgin Islands": "U.S. Virgin Islands",
-        }
-        
-        # Apply mappings
-        original_countries = df["country"].n_unique()
-        
-        for old_name, new_name in country_mappings.items():
-            df = df.with_columns(
-                pl.when(pl.col("country") == old_name)
-                .then(pl.lit(new_name))
-                .otherwise(pl.col("country"))
-                .alias("country")
-            )
-    
-        # Trim whitespace only
-        df = df.with_columns(
-            pl.col("country").str.strip_chars().alias("country")
-        )
-        
-        new_countries = df["country"].n_unique()
-        self.cleaning_stats["countries_standardized"] = original_countries - new_countries
+        # Trimming and mapping run over the few distinct names; the full
+        # column is only rewritten when some of them change
+        replacements, standardized = _country_replacements(df["country"])
+        if replacements:
+            df = df.with_columns(pl.col("country").replace(replacements))
+            
+        self.cleaning_stats["countries_standardized"] = standardized
         
         if self.cleaning_stats["countries_standardized"] > 0:
             logger.info(f"Standardized {self.cleaning_stats['countries_standardized']} country name variations")
@@ -97,33 +313,26 @@ class DataCleaner:
         Returns:
             Cleaned DataFrame with invalid negatives converted to NULL
         """
+        checked = _negative_check_columns(df.columns, columns)
+        if not checked:
+            self.cleaning_stats["negative_values_fixed"] = 0
+            return df
+            
+        # Count invalid negatives in every column with one aggregation
+        counts = df.select([(pl.col(col) < 0).sum().alias(col) for col in checked]).row(0)
         negative_count = 0
+        negative_cols = []
         
-        for col in columns:
-            if col not in df.columns:
-                continue
-                
-            # CRITICAL: Skip columns that can legitimately be negative
-            if "net_flux" in col or "removals" in col:
-                logger.debug(f"Skipping {col} - negative values are valid (carbon sinks)")
-                continue
-                
-            # Count and fix invalid negatives
-            neg_mask = (pl.col(col) < 0) & pl.col(col).is_not_null()
-            count = df.filter(neg_mask).height
-            
+        for col, count in zip(checked, counts):
             if count > 0:
                 logger.warning(f"Found {count} negative values in {col}, converting to NULL")
                 negative_count += count
+                negative_cols.append(col)
                 
-                # Convert negative to null (not 0!)
-                df = df.with_columns(
-                    pl.when(pl.col(col) < 0)
-                    .then(None)
-                    .otherwise(pl.col(col))
-                    .alias(col)
-                )
-                
+        # Convert negative to null (not 0!), all columns in one pass
+        if negative_cols:
+            df = df.with_columns([_null_negatives_expr(col) for col in negative_cols])
+            
         self.cleaning_stats["negative_values_fixed"] = negative_count
         return df
         
@@ -139,44 +348,22 @@ class DataCleaner:
         Returns:
             Cleaned DataFrame with capped values
         """
+        caps = _impossible_value_caps(tuple(df.columns))
         capped_count = 0
         
-        # Cap tree cover loss at extent
-        if "tree_cover_loss_ha" in df.columns and "extent_2000_ha" in df.columns:
-            # Find cases where loss > extent (physically impossible)
-            mask = (
-                (pl.col("tree_cover_loss_ha") > pl.col("extent_2000_ha")) &
-                (pl.col("extent_2000_ha") > 0) &
-                pl.col("tree_cover_loss_ha").is_not_null()
-            )
+        if caps:
+            # Count every violation with one aggregation instead of filtering
+            counts = df.select([mask.sum().alias(col) for col, mask, _, _ in caps]).row(0)
             
-            count = df.filter(mask).height
-            if count > 0:
-                logger.warning(f"Capping {count} cases where loss exceeds extent")
-                capped_count += count
-                
-                df = df.with_columns(
-                    pl.when(mask)
-                    .then(pl.col("extent_2000_ha"))
-                    .otherwise(pl.col("tree_cover_loss_ha"))
-                    .alias("tree_cover_loss_ha")
-                )
-                
-        # Cap loss rate at 100%
-        if "loss_rate_pct" in df.columns:
-            mask = pl.col("loss_rate_pct") > 100
-            count = df.filter(mask).height
-            
-            if count > 0:
-                logger.warning(f"Capping {count} loss rates above 100%")
-                capped_count += count
-                
-                df = df.with_columns(
-                    pl.when(mask)
-                    .then(100.0)
-                    .otherwise(pl.col("loss_rate_pct"))
-                    .alias("loss_rate_pct")
-                )
+            cap_exprs = []
+            for (col, mask, cap_expr, description), count in zip(caps, counts):
+                if count > 0:
+                    logger.warning(f"Capping {count} {description}")
+                    capped_count += count
+                    cap_exprs.append(cap_expr)
+                    
+            if cap_exprs:
+                df = df.with_columns(cap_exprs)
                 
         self.cleaning_stats["impossible_values_capped"] = capped_count
         return df
@@ -192,14 +379,14 @@ class DataCleaner:
         Returns:
             DataFrame without duplicates
         """
-        original_rows = len(df)
+        original_rows = df.height
         
         if subset:
             df = df.unique(subset=subset, maintain_order=True)
         else:
             df = df.unique(maintain_order=True)
             
-        duplicates_removed = original_rows - len(df)
+        duplicates_removed = original_rows - df.height
         self.cleaning_stats["duplicates_removed"] = duplicates_removed
         
         if duplicates_removed > 0:
@@ -220,27 +407,14 @@ class DataCleaner:
         if "threshold" not in df.columns:
             return df
             
-        valid_thresholds = [0, 10, 15, 20, 25, 30, 50, 75]
-        
         # Check for invalid thresholds
-        invalid_mask = ~pl.col("threshold").is_in(valid_thresholds)
-        invalid_count = df.filter(invalid_mask).height
+        invalid_count = df.select(_invalid_threshold_mask().sum()).item()
         
         if invalid_count > 0:
             logger.warning(f"Found {invalid_count} rows with invalid thresholds")
             
             # Round to nearest valid threshold
-            df = df.with_columns(
-                pl.when(invalid_mask)
-                .then(
-                    pl.col("threshold").map_elements(
-                        lambda x: min(valid_thresholds, key=lambda v: abs(v - x) if x is not None else float('inf')),
-                        return_dtype=pl.Int32
-                    )
-                )
-                .otherwise(pl.col("threshold"))
-                .alias("threshold")
-            )
+            df = df.with_columns(_snapped_threshold_expr())
             
         return df
         
@@ -260,18 +434,60 @@ class DataCleaner:
             return df
             
         # Filter to valid year range
-        original_rows = len(df)
-        df = df.filter(
-            (pl.col("year") >= min_year) & 
-            (pl.col("year") <= max_year)
-        )
+        original_rows = df.height
+        df = df.filter(_valid_year_mask(min_year, max_year))
         
-        removed = original_rows - len(df)
+        removed = original_rows - df.height
         if removed > 0:
             logger.warning(f"Removed {removed} rows with years outside range {min_year}-{max_year}")
             
         return df
         
+    def finalize(
+        self,
+        df: pl.DataFrame,
+        subset: Optional[List[str]] = None,
+        min_year: int = 2001,
+        max_year: int = 2024
+    ) -> pl.DataFrame:
+        """
+        Remove rows with invalid years and then duplicates in one lazy pass.
+        
+        Same result as validate_years followed by remove_duplicates, but the
+        year predicate is applied before the unique() hash table is built so
+        out-of-range rows are never hashed.
+        
+        Args:
+            df: DataFrame to clean
+            subset: Columns to consider for duplicates (None = all columns)
+            min_year: Minimum valid year
+            max_year: Maximum valid year
+            
+        Returns:
+            DataFrame with valid years and without duplicates
+        """
+        lf = df.lazy()
+        if "year" in df.columns:
+            lf = lf.filter(_valid_year_mask(min_year, max_year))
+            
+        in_range, result = pl.collect_all([
+            lf.select(pl.len()),
+            lf.unique(subset=subset or None, maintain_order=True),
+        ])
+        in_range_rows = in_range.item()
+        
+        removed = df.height - in_range_rows
+        if removed > 0:
+            logger.warning(f"Removed {removed} rows with years outside range {min_year}-{max_year}")
+            
+        duplicates_removed = in_range_rows - result.height
+        self.cleaning_stats["duplicates_removed"] = duplicates_removed
+        
+        if duplicates_removed > 0:
+            logger.warning(f"Removed {duplicates_removed} duplicate rows")
+            
+        return result
+        
     def get_cleaning_summary(self) -> Dict[str, Any]:
         """
         Get summary of cleaning operations performed.
@@ -301,7 +517,7 @@ class DataCleaner:
             # Check all columns
             complete_df = df.drop_nulls()
             
-        removed = len(df) - len(complete_df)
-        logger.info(f"Filtered to complete cases: {len(complete_df)} rows ({removed} removed)")
+        removed = df.height - complete_df.height
+        logger.info(f"Filtered to complete cases: {complete_df.height} rows ({removed} removed)")
         
         return complete_df
\ No newline at end of file
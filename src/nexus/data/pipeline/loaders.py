@@ -3,14 +3,55 @@ Excel data loader for Global Forest Watch data.
 Uses Polars for efficient data loading and caching.
 """
 import logging
+import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional, List
 import polars as pl
 
 from nexus.config.settings import settings
 
+try:
+    import fastexcel
+except ImportError:  # Optional: pip install nexus[excel]
+    fastexcel = None
+
 logger = logging.getLogger(__name__)
 
+# calamine (Rust, via fastexcel) reads straight into Arrow; openpyxl builds
+# Python objects for every cell first and is only used as a fallback
+EXCEL_ENGINE = "calamine" if fastexcel is not None else "openpyxl"
+
+# First 4-digit number in a column name
+_YEAR_RE = re.compile(r'(\d{4})')
+# Directory, next to the workbook, holding Parquet copies of parsed sheets
+PARQUET_CACHE_DIR = ".nexus_cache"
+
+# Column names mentioning a year (19xx or 20xx); not capped at the latest data year
+_YEAR_IN_COL_RE = re.compile(r'(?:19|20)\d{2}')
+
+
+def list_sheet_names(excel_path: Path) -> List[str]:
+    """
+    List the sheet names of a workbook without reading any cells.
+    
+    Args:
+        excel_path: Path to the Excel file
+        
+    Returns:
+        Sheet names in workbook order
+    """
+    if fastexcel is not None:
+        return list(fastexcel.read_excel(excel_path).sheet_names)
+    
+    # Sheet names live in xl/workbook.xml; shared strings and styles are not needed
+    with zipfile.ZipFile(excel_path) as archive:
+        root = ET.fromstring(archive.read("xl/workbook.xml"))
+    return [sheet.get("name") for sheet in root.iterfind("{*}sheets/{*}sheet")]
+
 
 class ExcelLoader:
     """Loads Global Forest Watch Excel data with caching."""
@@ -21,12 +62,14 @@ class ExcelLoader:
         "Country carbon data"
     ]
     
-    def __init__(self, excel_path: Optional[Path] = None):
+    def __init__(self, excel_path: Optional[Path] = None, parquet_cache: bool = True):
         """
         Initialize Excel loader.
         
         Args:
             excel_path: Path to Excel file. If None, uses default from settings.
+            parquet_cache: Keep a Parquet copy of each parsed sheet next to the
+                workbook and read it instead of the workbook while it is unchanged.
         """
         if excel_path is None:
             excel_path = settings.raw_data_path / settings.excel_file
@@ -36,17 +79,14 @@ class ExcelLoader:
             
         self.excel_path = excel_path
         self._cache: Dict[str, pl.DataFrame] = {}
+        self._cache_lock = threading.Lock()
+        self._cache_dir = excel_path.parent / PARQUET_CACHE_DIR if parquet_cache else None
         self._validate_excel_structure()
         
     def _validate_excel_structure(self):
         """Validate that Excel file has required sheets."""
         try:
-            # Use openpyxl to check sheet names (no pandas needed)
-            from openpyxl import load_workbook
-            
-            wb = load_workbook(self.excel_path, read_only=True, data_only=True)
-            available_sheets = wb.sheetnames
-            wb.close()
+            available_sheets = list_sheet_names(self.excel_path)
             
             missing_sheets = set(self.REQUIRED_SHEETS) - set(available_sheets)
             if missing_sheets:
@@ -61,12 +101,63 @@ class ExcelLoader:
             logger.error(f"Failed to validate Excel structure: {e}")
             raise
             
+    def _parquet_cache_file(self, sheet_name: str) -> Optional[Path]:
+        """
+        Path of the Parquet copy of a sheet for the workbook as it is now.
+        
+        The workbook's modification time and size are part of the file name,
+        so editing the workbook makes older copies unreachable.
+        """
+        if self._cache_dir is None:
+            return None
+        
+        stat = self.excel_path.stat()
+        sheet_slug = re.sub(r'\W+', '_', sheet_name).strip('_').lower()
+        return self._cache_dir / (
+            f"{self.excel_path.stem}_{sheet_slug}_{stat.st_mtime_ns}_{stat.st_size}.parquet"
+        )
+        
+    def _write_parquet_cache(self, df: pl.DataFrame, cache_file: Path):
+        """Store a parsed sheet as Parquet, replacing copies of older workbook versions."""
+        try:
+            self._cache_dir.mkdir(exist_ok=True)
+            prefix = cache_file.name.rsplit('_', 2)[0]
+            for stale in self._cache_dir.glob(f"{prefix}_*.parquet"):
+                if stale.name.rsplit('_', 2)[0] == prefix:
+                    stale.unlink()
+            
+            tmp_file = cache_file.with_suffix(".tmp")
+            df.write_parquet(tmp_file, compression="zstd", compression_level=1)
+            tmp_file.replace(cache_file)
+            logger.debug(f"Wrote Parquet cache: {cache_file}")
+        except OSError as e:
+            # The cache only saves time; loading still succeeded
+            logger.warning(f"Could not write Parquet cache {cache_file}: {e}")
+            
     def load_sheet(self, sheet_name: str, use_cache: bool = True) -> pl.DataFrame:
-        """Load and cache an Excel sheet."""
+        """
+        Load and cache an Excel sheet.
+        
+        Args:
+            sheet_name: Name of the sheet to load
+            use_cache: Reuse the in-memory or Parquet copy if there is one;
+                False always re-reads the workbook (and refreshes the Parquet copy)
+                
+        Returns:
+            Sheet contents as a DataFrame
+        """
         if use_cache and sheet_name in self._cache:
             logger.debug(f"Using cached data for sheet: {sheet_name}")
             return self._cache[sheet_name]
             
+        cache_file = self._parquet_cache_file(sheet_name)
+        if use_cache and cache_file is not None and cache_file.exists():
+            logger.info(f"Loading sheet from Parquet cache: {sheet_name}")
+            df = pl.read_parquet(cache_file, memory_map=True)
+            with self._cache_lock:
+                self._cache[sheet_name] = df
+            return df
+            
         logger.info(f"Loading sheet: {sheet_name}")
         
         try:
@@ -74,15 +165,19 @@ class ExcelLoader:
             df = pl.read_excel(
                 source=self.excel_path,
                 sheet_name=sheet_name,
-                engine='openpyxl'
+                engine=EXCEL_ENGINE
             )
             
             # Validate
             if df.is_empty():
                 raise ValueError(f"Sheet {sheet_name} is empty")
                 
+            if cache_file is not None:
+                self._write_parquet_cache(df, cache_file)
+                
             # Cache the result
-            self._cache[sheet_name] = df
+            with self._cache_lock:
+                self._cache[sheet_name] = df
             
             logger.info(
                 f"Loaded {len(df):,} rows × {len(df.columns)} columns "
@@ -111,13 +206,18 @@ class ExcelLoader:
         """
         Load all required sheets.
         
+        The sheets are independent, so they are read concurrently; the Excel
+        and Parquet readers do most of their work outside the GIL.
+        
         Returns:
             Dictionary mapping sheet names to DataFrames
         """
-        result = {}
-        for sheet_name in self.REQUIRED_SHEETS:
-            result[sheet_name] = self.load_sheet(sheet_name)
-        return result
+        with ThreadPoolExecutor(max_workers=len(self.REQUIRED_SHEETS)) as executor:
+            futures = {
+                sheet_name: executor.submit(self.load_sheet, sheet_name)
+                for sheet_name in self.REQUIRED_SHEETS
+            }
+            return {sheet_name: future.result() for sheet_name, future in futures.items()}
         
     def get_sheet_info(self, sheet_name: str) -> Dict:
         """
@@ -129,10 +229,7 @@ class ExcelLoader:
         df = self.load_sheet(sheet_name)
         
         # Identify year columns
-        year_columns = [
-            col for col in df.columns 
-            if any(year_str in col for year_str in [str(y) for y in range(2000, 2026)])
-        ]
+        year_columns = [col for col in df.columns if _YEAR_IN_COL_RE.search(col)]
         
         # Identify static columns
         static_columns = [col for col in df.columns if col not in year_columns]
@@ -144,7 +241,7 @@ class ExcelLoader:
             "static_columns": len(static_columns),
             "years_range": self._extract_year_range(year_columns),
             "column_names": df.columns[:10],  # First 10 columns as sample
-            "null_counts": {col: df[col].null_count() for col in df.columns[:5]},
+            "null_counts": df.select(df.columns[:5]).null_count().row(0, named=True),
         }
         
     def _extract_year_range(self, year_columns: List[str]) -> Optional[tuple]:
@@ -152,8 +249,7 @@ class ExcelLoader:
         years = []
         for col in year_columns:
             # Extract 4-digit years from column names
-            import re
-            year_match = re.search(r'\d{4}', col)
+            year_match = _YEAR_RE.search(col)
             if year_match:
                 years.append(int(year_match.group()))
                 
@@ -163,7 +259,8 @@ class ExcelLoader:
         
     def clear_cache(self):
         """Clear the cache."""
-        self._cache.clear()
+        with self._cache_lock:
+            self._cache.clear()
         logger.info("Cache cleared")
         
     def get_cache_size(self) -> int:
@@ -210,8 +307,7 @@ class DataValidator:
         # Extract years from column names
         year_columns = []
         for col in df.columns:
-            import re
-            year_match = re.search(r'(\d{4})', col)
+            year_match = _YEAR_RE.search(col)
             if year_match:
                 year_columns.append(int(year_match.group()))
                 
@@ -259,7 +355,8 @@ class DataValidator:
         if total_cells == 0:
             return 0.0
             
-        null_cells = sum(df[col].null_count() for col in df.columns)
+        # One pass over all columns instead of a null_count() per column
+        null_cells = sum(df.null_count().row(0))
         completeness = 1 - (null_cells / total_cells)
         
         if completeness < threshold:
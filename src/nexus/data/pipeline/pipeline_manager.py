@@ -6,19 +6,23 @@ Transactional pipeline manager with checkpoint and rollback support.
 """
 import logging
 import time
-import json
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from contextlib import contextmanager
 import sqlite3
 import shutil
 
+import orjson
+
 from nexus.config.settings import settings
 from nexus.data.metadata.metadata_manager import metadata_manager
 
 logger = logging.getLogger(__name__)
 
+# Tab-separated "<session id>\t<start time>" line per completed session
+SESSION_INDEX_FILE = "sessions.idx"
+
 
 class PipelineManager:
     """
@@ -55,6 +59,11 @@ class PipelineManager:
             "status": "running"
         }
         
+        # The log starts with the session header; checkpoints are appended after it
+        header = {k: v for k, v in self.current_session.items() if k != "checkpoints"}
+        with open(self._session_log(session_id), 'wb') as f:
+            f.write(orjson.dumps(header, option=orjson.OPT_APPEND_NEWLINE))
+        
         logger.info(f"Started pipeline session: {session_id}")
         return session_id
     
@@ -101,17 +110,22 @@ class PipelineManager:
             self._rollback_to_last_checkpoint()
             raise
     
+    def _session_log(self, session_id: str) -> Path:
+        """Path of the append-only checkpoint log of a running session."""
+        return self.checkpoint_dir / f"{session_id}.jsonl"
+    
     def _save_checkpoint(self, checkpoint: Dict[str, Any]):
         """Save checkpoint to disk."""
-        if not self.current_session:
+        # A completed session's log has been replaced by its final JSON
+        if not self.current_session or self.current_session["status"] == "completed":
             return
         
         self.current_session["checkpoints"].append(checkpoint)
         
-        # Save session state
-        session_file = self.checkpoint_dir / f"{self.current_session['id']}.json"
-        with open(session_file, 'w') as f:
-            json.dump(self.current_session, f, indent=2, default=str)
+        # Append just this checkpoint; the full session JSON is written once on completion.
+        # Closed after each write so the log is complete on disk even if the process dies next step
+        with open(self._session_log(self.current_session['id']), 'ab') as f:
+            f.write(orjson.dumps(checkpoint, option=orjson.OPT_APPEND_NEWLINE))
         
         logger.debug(f"Checkpoint saved: {checkpoint['step']}")
     
@@ -212,19 +226,87 @@ class PipelineManager:
                 "version": "1.0.0"
             })
             
-            # Save final session state
+            # Save final session state, replacing the checkpoint log
             session_file = self.checkpoint_dir / f"{self.current_session['id']}.json"
-            with open(session_file, 'w') as f:
-                json.dump(self.current_session, f, indent=2, default=str)
+            session_file.write_bytes(
+                orjson.dumps(self.current_session, option=orjson.OPT_INDENT_2)
+            )
+            self._session_log(self.current_session['id']).unlink(missing_ok=True)
+            
+            with open(self.checkpoint_dir / SESSION_INDEX_FILE, 'a') as f:
+                f.write(f"{self.current_session['id']}\t{self.current_session['start_time'].isoformat()}\n")
             
             logger.info(f"Session completed: {self.current_session['id']}")
     
-    def get_session_history(self) -> List[Dict[str, Any]]:
-        """Get history of pipeline sessions."""
+    def _read_session_index(self) -> Dict[str, str]:
+        """
+        Map completed session IDs to their start times.
+        
+        The index is built from the session files if it does not exist yet
+        (checkpoint directories written before it was introduced).
+        """
+        index_file = self.checkpoint_dir / SESSION_INDEX_FILE
+        if not index_file.exists():
+            lines = []
+            for session_file in self.checkpoint_dir.glob("*.json"):
+                session = orjson.loads(session_file.read_bytes())
+                lines.append(f"{session['id']}\t{session['start_time']}\n")
+            index_file.write_text("".join(lines))
+        
+        index = {}
+        with open(index_file, 'r') as f:
+            for line in f:
+                session_id, _, start_time = line.rstrip("\n").partition("\t")
+                if session_id:
+                    index[session_id] = start_time
+        return index
+    
+    def _unfinished_sessions(self) -> List[Tuple[str, str]]:
+        """(session ID, start time) of sessions that only have a checkpoint log."""
         sessions = []
+        for log_file in self.checkpoint_dir.glob("*.jsonl"):
+            if log_file.with_suffix(".json").exists():
+                continue
+            with open(log_file, 'rb') as f:
+                header = orjson.loads(f.readline())
+            sessions.append((header["id"], header["start_time"]))
+        return sessions
+    
+    def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load one pipeline session.
         
-        for session_file in self.checkpoint_dir.glob("*.json"):
-            with open(session_file, 'r') as f:
-                sessions.append(json.load(f))
+        Args:
+            session_id: ID of the session
+            
+        Returns:
+            The session with its checkpoints, or None if it is unknown.
+            Sessions that never completed are rebuilt from their checkpoint log.
+        """
+        session_file = self.checkpoint_dir / f"{session_id}.json"
+        if session_file.exists():
+            return orjson.loads(session_file.read_bytes())
+        
+        log_file = self._session_log(session_id)
+        if log_file.exists():
+            with open(log_file, 'rb') as f:
+                header, *checkpoints = [orjson.loads(line) for line in f if line.strip()]
+            return {**header, "checkpoints": checkpoints}
+        
+        return None
+    
+    def get_session_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get history of pipeline sessions, newest first.
+        
+        Sessions are ordered using the session index and log headers, and only
+        the sessions returned are loaded in full.
+        
+        Args:
+            limit: Maximum number of sessions to return (all if None)
+        """
+        entries = list(self._read_session_index().items()) + self._unfinished_sessions()
+        entries.sort(key=lambda entry: entry[1], reverse=True)
         
-        return sorted(sessions, key=lambda x: x["start_time"], reverse=True)
\ No newline at end of file
+        sessions = (self.load_session(session_id) for session_id, _ in entries[:limit])
+        return [session for session in sessions if session is not None]
@@ -8,7 +8,8 @@ CRITICAL: Maintains separate fact tables to avoid sparse matrix problem.
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Tuple
 import polars as pl
 
 from nexus.data.metadata.metadata_manager import metadata_manager
@@ -25,54 +26,148 @@ CARBON_YEARS = range(metadata_manager.semantic.year_ranges["carbon"][0], metadat
 
 logger = logging.getLogger(__name__)
 
+# Membership sets for is_in, built once instead of from Python lists per call
+_TROPICAL_COUNTRIES_SET = pl.Series("country", sorted(TROPICAL_COUNTRIES), dtype=pl.Utf8).implode()
+_CARBON_THRESHOLDS_SET = pl.Series("threshold", CARBON_THRESHOLDS, dtype=pl.Int32).implode()
+
+# Status columns are dictionary-encoded: one small integer code per row
+# instead of a string, with string values on export
+DATA_QUALITY_FLAG = pl.Enum(["VALID", "NULL", "ZERO", "INVALID"])
+LOSS_STATUS = pl.Enum(["NO_DATA", "NO_LOSS", "LOSS_RECORDED"])
+CARBON_FLUX_STATUS = pl.Enum(["SINK", "SOURCE", "NEUTRAL"])
+
+# Every data quality flag in category order, indexed by flag code
+_DATA_QUALITY_FLAGS = pl.lit(pl.Series(DATA_QUALITY_FLAG.categories, dtype=DATA_QUALITY_FLAG))
+
+# Year column patterns; group 1 is the year
+TREE_COVER_LOSS_YEAR_RE = re.compile(r'tc_loss_ha_(\d{4})$')
+CARBON_EMISSIONS_YEAR_RE = re.compile(r'gfw_forest_carbon_gross_emissions_(\d{4})__Mg_CO2e$')
+
 
 class BaseTransformer(ABC):
     """Base class for all data transformers."""
     
+    # Measured value columns written as Float32 when streaming to Parquet.
+    # In-memory fact tables keep Float64, since they are exported to SQLite
+    # REAL columns and served to clients unchanged
+    FLOAT32_COLUMNS: Tuple[str, ...] = ()
+    
     def __init__(self):
         self.transformation_stats = {}
         
     @abstractmethod
-    def transform(self, df: pl.DataFrame) -> pl.DataFrame:
-        """Transform the input DataFrame."""
+    def transform(self, df: pl.DataFrame, output_path: Optional[Path] = None) -> Optional[pl.DataFrame]:
+        """
+        Transform the input DataFrame.
+        
+        Args:
+            df: Wide input sheet
+            output_path: If given, stream the result to this Parquet file and
+                return None instead of holding the fact table in memory
+                
+        Returns:
+            The fact table, or None when it was written to output_path
+        """
         pass
         
-    def _melt_year_columns(self, df: pl.DataFrame, year_pattern: str, value_name: str, id_vars: List[str]) -> pl.DataFrame:
-        # Find year columns matching pattern
-        year_cols = [col for col in df.columns if re.match(year_pattern, col)]
+    def _collect_or_sink(self, lf_long: pl.LazyFrame, stats: List[pl.Expr],
+                         output_path: Optional[Path]) -> Tuple[Optional[pl.DataFrame], Dict[str, Any]]:
+        """
+        Materialize a fact table in memory or stream it to Parquet.
+        
+        Args:
+            lf_long: Final fact table plan; FLOAT32_COLUMNS are downcast
+                only when writing to Parquet
+            stats: Aggregate expressions, each producing one statistic
+            output_path: Parquet file to write, or None to collect
+            
+        Returns:
+            The collected fact table (None if written) and the statistics row
+        """
+        if output_path is None:
+            df_long = lf_long.collect()
+            return df_long, df_long.select(stats).row(0, named=True)
+        
+        columns = lf_long.collect_schema().names()
+        lf_long = lf_long.with_columns(
+            pl.col(col).cast(pl.Float32) for col in self.FLOAT32_COLUMNS if col in columns
+        )
         
-        if not year_cols:
-            raise ValueError(f"No year columns found matching pattern: {year_pattern}")
+        lf_long.sink_parquet(output_path, compression="zstd")
+        logger.info(f"Wrote fact table to {output_path}")
+        return None, pl.scan_parquet(output_path).select(stats).collect().row(0, named=True)
+        
+    def _melt_year_columns(self, lf: pl.LazyFrame, year_pattern: re.Pattern, value_name: str,
+                           id_vars: List[str], years: Optional[range] = None) -> pl.LazyFrame:
+        """
+        Unpivot year columns into (year, value) rows.
+        
+        Args:
+            lf: Wide input frame
+            year_pattern: Compiled regex matching the year columns to unpivot,
+                capturing the year as group 1
+            value_name: Name of the value column in the output
+            id_vars: Columns carried over to every output row
+            years: If given, only year columns inside this range are unpivoted,
+                so out-of-range years never produce rows
+                
+        Returns:
+            Long-format LazyFrame with id_vars, value_name and year
+        """
+        columns = lf.collect_schema().names()
+        
+        # Find year columns matching pattern, with the year each one holds
+        column_years = {}
+        for col in columns:
+            match = year_pattern.match(col)
+            if match:
+                column_years[col] = int(match.group(1))
+        
+        if not column_years:
+            raise ValueError(f"No year columns found matching pattern: {year_pattern.pattern}")
+        
+        in_range = column_years
+        if years is not None:
+            # Integer membership in a range is a bounds check, not a scan
+            in_range = {col: year for col, year in column_years.items() if year in years}
+            if len(in_range) < len(column_years):
+                skipped = sorted(set(column_years) - set(in_range))
+                logger.debug(f"Skipping year columns outside {years.start}-{years.stop - 1}: {skipped}")
         
         # Keep only existing id_vars
-        id_vars = [col for col in id_vars if col in df.columns]
+        id_vars = [col for col in id_vars if col in columns]
         
         # Use unpivot instead of melt (new Polars API)
-        df_long = df.unpivot(
+        lf_long = lf.unpivot(
             index=id_vars,  # Changed from id_vars
-            on=year_cols,    # Changed from value_vars
+            on=list(in_range or column_years),    # Changed from value_vars
             variable_name="year_column",
             value_name=value_name
         )
         
-        # Extract year from column name
-        df_long = df_long.with_columns(
+        # Map column names to the years parsed above rather than re-running a regex per row
+        lf_long = lf_long.with_columns(
             pl.col("year_column")
-            .str.extract(r'(\d{4})', 1)
-            .cast(pl.Int32)
+            .replace_strict(column_years, return_dtype=pl.Int32)
             .alias("year")
         ).drop("year_column")
         
-        return df_long
+        # An empty column list would unpivot every column, so keep the schema but no rows
+        return lf_long if in_range else lf_long.clear()
         
-    def _add_data_quality_flag(self, df: pl.DataFrame, value_column: str) -> pl.DataFrame:
+    def _add_data_quality_flag(self, lf: pl.LazyFrame, value_column: str) -> pl.LazyFrame:
         """Add data quality flag based on value column."""
-        return df.with_columns(
-            pl.when(pl.col(value_column).is_null()).then(pl.lit("NULL"))
-            .when(pl.col(value_column) == 0).then(pl.lit("ZERO"))
-            .when(pl.col(value_column) < 0).then(pl.lit("INVALID"))
-            .otherwise(pl.lit("VALID"))
-            .alias("data_quality_flag")
+        value = pl.col(value_column)
+        
+        # At most one term is non-zero, giving the flag's index in DATA_QUALITY_FLAG:
+        # 0 VALID, 1 NULL, 2 ZERO, 3 INVALID
+        code = (
+            value.is_null().cast(pl.UInt8)
+            + (value == 0).fill_null(False).cast(pl.UInt8) * 2
+            + (value < 0).fill_null(False).cast(pl.UInt8) * 3
+        )
+        return lf.with_columns(
+            _DATA_QUALITY_FLAGS.gather(code).alias("data_quality_flag")
         )
 
 
@@ -82,7 +177,9 @@ class TreeCoverTransformer(BaseTransformer):
     Expected output: ~31,680 rows (165 countries × 24 years × 8 thresholds)
     """
     
-    def transform(self, df: pl.DataFrame) -> pl.DataFrame:
+    FLOAT32_COLUMNS = ("tree_cover_loss_ha", "loss_rate_pct")
+    
+    def transform(self, df: pl.DataFrame, output_path: Optional[Path] = None) -> Optional[pl.DataFrame]:
         """Transform tree cover loss data."""
         logger.info("Starting tree cover loss transformation")
         
@@ -97,16 +194,17 @@ class TreeCoverTransformer(BaseTransformer):
         # Keep only columns that exist
         static_cols = [col for col in static_cols if col in df.columns]
         
-        # Melt year columns (tc_loss_ha_YYYY pattern)
-        df_long = self._melt_year_columns(
-            df=df,
-            year_pattern=r'tc_loss_ha_\d{4}$',
+        # Melt year columns (tc_loss_ha_YYYY pattern), valid years only
+        lf_long = self._melt_year_columns(
+            lf=df.lazy(),
+            year_pattern=TREE_COVER_LOSS_YEAR_RE,
             value_name="tree_cover_loss_ha",
-            id_vars=static_cols
+            id_vars=static_cols,
+            years=TREE_COVER_YEARS
         )
         
         # Add computed columns
-        df_long = df_long.with_columns([
+        lf_long = lf_long.with_columns([
             # Calculate loss rate as percentage of 2000 extent
             pl.when(pl.col("extent_2000_ha") > 0)
             .then((pl.col("tree_cover_loss_ha") / pl.col("extent_2000_ha")) * 100)
@@ -115,25 +213,23 @@ class TreeCoverTransformer(BaseTransformer):
         ])
         
         # Add data quality flag
-        df_long = self._add_data_quality_flag(df_long, "tree_cover_loss_ha")
-        
-        # Filter to valid year range
-        df_long = df_long.filter(
-            pl.col("year").is_between(min(TREE_COVER_YEARS), max(TREE_COVER_YEARS))
-        )
+        lf_long = self._add_data_quality_flag(lf_long, "tree_cover_loss_ha")
         
         # Sort for consistent output
-        df_long = df_long.sort(["country", "year", "threshold"])
+        df_long, stats = self._collect_or_sink(
+            lf_long.sort(["country", "year", "threshold"]),
+            [
+                pl.len().alias("output_rows"),
+                pl.col("country").n_unique().alias("unique_countries"),
+                pl.col("year").n_unique().alias("unique_years"),
+                pl.col("threshold").n_unique().alias("unique_thresholds"),
+                pl.col("tree_cover_loss_ha").null_count().alias("null_values"),
+            ],
+            output_path
+        )
         
         # Log statistics
-        self.transformation_stats = {
-            "input_rows": len(df),
-            "output_rows": len(df_long),
-            "unique_countries": df_long["country"].n_unique(),
-            "unique_years": df_long["year"].n_unique(),
-            "unique_thresholds": df_long["threshold"].n_unique(),
-            "null_values": df_long["tree_cover_loss_ha"].null_count(),
-        }
+        self.transformation_stats = {"input_rows": df.height, **stats}
         
         logger.info(f"Tree cover transformation complete: {self.transformation_stats}")
         
@@ -147,59 +243,60 @@ class PrimaryForestTransformer(BaseTransformer):
     CRITICAL: Only tropical countries, fixed at threshold=30
     """
     
-    def transform(self, df: pl.DataFrame) -> pl.DataFrame:
+    FLOAT32_COLUMNS = ("primary_forest_loss_ha",)
+    
+    def transform(self, df: pl.DataFrame, output_path: Optional[Path] = None) -> Optional[pl.DataFrame]:
         """Transform primary forest loss data."""
         logger.info("Starting primary forest transformation")
         
-        # Primary forest columns start with tc_loss_ha_
-        df_long = self._melt_year_columns(
-            df=df,
-            year_pattern=r'tc_loss_ha_\d{4}$',
+        # Verify all countries are tropical (on the input's distinct countries, before the unpivot)
+        non_tropical = sorted(set(df.get_column("country").unique().drop_nulls()) - TROPICAL_COUNTRIES)
+        if non_tropical:
+            logger.warning(f"Found non-tropical countries in primary forest data: {non_tropical}")
+            
+        # Primary forest columns start with tc_loss_ha_; 2002-2023 only
+        lf_long = self._melt_year_columns(
+            lf=df.lazy(),
+            year_pattern=TREE_COVER_LOSS_YEAR_RE,
             value_name="primary_forest_loss_ha",
-            id_vars=["country"]
+            id_vars=["country"],
+            years=PRIMARY_FOREST_YEARS
         )
         
         # Add fixed threshold (always 30 for primary forest)
-        df_long = df_long.with_columns([
+        lf_long = lf_long.with_columns([
             pl.lit(PRIMARY_THRESHOLD).cast(pl.Int32).alias("threshold"),
         ])
         
         # Add tropical country flag
-        df_long = df_long.with_columns([
-            pl.col("country").is_in(list(TROPICAL_COUNTRIES)).alias("is_tropical")
+        lf_long = lf_long.with_columns([
+            pl.col("country").is_in(_TROPICAL_COUNTRIES_SET).alias("is_tropical")
         ])
         
         # Add loss status categorization
-        df_long = df_long.with_columns([
+        lf_long = lf_long.with_columns([
             pl.when(pl.col("primary_forest_loss_ha").is_null()).then(pl.lit("NO_DATA"))
             .when(pl.col("primary_forest_loss_ha") == 0).then(pl.lit("NO_LOSS"))
             .otherwise(pl.lit("LOSS_RECORDED"))
+            .cast(LOSS_STATUS)
             .alias("loss_status")
         ])
         
-        # Filter to valid year range (2002-2023 for primary forest)
-        df_long = df_long.filter(
-            pl.col("year").is_between(min(PRIMARY_FOREST_YEARS), max(PRIMARY_FOREST_YEARS))
-        )
-        
-        # Verify all countries are tropical
-        non_tropical = df_long.filter(~pl.col("is_tropical"))
-        if len(non_tropical) > 0:
-            countries = non_tropical["country"].unique().to_list()
-            logger.warning(f"Found non-tropical countries in primary forest data: {countries}")
-            
         # Sort for consistent output
-        df_long = df_long.sort(["country", "year"])
+        df_long, stats = self._collect_or_sink(
+            lf_long.sort(["country", "year"]),
+            [
+                pl.len().alias("output_rows"),
+                pl.col("country").n_unique().alias("unique_countries"),
+                pl.col("country").filter(pl.col("is_tropical")).n_unique().alias("tropical_countries"),
+                pl.col("year").n_unique().alias("unique_years"),
+                pl.col("primary_forest_loss_ha").null_count().alias("null_values"),
+            ],
+            output_path
+        )
         
         # Log statistics
-        self.transformation_stats = {
-            "input_rows": len(df),
-            "output_rows": len(df_long),
-            "unique_countries": df_long["country"].n_unique(),
-            "tropical_countries": df_long.filter(pl.col("is_tropical"))["country"].n_unique(),
-            "unique_years": df_long["year"].n_unique(),
-            "null_values": df_long["primary_forest_loss_ha"].null_count(),
-        }
+        self.transformation_stats = {"input_rows": df.height, **stats}
         
         logger.info(f"Primary forest transformation complete: {self.transformation_stats}")
         
@@ -213,18 +310,29 @@ class CarbonTransformer(BaseTransformer):
     CRITICAL: Only thresholds 30, 50, 75 have carbon data
     """
     
-    def transform(self, df: pl.DataFrame) -> pl.DataFrame:
+    FLOAT32_COLUMNS = (
+        "carbon_emissions_mg_co2e",
+        "carbon_emissions_annual_avg",
+        "carbon_removals_annual_avg",
+        "carbon_net_flux_annual_avg",
+        "carbon_density_mg_c_ha",
+    )
+    
+    def transform(self, df: pl.DataFrame, output_path: Optional[Path] = None) -> Optional[pl.DataFrame]:
         """Transform carbon emissions data."""
         logger.info("Starting carbon data transformation")
         
+        lf = df.lazy()
+        
         # Fix column names
         if "umd_tree_cover_density_2000__threshold" in df.columns:
-            df = df.rename({"umd_tree_cover_density_2000__threshold": "threshold"})
+            lf = lf.rename({"umd_tree_cover_density_2000__threshold": "threshold"})
             
         # CRITICAL: Filter to valid carbon thresholds (30, 50, 75 only)
-        df = df.filter(pl.col("threshold").is_in(CARBON_THRESHOLDS))
+        lf = lf.filter(pl.col("threshold").is_in(_CARBON_THRESHOLDS_SET))
         
-        if len(df) == 0:
+        input_rows = lf.select(pl.len()).collect().item()
+        if input_rows == 0:
             raise ValueError(f"No data found for carbon thresholds {CARBON_THRESHOLDS}")
             
         # Rename average columns for clarity
@@ -237,7 +345,7 @@ class CarbonTransformer(BaseTransformer):
         
         # Only rename columns that exist
         rename_map = {k: v for k, v in rename_map.items() if k in df.columns}
-        df = df.rename(rename_map)
+        lf = lf.rename(rename_map)
         
         # Define static columns
         static_cols = [
@@ -249,44 +357,46 @@ class CarbonTransformer(BaseTransformer):
         ]
         
         # Keep only existing columns
-        static_cols = [col for col in static_cols if col in df.columns]
+        columns = lf.collect_schema().names()
+        static_cols = [col for col in static_cols if col in columns]
         
-        # Melt emission year columns
-        df_long = self._melt_year_columns(
-            df=df,
-            year_pattern=r'gfw_forest_carbon_gross_emissions_\d{4}__Mg_CO2e$',
+        # Melt emission year columns, valid years only
+        lf_long = self._melt_year_columns(
+            lf=lf,
+            year_pattern=CARBON_EMISSIONS_YEAR_RE,
             value_name="carbon_emissions_mg_co2e",
-            id_vars=static_cols
+            id_vars=static_cols,
+            years=CARBON_YEARS
         )
         
         # Add carbon flux status (sink vs source)
-        df_long = df_long.with_columns([
+        lf_long = lf_long.with_columns([
             pl.when(pl.col("carbon_net_flux_annual_avg") < 0).then(pl.lit("SINK"))
             .when(pl.col("carbon_net_flux_annual_avg") > 0).then(pl.lit("SOURCE"))
             .otherwise(pl.lit("NEUTRAL"))
+            .cast(CARBON_FLUX_STATUS)
             .alias("carbon_flux_status")
         ])
         
-        # Filter to valid year range
-        df_long = df_long.filter(
-            pl.col("year").is_between(min(CARBON_YEARS), max(CARBON_YEARS))
-        )
-        
         # Sort for consistent output
-        df_long = df_long.sort(["country", "year", "threshold"])
+        df_long, stats = self._collect_or_sink(
+            lf_long.sort(["country", "year", "threshold"]),
+            [
+                pl.len().alias("output_rows"),
+                pl.col("country").n_unique().alias("unique_countries"),
+                pl.col("year").n_unique().alias("unique_years"),
+                pl.col("threshold").n_unique().alias("unique_thresholds"),
+                pl.col("threshold").unique().sort().implode().alias("thresholds"),
+                pl.col("carbon_emissions_mg_co2e").null_count().alias("null_values"),
+                (pl.col("carbon_flux_status") == "SINK").sum().alias("sinks"),
+                (pl.col("carbon_flux_status") == "SOURCE").sum().alias("sources"),
+                (pl.col("carbon_flux_status") == "NEUTRAL").sum().alias("neutral"),
+            ],
+            output_path
+        )
         
         # Log statistics
-        self.transformation_stats = {
-            "input_rows": len(df),
-            "output_rows": len(df_long),
-            "unique_countries": df_long["country"].n_unique(),
-            "unique_years": df_long["year"].n_unique(),
-            "unique_thresholds": df_long["threshold"].n_unique(),
-            "thresholds": sorted(df_long["threshold"].unique().to_list()),
-            "null_values": df_long["carbon_emissions_mg_co2e"].null_count(),
-            "sinks": len(df_long.filter(pl.col("carbon_flux_status") == "SINK")),
-            "sources": len(df_long.filter(pl.col("carbon_flux_status") == "SOURCE")),
-        }
+        self.transformation_stats = {"input_rows": input_rows, **stats}
         
         logger.info(f"Carbon transformation complete: {self.transformation_stats}")
         
@@ -11,6 +11,25 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Frames at least this tall are streamed to Parquet instead of encoded in one buffer
+STREAMING_WRITE_ROWS = 1_000_000
+
+# Column types treated as numeric by the summaries and completeness checks
+NUMERIC_DTYPES = (pl.Float32, pl.Float64, pl.Int32, pl.Int64)
+
+
+def numeric_columns(schema: pl.Schema) -> List[str]:
+    """
+    Names of the numeric columns in a schema, in column order.
+    
+    Args:
+        schema: DataFrame schema (df.schema)
+        
+    Returns:
+        Column names whose dtype is in NUMERIC_DTYPES
+    """
+    return [col for col, dtype in schema.items() if dtype in NUMERIC_DTYPES]
+
 
 def timer(func):
     """
@@ -23,10 +42,12 @@ def timer(func):
     """
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
+        # Monotonic clock, so clock adjustments can't skew the duration
+        start = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        elapsed = time.time() - start
-        logger.info(f"{func.__name__} took {elapsed:.2f} seconds")
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        # Formatted by the logger only when INFO is enabled
+        logger.info("%s took %.2f seconds", func.__name__, elapsed)
         return result
     return wrapper
 
@@ -39,23 +60,28 @@ def log_dataframe_info(df: pl.DataFrame, name: str = "DataFrame"):
         df: DataFrame to log
         name: Name for logging
     """
+    # Nothing would be emitted, so skip sizing and null counting
+    if not logger.isEnabledFor(logging.INFO):
+        return
+        
     logger.info(f"\n{name} Info:")
     logger.info(f"  Shape: {len(df):,} rows × {len(df.columns)} columns")
     logger.info(f"  Memory: ~{df.estimated_size('mb'):.1f} MB")
     
     # Column types summary
     type_counts = {}
-    for col in df.columns:
-        dtype = str(df[col].dtype)
-        type_counts[dtype] = type_counts.get(dtype, 0) + 1
+    for dtype in df.schema.values():
+        type_counts[str(dtype)] = type_counts.get(str(dtype), 0) + 1
     logger.info(f"  Column types: {type_counts}")
     
-    # Null counts (only show columns with nulls)
-    null_cols = [col for col in df.columns if df[col].null_count() > 0]
-    if null_cols:
-        logger.info(f"  Columns with nulls: {len(null_cols)}/{len(df.columns)}")
-        for col in null_cols[:5]:  # Show first 5 columns with nulls
-            logger.info(f"    {col}: {df[col].null_count()} nulls")
+    # Null counts (only show columns with nulls), all columns in one call
+    null_counts = {
+        col: count for col, count in df.null_count().row(0, named=True).items() if count > 0
+    }
+    if null_counts:
+        logger.info(f"  Columns with nulls: {len(null_counts)}/{len(df.columns)}")
+        for col, count in list(null_counts.items())[:5]:  # Show first 5 columns with nulls
+            logger.info(f"    {col}: {count} nulls")
 
 
 def create_summary_statistics(df: pl.DataFrame) -> Dict[str, Any]:
@@ -68,40 +94,43 @@ def create_summary_statistics(df: pl.DataFrame) -> Dict[str, Any]:
     Returns:
         Dictionary of statistics
     """
+    schema = df.schema
+    cols = list(schema)
+    
     stats = {
-        "row_count": len(df),
-        "column_count": len(df.columns),
-        "columns": df.columns,
-        "dtypes": {col: str(df[col].dtype) for col in df.columns},
+        "row_count": df.height,
+        "column_count": len(cols),
+        "columns": cols,
+        "dtypes": {col: str(dtype) for col, dtype in schema.items()},
         "null_counts": {},
         "numeric_summary": {}
     }
     
     # Null counts (only for columns with nulls)
-    for col in df.columns:
-        null_count = df[col].null_count()
+    null_counts = df.null_count().row(0, named=True)
+    for col, null_count in null_counts.items():
         if null_count > 0:
             stats["null_counts"][col] = null_count
     
     # Basic numeric summaries (only for numeric columns)
-    numeric_cols = [
-        col for col in df.columns
-        if df[col].dtype in [pl.Float32, pl.Float64, pl.Int32, pl.Int64]
-    ]
-    
-    for col in numeric_cols[:10]:  # Limit to first 10 to avoid bloat
-        try:
-            col_stats = df[col].drop_nulls()
-            if len(col_stats) > 0:
-                stats["numeric_summary"][col] = {
-                    "min": float(col_stats.min()),
-                    "max": float(col_stats.max()),
-                    "mean": float(col_stats.mean()),
-                    "nulls": df[col].null_count(),
-                }
-        except Exception:
-            # Skip columns that can't be summarized
-            pass
+    numeric_cols = numeric_columns(schema)
+    
+    # Limit to first 10 to avoid bloat; all-null columns have nothing to summarize
+    summarized = [col for col in numeric_cols[:10] if null_counts[col] < df.height]
+    
+    # One select computes every aggregate; min/max/mean already skip nulls
+    if summarized:
+        summary = df.select(
+            pl.struct(
+                pl.col(col).min().cast(pl.Float64).alias("min"),
+                pl.col(col).max().cast(pl.Float64).alias("max"),
+                pl.col(col).mean().cast(pl.Float64).alias("mean"),
+            ).alias(col)
+            for col in summarized
+        ).row(0, named=True)
+        
+        for col in summarized:
+            stats["numeric_summary"][col] = {**summary[col], "nulls": null_counts[col]}
     
     return stats
 
@@ -132,18 +161,30 @@ def validate_dataframe(df: pl.DataFrame, expected_cols: List[str],
     return True
 
 
-def save_results(df: pl.DataFrame, output_path: Path, name: str = "results"):
+def save_results(
+    df: pl.DataFrame,
+    output_path: Path,
+    name: str = "results",
+    row_group_size: Optional[int] = None
+):
     """
     Save DataFrame to parquet with logging.
     
+    Large frames are written with sink_parquet, which encodes and writes
+    row groups as it goes rather than building the whole file in memory.
+    
     Args:
         df: DataFrame to save
         output_path: Path to save file
         name: Name for logging
+        row_group_size: Optional rows per Parquet row group
     """
     try:
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        df.write_parquet(output_path)
+        if df.height >= STREAMING_WRITE_ROWS:
+            df.lazy().sink_parquet(output_path, compression="zstd", row_group_size=row_group_size)
+        else:
+            df.write_parquet(output_path, compression="zstd", row_group_size=row_group_size)
         file_size_mb = output_path.stat().st_size / 1024 / 1024
         logger.info(f"Saved {name}: {output_path} ({file_size_mb:.1f} MB)")
     except Exception as e:
@@ -2,12 +2,14 @@
 Data validation operations for quality assurance.
 """
 import logging
+import re
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import polars as pl
 
 from nexus.config.settings import settings
 from nexus.data.metadata.metadata_manager import metadata_manager
+from nexus.data.pipeline.utils import numeric_columns
 
 # Get constants from metadata
 TROPICAL_COUNTRIES = metadata_manager.semantic.tropical_countries
@@ -21,6 +23,22 @@ EXPECTED_ROWS = metadata_manager.runtime.row_counts if metadata_manager.runtime
 
 logger = logging.getLogger(__name__)
 
+# First 4-digit number in a column name
+_YEAR_RE = re.compile(r'(\d{4})')
+
+
+def _unique_sorted(df: pl.DataFrame, column: str) -> List[Any]:
+    """Sorted distinct values of a column, for error messages."""
+    return df.get_column(column).unique().sort().to_list()
+
+
+def _numeric_null_cells(df: pl.DataFrame) -> pl.Expr:
+    """Expression counting null cells across all numeric columns."""
+    numeric_cols = numeric_columns(df.schema)
+    if not numeric_cols:
+        return pl.lit(0, dtype=pl.UInt32)
+    return pl.sum_horizontal(pl.col(col).null_count() for col in numeric_cols)
+
 
 @dataclass
 class ValidationResult:
@@ -51,6 +69,10 @@ class DataValidator:
         """
         Run all validation checks on provided dataframes.
         
+        The aggregates each dataset's checks need are gathered in one query
+        per dataset, and the queries are collected together so they run in
+        parallel.
+        
         Args:
             tree_cover_df: Tree cover loss data
             primary_forest_df: Primary forest loss data
@@ -61,15 +83,21 @@ class DataValidator:
         """
         self.validation_results = []
         
-        # Validate each dataset if provided
-        if tree_cover_df is not None:
-            self.validate_tree_cover(tree_cover_df)
-            
-        if primary_forest_df is not None:
-            self.validate_primary_forest(primary_forest_df)
-            
-        if carbon_df is not None:
-            self.validate_carbon(carbon_df)
+        # (dataframe, query builder, result interpreter) for each dataset provided
+        datasets = [
+            (df, build, interpret)
+            for df, build, interpret in [
+                (tree_cover_df, self._tree_cover_checks, self._tree_cover_results),
+                (primary_forest_df, self._primary_forest_checks, self._primary_forest_results),
+                (carbon_df, self._carbon_checks, self._carbon_results),
+            ]
+            if df is not None
+        ]
+        
+        collected = pl.collect_all([build(df) for df, build, _ in datasets])
+        
+        for (df, _, interpret), checks in zip(datasets, collected):
+            self.validation_results.extend(interpret(df, checks.row(0, named=True)))
             
         # Overall success if no errors
         has_errors = any(r.severity == "error" for r in self.validation_results)
@@ -86,6 +114,36 @@ class DataValidator:
         Returns:
             List of validation results
         """
+        checks = self._tree_cover_checks(df).collect().row(0, named=True)
+        results = self._tree_cover_results(df, checks)
+        self.validation_results.extend(results)
+        return results
+        
+    def _tree_cover_checks(self, df: pl.DataFrame) -> pl.LazyFrame:
+        """Build the one-row query of aggregates used by the tree cover checks."""
+        exprs = [
+            pl.len().alias("row_count"),
+            _numeric_null_cells(df).alias("numeric_nulls"),
+        ]
+        if "threshold" in df.columns:
+            # Only rows outside the known thresholds are deduplicated; nulls count as invalid
+            exprs.append(
+                pl.col("threshold")
+                .filter(~pl.col("threshold").is_in(ALL_THRESHOLDS).fill_null(False))
+                .unique()
+                .implode()
+                .alias("invalid_thresholds")
+            )
+        if "year" in df.columns:
+            exprs += [pl.col("year").min().alias("min_year"), pl.col("year").max().alias("max_year")]
+        negatives = self._negative_counts(df, ["tree_cover_loss_ha", "extent_2000_ha"])
+        if negatives is not None:
+            exprs.append(negatives)
+            
+        return df.lazy().select(exprs)
+        
+    def _tree_cover_results(self, df: pl.DataFrame, checks: Dict[str, Any]) -> List[ValidationResult]:
+        """Turn the tree cover aggregates into validation results."""
         results = []
         
         # Check required columns
@@ -95,7 +153,7 @@ class DataValidator:
         
         # Check row count
         expected = EXPECTED_ROWS["fact_tree_cover_loss"]
-        actual = len(df)
+        actual = checks["row_count"]
         tolerance = 0.1  # 10% tolerance
         
         if abs(actual - expected) / expected > tolerance:
@@ -113,30 +171,30 @@ class DataValidator:
             ))
             
         # Check thresholds
-        unique_thresholds = df["threshold"].unique().sort()
-        if not set(unique_thresholds.to_list()).issubset(set(ALL_THRESHOLDS)):
-            invalid = set(unique_thresholds.to_list()) - set(ALL_THRESHOLDS)
-            results.append(ValidationResult(
-                passed=False,
-                message=f"Invalid thresholds found: {invalid}",
-                severity="error",
-                details={"invalid_thresholds": list(invalid)}
-            ))
-            
+        if "invalid_thresholds" in checks:
+            invalid = set(checks["invalid_thresholds"])
+            if invalid:
+                results.append(ValidationResult(
+                    passed=False,
+                    message=f"Invalid thresholds found: {invalid}",
+                    severity="error",
+                    details={"invalid_thresholds": list(invalid)}
+                ))
+                
         # Check year range
-        years = df["year"].unique().sort()
-        min_year, max_year = years.min(), years.max()
-        
-        if min_year != min(TREE_COVER_YEARS) or max_year != max(TREE_COVER_YEARS):
-            results.append(ValidationResult(
-                passed=False,
-                message=f"Year range {min_year}-{max_year} doesn't match expected {min(TREE_COVER_YEARS)}-{max(TREE_COVER_YEARS)}",
-                severity="warning",
-                details={"min_year": min_year, "max_year": max_year}
-            ))
+        if "min_year" in checks:
+            min_year, max_year = checks["min_year"], checks["max_year"]
             
+            if min_year != min(TREE_COVER_YEARS) or max_year != max(TREE_COVER_YEARS):
+                results.append(ValidationResult(
+                    passed=False,
+                    message=f"Year range {min_year}-{max_year} doesn't match expected {min(TREE_COVER_YEARS)}-{max(TREE_COVER_YEARS)}",
+                    severity="warning",
+                    details={"min_year": min_year, "max_year": max_year}
+                ))
+                
         # Check data completeness
-        completeness = self.check_data_completeness(df)
+        completeness = self._completeness_score(df, checks["numeric_nulls"])
         if completeness < settings.min_completeness_score:
             results.append(ValidationResult(
                 passed=False,
@@ -146,7 +204,7 @@ class DataValidator:
             ))
             
         # Check for negative values (except where allowed)
-        neg_values = self.check_negative_values(df, ["tree_cover_loss_ha", "extent_2000_ha"])
+        neg_values = self._negative_columns(checks.get("negatives") or {})
         if neg_values:
             results.append(ValidationResult(
                 passed=False,
@@ -155,7 +213,6 @@ class DataValidator:
                 details={"columns_with_negatives": neg_values}
             ))
             
-        self.validation_results.extend(results)
         return results
         
     def validate_primary_forest(self, df: pl.DataFrame) -> List[ValidationResult]:
@@ -168,6 +225,28 @@ class DataValidator:
         Returns:
             List of validation results
         """
+        checks = self._primary_forest_checks(df).collect().row(0, named=True)
+        results = self._primary_forest_results(df, checks)
+        self.validation_results.extend(results)
+        return results
+        
+    def _primary_forest_checks(self, df: pl.DataFrame) -> pl.LazyFrame:
+        """Build the one-row query of aggregates used by the primary forest checks."""
+        exprs = [pl.len().alias("row_count")]
+        if "country" in df.columns:
+            exprs.append(pl.col("country").unique().implode().alias("countries"))
+        if "threshold" in df.columns:
+            exprs += [
+                pl.col("threshold").min().alias("min_threshold"),
+                pl.col("threshold").n_unique().alias("threshold_count"),
+            ]
+        if "year" in df.columns:
+            exprs += [pl.col("year").min().alias("min_year"), pl.col("year").max().alias("max_year")]
+            
+        return df.lazy().select(exprs)
+        
+    def _primary_forest_results(self, df: pl.DataFrame, checks: Dict[str, Any]) -> List[ValidationResult]:
+        """Turn the primary forest aggregates into validation results."""
         results = []
         
         # Check required columns
@@ -176,8 +255,8 @@ class DataValidator:
         results.append(result)
         
         # Check all countries are tropical
-        if "country" in df.columns:
-            countries = df["country"].unique().to_list()
+        if "countries" in checks:
+            countries = checks["countries"]
             non_tropical = set(countries) - TROPICAL_COUNTRIES
             
             if non_tropical:
@@ -194,10 +273,10 @@ class DataValidator:
                     severity="info"
                 ))
                 
-        # Check threshold is always 30
-        if "threshold" in df.columns:
-            unique_thresholds = df["threshold"].unique().to_list()
-            if unique_thresholds != [PRIMARY_THRESHOLD]:
+        # Check threshold is always 30; n_unique counts nulls, so one value at the minimum means no other
+        if "threshold_count" in checks:
+            if checks["threshold_count"] != 1 or checks["min_threshold"] != PRIMARY_THRESHOLD:
+                unique_thresholds = _unique_sorted(df, "threshold")
                 results.append(ValidationResult(
                     passed=False,
                     message=f"Primary forest threshold should be {PRIMARY_THRESHOLD}, found: {unique_thresholds}",
@@ -206,9 +285,8 @@ class DataValidator:
                 ))
                 
         # Check year range (2002-2023)
-        if "year" in df.columns:
-            years = df["year"].unique().sort()
-            min_year, max_year = years.min(), years.max()
+        if "min_year" in checks:
+            min_year, max_year = checks["min_year"], checks["max_year"]
             
             if min_year != min(PRIMARY_FOREST_YEARS) or max_year != max(PRIMARY_FOREST_YEARS):
                 results.append(ValidationResult(
@@ -218,7 +296,6 @@ class DataValidator:
                     details={"min_year": min_year, "max_year": max_year}
                 ))
                 
-        self.validation_results.extend(results)
         return results
         
     def validate_carbon(self, df: pl.DataFrame) -> List[ValidationResult]:
@@ -231,6 +308,26 @@ class DataValidator:
         Returns:
             List of validation results
         """
+        checks = self._carbon_checks(df).collect().row(0, named=True)
+        results = self._carbon_results(df, checks)
+        self.validation_results.extend(results)
+        return results
+        
+    def _carbon_checks(self, df: pl.DataFrame) -> pl.LazyFrame:
+        """Build the one-row query of aggregates used by the carbon checks."""
+        exprs = [pl.len().alias("row_count")]
+        if "threshold" in df.columns:
+            exprs += [
+                pl.col("threshold").n_unique().alias("threshold_count"),
+                pl.col("threshold").is_in(CARBON_THRESHOLDS).fill_null(False).all().alias("thresholds_known"),
+            ]
+        if "carbon_net_flux_annual_avg" in df.columns:
+            exprs.append((pl.col("carbon_net_flux_annual_avg") < 0).sum().alias("negative_flux"))
+            
+        return df.lazy().select(exprs)
+        
+    def _carbon_results(self, df: pl.DataFrame, checks: Dict[str, Any]) -> List[ValidationResult]:
+        """Turn the carbon aggregates into validation results."""
         results = []
         
         # Check required columns
@@ -238,10 +335,11 @@ class DataValidator:
         result = self.validate_columns(df, required_cols)
         results.append(result)
         
-        # Check thresholds are only 30, 50, 75
-        if "threshold" in df.columns:
-            unique_thresholds = df["threshold"].unique().sort().to_list()
-            if set(unique_thresholds) != set(CARBON_THRESHOLDS):
+        # Check thresholds are only 30, 50, 75: every value known and all three present
+        if "threshold_count" in checks:
+            valid = checks["thresholds_known"] and checks["threshold_count"] == len(CARBON_THRESHOLDS)
+            unique_thresholds = sorted(CARBON_THRESHOLDS) if valid else _unique_sorted(df, "threshold")
+            if not valid:
                 results.append(ValidationResult(
                     passed=False,
                     message=f"Carbon thresholds should be {CARBON_THRESHOLDS}, found: {unique_thresholds}",
@@ -256,17 +354,15 @@ class DataValidator:
                 ))
                 
         # Check that net flux can be negative (carbon sinks)
-        if "carbon_net_flux_annual_avg" in df.columns:
-            negative_flux = df.filter(pl.col("carbon_net_flux_annual_avg") < 0).height
-            if negative_flux > 0:
-                results.append(ValidationResult(
-                    passed=True,
-                    message=f"Found {negative_flux} carbon sinks (negative net flux) - this is expected",
-                    severity="info",
-                    details={"carbon_sinks": negative_flux}
-                ))
-                
-        self.validation_results.extend(results)
+        negative_flux = checks.get("negative_flux", 0)
+        if negative_flux > 0:
+            results.append(ValidationResult(
+                passed=True,
+                message=f"Found {negative_flux} carbon sinks (negative net flux) - this is expected",
+                severity="info",
+                details={"carbon_sinks": negative_flux}
+            ))
+            
         return results
         
     def validate_columns(self, df: pl.DataFrame, required_columns: List[str]) -> ValidationResult:
@@ -316,16 +412,13 @@ class DataValidator:
         expected_years = set(range(start_year, end_year + 1))
         
         # Extract years from column names
-        year_columns = []
+        found_years = set()
         for col in df.columns:
-            import re
-            year_match = re.search(r'(\d{4})', col)
-            if year_match:
-                year = int(year_match.group())
-                if 2000 <= year <= 2030:  # Reasonable year range
-                    year_columns.append(year)
-                    
-        found_years = set(year_columns)
+            year_match = _YEAR_RE.search(col)
+            # Reasonable year range
+            if year_match and 2000 <= (year := int(year_match.group(1))) <= 2030:
+                found_years.add(year)
+                
         missing_years = expected_years - found_years
         
         if missing_years:
@@ -349,20 +442,25 @@ class DataValidator:
         Returns:
             Completeness score (0-1)
         """
+        # Count nulls in numeric columns only, from the null counts Polars keeps per column
+        numeric_cols = numeric_columns(df.schema)
+        null_cells = sum(df.select(numeric_cols).null_count().row(0)) if numeric_cols else 0
+        return self._completeness_score(df, null_cells, threshold)
+        
+    def _completeness_score(
+        self,
+        df: pl.DataFrame,
+        null_cells: int,
+        threshold: Optional[float] = None
+    ) -> float:
+        """Completeness of df's numeric columns given their total null count."""
         threshold = threshold or settings.min_completeness_score
         
         total_cells = len(df) * len(df.columns)
         if total_cells == 0:
             return 0.0
             
-        # Count nulls in numeric columns only
-        numeric_cols = [
-            col for col in df.columns
-            if df[col].dtype in [pl.Float32, pl.Float64, pl.Int32, pl.Int64]
-        ]
-        
-        null_cells = sum(df[col].null_count() for col in numeric_cols)
-        total_numeric_cells = len(df) * len(numeric_cols)
+        total_numeric_cells = len(df) * len(numeric_columns(df.schema))
         
         if total_numeric_cells == 0:
             return 1.0
@@ -391,19 +489,33 @@ class DataValidator:
         Returns:
             List of columns containing negative values
         """
-        columns_with_negatives = []
+        negatives = self._negative_counts(df, columns)
+        if negatives is None:
+            return []
+        return self._negative_columns(df.select(negatives).item())
         
-        for col in columns:
-            if col not in df.columns:
-                continue
-                
-            # Skip columns that can be negative
-            if "net_flux" in col or "removals" in col:
-                continue
-                
-            # Check for negatives
-            neg_count = df.filter((pl.col(col) < 0) & pl.col(col).is_not_null()).height
+    def _negative_counts(self, df: pl.DataFrame, columns: List[str]) -> Optional[pl.Expr]:
+        """
+        Expression counting negative values per column, as a struct.
+        
+        Missing columns and columns that can be negative are skipped;
+        returns None if no column is left to check.
+        """
+        checked = [
+            col for col in columns
+            if col in df.columns and "net_flux" not in col and "removals" not in col
+        ]
+        if not checked:
+            return None
             
+        # Nulls compare as null and are not summed
+        return pl.struct((pl.col(col) < 0).sum().alias(col) for col in checked).alias("negatives")
+        
+    def _negative_columns(self, neg_counts: Dict[str, int]) -> List[str]:
+        """Columns with a positive negative-value count, logging each one."""
+        columns_with_negatives = []
+        
+        for col, neg_count in neg_counts.items():
             if neg_count > 0:
                 columns_with_negatives.append(col)
                 logger.warning(f"Found {neg_count} negative values in {col}")
@@ -427,26 +539,28 @@ class DataValidator:
         Returns:
             ValidationResult
         """
-        # Join on country and year
-        joined = tree_cover_df.filter(pl.col("threshold") == 30).join(
-            primary_forest_df,
-            on=["country", "year"],
-            how="inner"
-        )
-        
-        # Check if primary > total
-        violations = joined.filter(
-            (pl.col("primary_forest_loss_ha") > pl.col("tree_cover_loss_ha")) &
-            pl.col("primary_forest_loss_ha").is_not_null() &
-            pl.col("tree_cover_loss_ha").is_not_null()
+        # Join on country and year and count where primary > total; only the
+        # count is collected, never the joined rows
+        violation_count = (
+            tree_cover_df.lazy()
+            .filter(pl.col("threshold") == 30)
+            .join(primary_forest_df.lazy(), on=["country", "year"], how="inner")
+            .filter(
+                (pl.col("primary_forest_loss_ha") > pl.col("tree_cover_loss_ha")) &
+                pl.col("primary_forest_loss_ha").is_not_null() &
+                pl.col("tree_cover_loss_ha").is_not_null()
+            )
+            .select(pl.len())
+            .collect(engine="streaming")
+            .item()
         )
         
-        if len(violations) > 0:
+        if violation_count > 0:
             return ValidationResult(
                 passed=False,
-                message=f"Found {len(violations)} cases where primary forest loss exceeds total forest loss",
+                message=f"Found {violation_count} cases where primary forest loss exceeds total forest loss",
                 severity="error",
-                details={"violation_count": len(violations)}
+                details={"violation_count": violation_count}
             )
             
         return ValidationResult(
@@ -27,6 +27,7 @@ from nexus.data.pipeline.transformers import (
 from nexus.data.pipeline.cleaners import DataCleaner
 from nexus.data.database.exporter import DatabaseExporter
 from nexus.data.database.schema import SchemaManager
+from nexus.data.database.views import ViewManager
 
 from nexus.data.pipeline.pipeline_manager import PipelineManager
 from nexus.data.metadata.metadata_manager import metadata_manager
@@ -80,6 +81,13 @@ class NexusPipeline:
         # Set database path
         db_path = output_db or settings.sqlite_db_path
         
+        # Recover indexes if a previous run died between load and finalize
+        if db_path.exists():
+            schema_manager = SchemaManager(db_path)
+            schema_manager.ensure_indexes()
+            schema_manager.verify_query_plans()
+            schema_manager.close()
+        
         # BACKUP LOGIC: Create backup if database exists and we're not dropping
         if db_path.exists() and not drop_existing:
             backup_dir = db_path.parent / "backups"
@@ -125,31 +133,30 @@ class NexusPipeline:
                 validation_results = self._validate_data(
                     tree_cover_df, primary_forest_df, carbon_df
                 )
+            
+            # Completed outside the step so its checkpoint is saved first
+            if validate_only:
+                logger.info("Validation-only mode. Stopping pipeline.")
+                pipeline_mgr.complete_session()
+                return validation_results
                 
-                if validate_only:
-                    logger.info("Validation-only mode. Stopping pipeline.")
-                    pipeline_mgr.complete_session()
-                    return validation_results
-                    
-                if not validation_results["valid"]:
-                    logger.warning(f"Data validation has warnings: {validation_results['warnings']}")
-                    # Continue anyway for now
+            if not validation_results["valid"]:
+                logger.warning(f"Data validation has warnings: {validation_results['warnings']}")
+                # Continue anyway for now
             
             # STEP 3: Clean data with transaction
             with pipeline_mgr.transaction("clean_data"):
                 logger.info("Step 3: Cleaning data")
                 cleaner = DataCleaner()
                 
-                tree_cover_df = cleaner.clean_country_names(tree_cover_df)
-                primary_forest_df = cleaner.clean_country_names(primary_forest_df)
-                carbon_df = cleaner.clean_country_names(carbon_df)
-                
-                # Fix negative values where inappropriate
-                tree_cover_df = cleaner.fix_negative_values(
-                    tree_cover_df, ["tree_cover_loss_ha", "extent_2000_ha"]
+                # Standardize country names and fix negative values where
+                # inappropriate, one lazy query per dataset
+                tree_cover_df = cleaner.clean(
+                    tree_cover_df, negative_columns=["tree_cover_loss_ha", "extent_2000_ha"]
                 )
-                carbon_df = cleaner.fix_negative_values(
-                    carbon_df, ["carbon_emissions_mg_co2e"]  # Note: net_flux can be negative
+                primary_forest_df = cleaner.clean(primary_forest_df)
+                carbon_df = cleaner.clean(
+                    carbon_df, negative_columns=["carbon_emissions_mg_co2e"]  # Note: net_flux can be negative
                 )
             
             # STEP 4: Transform data with transaction
@@ -204,16 +211,27 @@ class NexusPipeline:
             # STEP 6: Create dimension tables with transaction
             with pipeline_mgr.transaction("create_dimensions"):
                 logger.info("Step 6: Creating dimension tables")
-                dimensions = exporter.create_dimension_tables()
+                dimensions = exporter.create_dimension_tables(fact_dfs={
+                    "fact_tree_cover_loss": tree_cover_fact,
+                    "fact_primary_forest": primary_forest_fact,
+                    "fact_carbon": carbon_fact,
+                })
                 self.stats["dimension_tables"] = {
                     name: len(df) for name, df in dimensions.items()
                 }
+                
+                # Rebuild aggregate views over the freshly loaded facts
+                view_manager = ViewManager(db_path)
+                view_manager.refresh_materialized_views()
+                view_manager.close()
             
             # STEP 7: Validate export with transaction
             with pipeline_mgr.transaction("validate_export"):
                 logger.info("Step 7: Validating exported data")
                 validation = exporter.validate_export()
                 self.stats["export_validation"] = validation
+                exporter.schema_manager.verify_query_plans()
+                exporter.close()
             
             # Calculate total time
             self.stats["total_time"] = time.time() - self.start_time
@@ -237,6 +255,7 @@ class NexusPipeline:
             
             # Mark pipeline session as complete
             pipeline_mgr.complete_session()
+            metadata_manager.flush()
             
             # Final summary
             self._print_summary()
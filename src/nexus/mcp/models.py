@@ -61,7 +61,7 @@ class QueryRequest(BaseModel):
     @validator('threshold')
     def validate_threshold(cls, v):
         if v not in ALL_THRESHOLDS:
-            raise ValueError(f"Threshold must be one of {ALL_THRESHOLDS}")
+            raise ValueError(f"Threshold must be one of {list(ALL_THRESHOLDS)}")
         return v
         
     class Config:
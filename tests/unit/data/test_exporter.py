@@ -0,0 +1,180 @@
+"""
+Unit tests for the SQLite database exporter.
+"""
+import sqlite3
+
+import pytest
+import polars as pl
+
+from nexus.data.database.exporter import DatabaseExporter, build_insert_sql, iter_row_batches
+
+
+@pytest.fixture
+def exporter(temp_db_path):
+    """Create an exporter with an initialized schema in a temporary database."""
+    exporter = DatabaseExporter(temp_db_path)
+    exporter.initialize_database()
+    return exporter
+
+
+@pytest.fixture
+def tree_cover_fact():
+    """Small tree cover fact table in long format."""
+    return pl.DataFrame({
+        "country": ["Brazil", "Brazil", "Peru"],
+        "year": [2001, 2002, 2001],
+        "threshold": [30, 30, 30],
+        "tree_cover_loss_ha": [1000.0, None, 600.0],
+        "extent_2000_ha": [900000.0, 900000.0, 280000.0],
+        "data_quality_flag": ["VALID", "NULL", "VALID"],
+    })
+
+
+def test_iter_row_batches():
+    """Batches should cover every row in order without exceeding the batch size."""
+    df = pl.DataFrame({"year": list(range(7)), "value": [float(i) for i in range(7)]})
+
+    batches = list(iter_row_batches(df, batch_size=3))
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert batches[2] == [(6, 6.0)]
+
+
+def test_build_insert_sql():
+    """Column names should be quoted and matched with one placeholder each."""
+    sql = build_insert_sql("fact_tree_cover_loss", ("country", "gain_2000-2012_ha"))
+
+    assert sql == 'INSERT INTO fact_tree_cover_loss ("country", "gain_2000-2012_ha") VALUES (?,?)'
+    assert build_insert_sql("fact_tree_cover_loss", ("country", "gain_2000-2012_ha")) is sql
+
+
+class TestExportDataframe:
+    """Test exporting DataFrames to SQLite."""
+
+    def test_export_round_trip(self, exporter, tree_cover_fact, temp_db_path):
+        """Exported rows should match the source DataFrame."""
+        row_count = exporter.export_dataframe(tree_cover_fact, "fact_tree_cover_loss")
+        assert row_count == 3
+
+        conn = sqlite3.connect(temp_db_path)
+        try:
+            rows = conn.execute("""
+                SELECT country, year, tree_cover_loss_ha
+                FROM fact_tree_cover_loss
+                ORDER BY country, year
+            """).fetchall()
+        finally:
+            conn.close()
+
+        assert rows == [("Brazil", 2001, 1000.0), ("Brazil", 2002, None), ("Peru", 2001, 600.0)]
+
+    def test_export_replace(self, exporter, tree_cover_fact):
+        """Exporting twice with replace should not duplicate rows."""
+        exporter.export_dataframe(tree_cover_fact, "fact_tree_cover_loss")
+        row_count = exporter.export_dataframe(tree_cover_fact, "fact_tree_cover_loss")
+        assert row_count == 3
+
+    def test_export_multiple_batches(self, exporter):
+        """Frames larger than one batch should be fully exported."""
+        n = 25000
+        df = pl.DataFrame({
+            "year": list(range(n)),
+            "decade": ["2000s"] * n,
+            "period": ["Early 2000s"] * n,
+        })
+        assert exporter.export_dataframe(df, "dim_time") == n
+
+
+class TestExportAllTables:
+    """Test the full fact table export."""
+
+    def test_indexes_built_after_export(self, exporter, tree_cover_fact, temp_db_path):
+        """Fact table indexes are deferred until the bulk load has finished."""
+        assert "fact_tree_cover_loss" not in exporter.schema_manager.verify_indexes()
+
+        primary_fact = pl.DataFrame({
+            "country": ["Brazil"],
+            "year": [2002],
+            "threshold": [30],
+            "primary_forest_loss_ha": [500.0],
+            "is_tropical": [True],
+            "loss_status": ["LOSS_RECORDED"],
+        })
+        carbon_fact = pl.DataFrame({
+            "country": ["Brazil"],
+            "year": [2001],
+            "threshold": [30],
+            "carbon_emissions_mg_co2e": [100.0],
+            "carbon_flux_status": ["SOURCE"],
+        })
+
+        results = exporter.export_all_tables(tree_cover_fact, primary_fact, carbon_fact)
+
+        assert results == {
+            "fact_tree_cover_loss": 3,
+            "fact_primary_forest": 1,
+            "fact_carbon": 1,
+        }
+        assert exporter.schema_manager.missing_indexes() == []
+
+    def test_shared_connection_closed_after_export(self, exporter, tree_cover_fact):
+        """export_all_tables should release the shared connection when done."""
+        empty = pl.DataFrame({"country": [], "year": [], "threshold": []},
+                             schema={"country": pl.Utf8, "year": pl.Int32, "threshold": pl.Int32})
+
+        exporter.export_all_tables(tree_cover_fact, empty, empty)
+        assert exporter._conn is None
+
+        # Connections the schema manager opened on its own are released too
+        exporter.schema_manager.verify_query_plans()
+        exporter.close()
+        assert exporter.schema_manager._connections == []
+
+        # Later steps reopen the connection on demand
+        dimensions = exporter.create_dimension_tables()
+        assert dimensions["dim_location"]["country"].to_list() == ["Brazil", "Peru"]
+        exporter.close()
+
+
+class TestCreateDimensionTables:
+    """Test dimension table derivation from fact tables."""
+
+    def test_location_and_time_dimensions(self, exporter, tree_cover_fact):
+        """Dimensions should list each country and year once with derived labels."""
+        primary_fact = pl.DataFrame({
+            "country": ["Brazil"],
+            "year": [2011],
+            "threshold": [30],
+            "is_tropical": [True],
+        })
+        exporter.export_dataframe(tree_cover_fact, "fact_tree_cover_loss")
+        exporter.export_dataframe(primary_fact, "fact_primary_forest")
+
+        dimensions = exporter.create_dimension_tables()
+
+        assert dimensions["dim_location"].rows() == [("Brazil", 1), ("Peru", 0)]
+        assert dimensions["dim_time"].rows() == [
+            (2001, "2000s", "Early 2000s"),
+            (2002, "2000s", "Early 2000s"),
+            (2011, "2010s", "Early 2010s"),
+        ]
+
+    def test_dimensions_from_in_memory_facts(self, exporter, tree_cover_fact):
+        """In-memory fact frames should give the same dimensions as the database."""
+        primary_fact = pl.DataFrame({
+            "country": ["Brazil"],
+            "year": [2011],
+            "threshold": [30],
+            "is_tropical": [True],
+        })
+        exporter.export_dataframe(tree_cover_fact, "fact_tree_cover_loss")
+        exporter.export_dataframe(primary_fact, "fact_primary_forest")
+        from_db = exporter.create_dimension_tables()
+
+        from_frames = exporter.create_dimension_tables(fact_dfs={
+            "fact_tree_cover_loss": tree_cover_fact,
+            "fact_primary_forest": primary_fact,
+        })
+
+        for name, df in from_db.items():
+            assert from_frames[name].rows() == df.rows()
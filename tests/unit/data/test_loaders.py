@@ -5,7 +5,83 @@ import pytest
 import polars as pl
 from pathlib import Path
 
-from nexus.data.pipeline.loaders import DataValidator
+from nexus.data.pipeline.loaders import DataValidator, ExcelLoader, list_sheet_names
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Write a small workbook with the required sheets."""
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for sheet_name in ExcelLoader.REQUIRED_SHEETS:
+        ws = wb.create_sheet(sheet_name)
+        ws.append(["country", "threshold", "tc_loss_ha_2001"])
+        ws.append(["Brazil", 30, 1000.0])
+        ws.append(["Peru", 30, 600.0])
+    path = tmp_path / "gfw.xlsx"
+    wb.save(path)
+    return path
+
+
+class TestExcelLoader:
+    """Test reading workbooks."""
+
+    def test_list_sheet_names(self, workbook):
+        """Sheet names should be listed in workbook order."""
+        assert list_sheet_names(workbook) == ExcelLoader.REQUIRED_SHEETS
+
+    def test_load_sheet(self, workbook):
+        """Sheets should load into DataFrames and be cached."""
+        loader = ExcelLoader(workbook)
+        df = loader.load_tree_cover_loss()
+
+        assert df.columns == ["country", "threshold", "tc_loss_ha_2001"]
+        assert df["country"].to_list() == ["Brazil", "Peru"]
+        assert loader.load_tree_cover_loss() is df
+
+    def test_parquet_cache(self, workbook, monkeypatch):
+        """A second loader should read the Parquet copy instead of the workbook."""
+        first = ExcelLoader(workbook).load_primary_forest()
+        cached = list((workbook.parent / ".nexus_cache").glob("*.parquet"))
+        assert len(cached) == 1
+
+        def fail_read_excel(*args, **kwargs):
+            raise AssertionError("workbook should not be parsed again")
+
+        monkeypatch.setattr(pl, "read_excel", fail_read_excel)
+        assert ExcelLoader(workbook).load_primary_forest().equals(first)
+
+    def test_parquet_cache_disabled(self, workbook):
+        """No Parquet copy is written when the cache is turned off."""
+        ExcelLoader(workbook, parquet_cache=False).load_primary_forest()
+        assert not (workbook.parent / ".nexus_cache").exists()
+
+    def test_load_all_sheets(self, workbook):
+        """Every required sheet should be loaded and cached."""
+        loader = ExcelLoader(workbook, parquet_cache=False)
+        sheets = loader.load_all_sheets()
+
+        assert list(sheets) == ExcelLoader.REQUIRED_SHEETS
+        assert all(df.height == 2 for df in sheets.values())
+        assert loader.get_cache_size() == 3
+
+    def test_sheet_info(self, workbook):
+        """Sheet info should summarise columns and null counts."""
+        info = ExcelLoader(workbook).get_sheet_info("Country tree cover loss")
+
+        assert info["rows"] == 2
+        assert info["years_range"] == (2001, 2001)
+        assert info["null_counts"] == {"country": 0, "threshold": 0, "tc_loss_ha_2001": 0}
+
+    def test_missing_sheet_rejected(self, tmp_path):
+        """Workbooks without the required sheets should fail validation."""
+        openpyxl = pytest.importorskip("openpyxl")
+        path = tmp_path / "empty.xlsx"
+        openpyxl.Workbook().save(path)
+
+        with pytest.raises(ValueError):
+            ExcelLoader(path)
 
 
 class TestDataValidator:
@@ -0,0 +1,188 @@
+"""
+Unit tests for the metadata manager.
+"""
+import dataclasses
+import gc
+import weakref
+from datetime import datetime
+
+import orjson
+import pytest
+
+from nexus.config.settings import settings
+from nexus.data.metadata.metadata_manager import MetadataManager, get_metadata_manager, metadata_manager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Point the shared metadata manager at a temporary directory."""
+    monkeypatch.setattr(metadata_manager, "metadata_dir", tmp_path)
+    monkeypatch.setattr(metadata_manager, "semantic", metadata_manager.semantic)
+    monkeypatch.setattr(metadata_manager, "runtime", metadata_manager.runtime)
+    return metadata_manager
+
+
+class TestMetadataPersistence:
+    """Test saving and reloading metadata files."""
+
+    def test_semantic_round_trip(self, manager, tmp_path):
+        """Saved semantic metadata should reload unchanged."""
+        original = manager.semantic
+        manager.save_semantic_metadata()
+
+        data = orjson.loads((tmp_path / "semantic.json").read_bytes())
+        assert data["tropical_countries"] == sorted(original.tropical_countries)
+
+        manager._load_semantic_metadata()
+        assert manager.semantic.tropical_countries == original.tropical_countries
+        assert isinstance(manager.semantic.tropical_countries, frozenset)
+        assert manager.semantic.sql_templates == original.sql_templates
+
+    def test_runtime_legacy_layout(self, manager, tmp_path):
+        """Files with separate row_counts and validation_status maps still load."""
+        manager.save_runtime_metadata()
+        data = orjson.loads((tmp_path / "runtime.json").read_bytes())
+        del data["tables"]
+        data["row_counts"] = {"fact_carbon": 5}
+        data["validation_status"] = {"fact_carbon": "PASS", "fact_primary_forest": "FAIL"}
+        (tmp_path / "runtime.json").write_bytes(orjson.dumps(data))
+
+        manager._load_runtime_metadata()
+
+        assert manager.runtime.row_counts == {"fact_carbon": 5, "fact_primary_forest": 0}
+        assert manager.runtime.tables["fact_primary_forest"].validation == "FAIL"
+
+    def test_runtime_round_trip(self, manager):
+        """Datetimes should be written as ISO strings and parsed back."""
+        run = datetime(2024, 5, 1, 12, 30, 15, 250)
+        manager.runtime = dataclasses.replace(manager.runtime, last_pipeline_run=run)
+        manager.save_runtime_metadata()
+
+        manager._load_runtime_metadata()
+        assert manager.runtime.last_pipeline_run == run
+
+    def test_semantic_cache_tracks_json(self, manager, tmp_path):
+        """The pickled snapshot is reused until semantic.json changes."""
+        manager.save_semantic_metadata()
+        manager._load_semantic_metadata()
+        assert (tmp_path / "semantic.cache").exists()
+
+        assert manager._load_semantic_cache(tmp_path / "semantic.json")
+
+        data = orjson.loads((tmp_path / "semantic.json").read_bytes())
+        data["thresholds"] = [30]
+        (tmp_path / "semantic.json").write_bytes(orjson.dumps(data))
+
+        assert not manager._load_semantic_cache(tmp_path / "semantic.json")
+        manager._load_semantic_metadata()
+        assert manager.semantic.thresholds == (30,)
+
+
+def test_shared_instance():
+    """The factory should always hand out the module-level instance."""
+    assert get_metadata_manager() is metadata_manager
+    assert get_metadata_manager() is get_metadata_manager()
+
+
+class TestLookups:
+    """Test the read-side metadata lookups."""
+
+    def test_tropical_lookup_follows_reload(self, manager, tmp_path):
+        """Membership checks should reflect the semantic metadata last loaded."""
+        manager.save_semantic_metadata()
+        data = orjson.loads((tmp_path / "semantic.json").read_bytes())
+        data["tropical_countries"] = ["Atlantis"]
+        (tmp_path / "semantic.json").write_bytes(orjson.dumps(data))
+
+        manager._load_semantic_metadata()
+
+        assert manager.is_tropical_country("Atlantis")
+        assert not manager.is_tropical_country("Brazil")
+
+    def test_table_metadata(self, manager, monkeypatch):
+        """Row count and validation come from one per-table entry."""
+        monkeypatch.setattr(manager, "runtime", dataclasses.replace(manager.runtime, tables={}))
+        manager.update_runtime_stats({
+            "row_counts": {"fact_carbon": 11880},
+            "validation_status": {"fact_carbon": "PASS"},
+        })
+        manager.flush()
+
+        table = manager.get_table_metadata("fact_carbon")
+        assert (table["row_count"], table["validation"]) == (11880, "PASS")
+        assert manager.get_table_metadata("fact_missing")["validation"] == "UNKNOWN"
+        assert "fact_missing" not in manager.runtime.tables
+
+    def test_valid_thresholds(self, manager):
+        """Carbon and primary forest have fixed thresholds; others use the metadata."""
+        assert manager.get_valid_thresholds("carbon") == (30, 50, 75)
+        assert manager.get_valid_thresholds("primary_forest") == (30,)
+        assert manager.get_valid_thresholds() is manager.semantic.thresholds
+
+    def test_valid_thresholds_are_immutable(self, manager):
+        """Returned thresholds are shared tuples that callers cannot modify."""
+        assert isinstance(manager.get_valid_thresholds("carbon"), tuple)
+        assert isinstance(manager.get_valid_thresholds(), tuple)
+
+
+def test_failed_save_keeps_previous_file(manager, tmp_path, monkeypatch):
+    """A write that fails part-way must leave the last good file in place."""
+    manager.save_runtime_metadata()
+    before = (tmp_path / "runtime.json").read_bytes()
+
+    def fail_fsync(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("nexus.data.metadata.metadata_manager.os.fsync", fail_fsync)
+    with pytest.raises(OSError):
+        manager.save_runtime_metadata()
+
+    assert (tmp_path / "runtime.json").read_bytes() == before
+    assert [path.name for path in tmp_path.iterdir()] == ["runtime.json"]
+
+
+def test_runtime_updates_are_buffered(manager, tmp_path, monkeypatch):
+    """Stat updates apply in memory at once and reach disk on flush."""
+    monkeypatch.setattr(manager, "runtime", dataclasses.replace(manager.runtime, tables={}))
+    monkeypatch.setattr(manager, "FLUSH_INTERVAL", 60.0)
+
+    manager.update_runtime_stats({"row_counts": {"fact_carbon": 7}})
+    manager.update_runtime_stats({"row_counts": {"fact_primary_forest": 3}})
+
+    assert manager.runtime.row_counts == {"fact_carbon": 7, "fact_primary_forest": 3}
+    assert not (tmp_path / "runtime.json").exists()
+
+    manager.flush()
+
+    data = orjson.loads((tmp_path / "runtime.json").read_bytes())
+    assert data["tables"] == {
+        "fact_carbon": {"row_count": 7, "validation": "UNKNOWN"},
+        "fact_primary_forest": {"row_count": 3, "validation": "UNKNOWN"},
+    }
+
+
+def test_to_dict_matches_saved_json(manager, tmp_path):
+    """to_dict should produce the same document that is written to disk."""
+    manager.save_semantic_metadata()
+    manager.save_runtime_metadata()
+
+    semantic = orjson.loads(orjson.dumps(manager.semantic.to_dict()))
+    assert semantic == orjson.loads((tmp_path / "semantic.json").read_bytes())
+
+    runtime = orjson.loads(orjson.dumps(manager.runtime.to_dict()))
+    assert runtime == orjson.loads((tmp_path / "runtime.json").read_bytes())
+
+
+def test_discarded_manager_is_collected(tmp_path, monkeypatch):
+    """Neither exit cleanup nor a pending flush keeps a dropped manager alive."""
+    monkeypatch.setattr(settings, "CONFIG_DIR", tmp_path)
+    manager = MetadataManager()
+    manager.update_runtime_stats({"row_counts": {"fact_carbon": 7}})
+    timer = manager._flush_timer
+    ref = weakref.ref(manager)
+
+    del manager
+    gc.collect()
+
+    assert ref() is None
+    timer.cancel()
@@ -0,0 +1,100 @@
+"""
+Unit tests for the transactional pipeline manager.
+"""
+import json
+
+import pytest
+
+from nexus.config.settings import settings
+from nexus.data.pipeline import pipeline_manager as pipeline_manager_module
+from nexus.data.pipeline.pipeline_manager import PipelineManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Pipeline manager writing checkpoints to a temporary directory."""
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(
+        pipeline_manager_module.metadata_manager, "update_runtime_stats", lambda stats: None
+    )
+    return PipelineManager()
+
+
+def test_checkpoints_appended_to_log(manager):
+    """Each checkpoint adds one line to the session log."""
+    manager.start_session("run")
+    with manager.transaction("load_data"):
+        pass
+    with manager.transaction("clean_data"):
+        pass
+
+    lines = (manager.checkpoint_dir / "run.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["id"] == "run"
+    assert [json.loads(line)["step"] for line in lines[1:]] == ["load_data", "clean_data"]
+    assert not (manager.checkpoint_dir / "run.json").exists()
+
+
+def test_complete_session_consolidates_log(manager):
+    """Completing a session writes one JSON file and removes the log."""
+    manager.start_session("run")
+    with manager.transaction("load_data"):
+        pass
+    manager.complete_session()
+
+    assert not (manager.checkpoint_dir / "run.jsonl").exists()
+    session = json.loads((manager.checkpoint_dir / "run.json").read_text())
+    assert session["status"] == "completed"
+    assert [cp["step"] for cp in session["checkpoints"]] == ["load_data"]
+
+
+def test_checkpoint_after_completion(manager):
+    """A step that finishes after the session completed leaves the saved session alone."""
+    manager.start_session("run")
+    with manager.transaction("validate_data"):
+        manager.complete_session()
+    with manager.transaction("clean_data"):
+        pass
+
+    assert not (manager.checkpoint_dir / "run.jsonl").exists()
+    session = json.loads((manager.checkpoint_dir / "run.json").read_text())
+    assert session["checkpoints"] == []
+
+
+def test_history_includes_unfinished_sessions(manager):
+    """Sessions that never completed are rebuilt from their logs."""
+    manager.start_session("done")
+    manager.complete_session()
+
+    manager.start_session("failed")
+    with pytest.raises(RuntimeError):
+        with manager.transaction("export_data"):
+            raise RuntimeError("disk full")
+
+    history = {session["id"]: session for session in manager.get_session_history()}
+
+    assert history["done"]["status"] == "completed"
+    assert history["failed"]["status"] == "running"
+    assert history["failed"]["checkpoints"][0]["error"] == "disk full"
+
+
+def test_history_uses_session_index(manager):
+    """History is ordered from the index and limited before sessions are loaded."""
+    for session_id in ["first", "second", "third"]:
+        manager.start_session(session_id)
+        manager.complete_session()
+
+    index = (manager.checkpoint_dir / "sessions.idx").read_text().splitlines()
+    assert [line.split("\t")[0] for line in index] == ["first", "second", "third"]
+
+    history = manager.get_session_history(limit=2)
+    assert [session["id"] for session in history] == ["third", "second"]
+
+
+def test_session_index_rebuilt_from_files(manager):
+    """Existing session files are indexed when no index exists yet."""
+    manager.start_session("old")
+    manager.complete_session()
+    (manager.checkpoint_dir / "sessions.idx").unlink()
+
+    assert [session["id"] for session in manager.get_session_history()] == ["old"]
+    assert (manager.checkpoint_dir / "sessions.idx").exists()
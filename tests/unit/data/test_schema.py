@@ -0,0 +1,319 @@
+"""
+Unit tests for the SQLite schema manager.
+"""
+import dataclasses
+import sqlite3
+
+import pytest
+
+from nexus.data.database.schema import (
+    ALL_SCHEMAS,
+    FACT_TREE_COVER_SCHEMA,
+    SchemaManager,
+    load_schema_sql,
+    normalize_sql,
+    plan_aliases,
+    render_schema_sql,
+)
+
+DECLARED_INDEXES = {index.name for schema in ALL_SCHEMAS for index in schema.indexes}
+
+
+@pytest.fixture
+def schema_manager(temp_db_path):
+    """Create a schema manager for a temporary database."""
+    return SchemaManager(temp_db_path)
+
+
+def _index_names(db_path):
+    """Return the names of user-defined indexes in a database file."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+            )
+        }
+    finally:
+        conn.close()
+
+
+class TestIndexCreation:
+    """Test immediate and deferred index creation."""
+
+    def test_create_all_tables_builds_indexes(self, schema_manager, temp_db_path):
+        """By default every declared index is created with its table."""
+        schema_manager.create_all_tables()
+        assert _index_names(temp_db_path) == DECLARED_INDEXES
+
+    def test_deferred_indexes_finalized(self, schema_manager, temp_db_path):
+        """Deferred fact table indexes should appear once finalized."""
+        schema_manager.create_all_tables(defer_indexes=True)
+        assert _index_names(temp_db_path) == set()
+        assert set(schema_manager.missing_indexes()) == DECLARED_INDEXES
+
+        schema_manager.finalize_indexes()
+        assert _index_names(temp_db_path) == DECLARED_INDEXES
+        assert schema_manager.missing_indexes() == []
+
+    def test_ensure_indexes_recovers_interrupted_load(self, schema_manager, temp_db_path):
+        """Missing indexes are rebuilt on startup, and only when needed."""
+        schema_manager.create_all_tables(defer_indexes=True)
+
+        assert schema_manager.ensure_indexes() is True
+        assert schema_manager.ensure_indexes() is False
+        assert _index_names(temp_db_path) == DECLARED_INDEXES
+
+    def test_missing_indexes_ignores_absent_tables(self, schema_manager):
+        """An empty database has no tables, so nothing needs rebuilding."""
+        assert schema_manager.missing_indexes() == []
+
+    def test_ensure_indexes_migrates_retired_indexes(self, schema_manager, temp_db_path):
+        """Indexes from older schema versions are replaced by the current ones."""
+        schema_manager.create_all_tables()
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("DROP INDEX idx_carbon_threshold_country_year")
+        conn.execute("CREATE INDEX idx_carbon_country_year ON fact_carbon (country, year, threshold)")
+        conn.commit()
+        conn.close()
+
+        assert schema_manager.ensure_indexes() is True
+        assert _index_names(temp_db_path) == DECLARED_INDEXES
+
+
+class TestPragmas:
+    """Test database-level pragmas set during schema creation."""
+
+    def test_persistent_pragmas(self, schema_manager, temp_db_path):
+        """Page size and WAL journaling should persist in the database file."""
+        schema_manager.create_all_tables()
+
+        conn = sqlite3.connect(temp_db_path)
+        try:
+            assert conn.execute("PRAGMA page_size").fetchone()[0] == 4096
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
+
+
+class TestVerifyIndexesCache:
+    """Test schema-version keyed caching of index listings."""
+
+    def test_cache_invalidated_by_ddl(self, schema_manager, temp_db_path):
+        """Cached results are reused until the schema changes."""
+        schema_manager.create_all_tables()
+        first = schema_manager.verify_indexes()
+        assert schema_manager.verify_indexes() == first
+
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("DROP INDEX idx_tcl_year")
+        conn.commit()
+        conn.close()
+
+        assert "idx_tcl_year" not in schema_manager.verify_indexes()["fact_tree_cover_loss"]
+
+    def test_cache_invalidated_by_replaced_file(self, temp_db_path):
+        """A new file at the same path is not served the old file's indexes."""
+        other_path = temp_db_path.with_name("other.db")
+        for path, ddl in (
+            (temp_db_path, "CREATE TABLE extra (id INTEGER)"),
+            (other_path, "DROP INDEX idx_tcl_year"),
+        ):
+            manager = SchemaManager(path)
+            manager.create_all_tables()
+            conn = sqlite3.connect(path)
+            conn.execute(ddl)
+            conn.commit()
+            conn.close()
+            if path == temp_db_path:
+                assert "idx_tcl_year" in manager.verify_indexes()["fact_tree_cover_loss"]
+            manager.close()
+
+        # Same path and schema_version as the cached listing
+        other_path.replace(temp_db_path)
+
+        manager = SchemaManager(temp_db_path)
+        try:
+            assert "idx_tcl_year" not in manager.verify_indexes()["fact_tree_cover_loss"]
+        finally:
+            manager.close()
+
+
+class TestDropAllTables:
+    """Test dropping the schema."""
+
+    def test_drops_reflected_objects(self, schema_manager, temp_db_path):
+        """Objects outside the declared schemas should be dropped as well."""
+        schema_manager.create_all_tables()
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("CREATE VIEW v_extra AS SELECT country FROM fact_carbon")
+        conn.execute('CREATE TABLE "extra-table" (id INTEGER)')
+        conn.commit()
+
+        schema_manager.drop_all_tables(conn)
+
+        remaining = conn.execute(
+            "SELECT name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+        conn.close()
+        assert remaining == []
+
+
+class TestCoveringIndexes:
+    """Test the threshold = 30 partial covering indexes."""
+
+    def test_threshold_30_aggregate_is_index_only(self, schema_manager, temp_db_path):
+        """Aggregates at threshold 30 should not need to visit the table."""
+        schema_manager.create_all_tables()
+        conn = sqlite3.connect(temp_db_path)
+        conn.executemany(
+            "INSERT INTO fact_tree_cover_loss (country, year, threshold, tree_cover_loss_ha) VALUES (?, ?, ?, ?)",
+            [(f"c{i}", year, threshold, 1.0)
+             for i in range(50) for year in range(2001, 2024) for threshold in (10, 30, 75)],
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+
+        plan = conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT year, SUM(tree_cover_loss_ha) FROM fact_tree_cover_loss
+            WHERE threshold = 30 GROUP BY year
+        """).fetchall()
+        conn.close()
+
+        assert any("COVERING INDEX idx_tcl_t30_covering" in row[3] for row in plan)
+
+
+class TestGeneratedColumns:
+    """Test generated columns on the fact tables."""
+
+    def test_carbon_role_generated_on_insert(self, schema_manager, temp_db_path):
+        """carbon_role should be derived from the net flux."""
+        schema_manager.create_all_tables()
+        conn = sqlite3.connect(temp_db_path)
+        conn.executemany(
+            "INSERT INTO fact_carbon (country, year, threshold, carbon_net_flux_annual_avg) VALUES (?, ?, 30, ?)",
+            [("Brazil", 2001, -5.0), ("Brazil", 2002, 5.0), ("Brazil", 2003, None)],
+        )
+        roles = [row[0] for row in conn.execute("SELECT carbon_role FROM fact_carbon ORDER BY year")]
+        conn.close()
+
+        assert roles == ["Carbon Sink", "Carbon Source", "Carbon Neutral"]
+
+    def test_generated_column_added_to_existing_table(self, schema_manager, temp_db_path):
+        """Tables from an older schema gain the generated column."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("""
+            CREATE TABLE fact_carbon (
+                country TEXT NOT NULL, year INTEGER NOT NULL, threshold INTEGER NOT NULL,
+                carbon_emissions_mg_co2e REAL, carbon_emissions_annual_avg REAL,
+                carbon_removals_annual_avg REAL, carbon_net_flux_annual_avg REAL,
+                carbon_density_mg_c_ha REAL, carbon_flux_status TEXT,
+                PRIMARY KEY (country, year, threshold)
+            )
+        """)
+        conn.execute(
+            "INSERT INTO fact_carbon (country, year, threshold, carbon_net_flux_annual_avg) "
+            "VALUES ('Peru', 2001, 30, -1.0)"
+        )
+        conn.commit()
+        conn.close()
+
+        schema_manager.create_all_tables()
+
+        conn = sqlite3.connect(temp_db_path)
+        assert conn.execute("SELECT carbon_role FROM fact_carbon").fetchone()[0] == "Carbon Sink"
+        conn.close()
+
+
+def test_shipped_schema_sql_is_current():
+    """_schema.sql must be regenerated (tools/build_schema_sql.py) after schema edits."""
+    assert load_schema_sql() == render_schema_sql()
+
+
+def test_without_rowid_tables(schema_manager, temp_db_path):
+    """Dimension tables and fact_primary_forest are clustered on their keys."""
+    schema_manager.create_all_tables()
+    conn = sqlite3.connect(temp_db_path)
+    sql = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'"))
+    conn.close()
+
+    for table in ["dim_location", "dim_time", "fact_primary_forest"]:
+        assert sql[table].endswith("WITHOUT ROWID")
+    assert not sql["fact_carbon"].endswith("WITHOUT ROWID")
+
+
+def test_verify_query_plans(schema_manager, caplog):
+    """Plans for the schema views should use indexes for country/year lookups."""
+    schema_manager.create_all_tables()
+
+    plans = schema_manager.verify_query_plans()
+
+    assert set(plans) == {"v_primary_forest_percentage", "v_carbon_intensity", "v_annual_summary"}
+    assert all(plans.values())
+    assert "plan scans" not in caplog.text
+
+
+def test_verify_query_plans_warns_on_scans(temp_db_path, caplog):
+    """Full scans are reported by table name, including tables used under an alias."""
+    SchemaManager(temp_db_path).create_all_tables()
+    conn = sqlite3.connect(temp_db_path)
+    conn.executescript("""
+        DROP INDEX idx_tcl_year;
+        DROP INDEX idx_tcl_threshold_country_year;
+        DROP INDEX idx_tcl_t30_covering;
+        DROP VIEW v_carbon_intensity;
+        CREATE VIEW v_carbon_intensity AS
+        SELECT c.year, c.carbon_emissions_mg_co2e
+        FROM fact_carbon c;
+    """)
+    conn.close()
+
+    SchemaManager(temp_db_path).verify_query_plans()
+
+    assert "v_annual_summary plan scans all of fact_tree_cover_loss through" in caplog.text
+    assert "v_carbon_intensity plan scans fact_carbon without an index" in caplog.text
+    assert "v_primary_forest_percentage plan" not in caplog.text
+
+
+def test_plan_aliases():
+    """FROM/JOIN aliases resolve to their tables; keywords are not aliases."""
+    aliases = plan_aliases(
+        "CREATE VIEW v AS SELECT * FROM fact_tree_cover_loss t "
+        "LEFT JOIN fact_primary_forest AS p ON t.country = p.country "
+        "JOIN fact_carbon WHERE t.year = 2020"
+    )
+
+    assert aliases == {
+        "fact_tree_cover_loss": "fact_tree_cover_loss",
+        "t": "fact_tree_cover_loss",
+        "fact_primary_forest": "fact_primary_forest",
+        "p": "fact_primary_forest",
+        "fact_carbon": "fact_carbon",
+    }
+
+
+def test_table_schemas_are_immutable():
+    """Schema definitions are frozen, hashable and precompile their DDL."""
+    assert len(set(ALL_SCHEMAS)) == len(ALL_SCHEMAS)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        FACT_TREE_COVER_SCHEMA.name = "other"
+
+    assert FACT_TREE_COVER_SCHEMA.index_sqls[-1] == (
+        "CREATE INDEX IF NOT EXISTS idx_tcl_t30_covering ON fact_tree_cover_loss "
+        '("country", "year", "tree_cover_loss_ha", "threshold") WHERE threshold = 30'
+    )
+
+
+def test_normalize_sql():
+    """Whitespace and comments collapse outside quoted literals and identifiers."""
+    sql = """
+        SELECT  'Carbon  Sink' AS role,   -- don't keep this
+                "gain_2000-2012_ha"
+        FROM fact_carbon
+    """
+
+    assert normalize_sql(sql) == (
+        "SELECT 'Carbon  Sink' AS role, \"gain_2000-2012_ha\" FROM fact_carbon"
+    )
+    assert normalize_sql(normalize_sql(sql)) == normalize_sql(sql)
@@ -2,6 +2,8 @@
 Unit tests for data transformation pipeline.
 Tests each transformer with sample data to verify correct output structure.
 """
+import sqlite3
+
 import pytest
 import polars as pl
 from datetime import datetime
@@ -11,6 +13,7 @@ from nexus.data.pipeline.transformers import (
     PrimaryForestTransformer,
     CarbonTransformer
 )
+from nexus.data.database.exporter import DatabaseExporter
 from nexus.data.pipeline.cleaners import DataCleaner
 from nexus.data.pipeline.validators import DataValidator
 from nexus.data.metadata.metadata_manager import metadata_manager
@@ -103,6 +106,17 @@ class TestTreeCoverTransformer:
             (pl.col("country") == "Indonesia") & (pl.col("year") == 2002)
         ).to_dicts()[0]
         assert indonesia_2002["data_quality_flag"] == "ZERO"
+    
+    def test_invalid_quality_flag(self, sample_tree_cover_data):
+        """Negative losses are flagged INVALID and positive ones VALID."""
+        data = sample_tree_cover_data.with_columns(
+            pl.when(pl.col("country") == "Peru").then(-5).otherwise(pl.col("tc_loss_ha_2003"))
+            .alias("tc_loss_ha_2003")
+        )
+        
+        result = TreeCoverTransformer().transform(data).filter(pl.col("year") == 2003)
+        
+        assert result["data_quality_flag"].to_list() == ["VALID", "VALID", "INVALID"]
 
 
 class TestPrimaryForestTransformer:
@@ -139,7 +153,7 @@ class TestPrimaryForestTransformer:
         assert len(thresholds) == 1
         assert thresholds[0] == PRIMARY_THRESHOLD
     
-    def test_tropical_flag(self, sample_primary_data):
+    def test_tropical_flag(self, sample_primary_data, caplog):
         """Test tropical country flag."""
         # Add a non-tropical country for testing
         data = pl.concat([
@@ -161,6 +175,7 @@ class TestPrimaryForestTransformer:
         
         canada = result.filter(pl.col("country") == "Canada").to_dicts()[0]
         assert canada["is_tropical"] == False
+        assert "non-tropical countries in primary forest data: ['Canada']" in caplog.text
     
     def test_loss_status(self, sample_primary_data):
         """Test loss status categorization."""
@@ -282,6 +297,87 @@ class TestCarbonTransformer:
         
         neutral = result.filter(pl.col("threshold") == 75).to_dicts()[0]
         assert neutral["carbon_flux_status"] == "NEUTRAL"
+        
+        assert isinstance(result.schema["carbon_flux_status"], pl.Enum)
+    
+    def test_transformation_stats(self, sample_carbon_data):
+        """Stats should describe the output; out-of-range years are dropped."""
+        data = sample_carbon_data.with_columns(
+            pl.lit(1).alias("gfw_forest_carbon_gross_emissions_1999__Mg_CO2e")
+        )
+        
+        transformer = CarbonTransformer()
+        result = transformer.transform(data)
+        
+        assert 1999 not in result["year"].to_list()
+        assert transformer.transformation_stats == {
+            "input_rows": 3,
+            "output_rows": 9,
+            "unique_countries": 1,
+            "unique_years": 3,
+            "unique_thresholds": 3,
+            "thresholds": [30, 50, 75],
+            "null_values": 0,
+            "sinks": 0,
+            "sources": 9,
+            "neutral": 0,
+        }
+    
+    def test_output_path(self, sample_carbon_data, tmp_path):
+        """Writing to Parquet should give the same table, as Float32, and statistics."""
+        transformer = CarbonTransformer()
+        expected = transformer.transform(sample_carbon_data)
+        expected = expected.with_columns(
+            pl.col(col).cast(pl.Float32) for col in CarbonTransformer.FLOAT32_COLUMNS if col in expected.columns
+        )
+        expected_stats = transformer.transformation_stats
+        
+        output_path = tmp_path / "fact_carbon.parquet"
+        assert transformer.transform(sample_carbon_data, output_path=output_path) is None
+        
+        assert pl.read_parquet(output_path).equals(expected)
+        assert transformer.transformation_stats == expected_stats
+    
+    def test_exported_values_round_trip(self, sample_carbon_data, temp_db_path):
+        """Values exported to SQLite should read back exactly as in the source sheet."""
+        data = sample_carbon_data.with_columns(
+            pl.Series("gfw_forest_carbon_gross_emissions_2001__Mg_CO2e", [1000.1, 1_234_567_891.0, 0.3])
+        )
+        fact = CarbonTransformer().transform(data)
+        
+        exporter = DatabaseExporter(temp_db_path)
+        exporter.initialize_database()
+        exporter.export_dataframe(fact, "fact_carbon")
+        exporter.close()
+        
+        conn = sqlite3.connect(temp_db_path)
+        rows = conn.execute(
+            "SELECT carbon_emissions_mg_co2e FROM fact_carbon WHERE year = 2001 ORDER BY threshold"
+        ).fetchall()
+        conn.close()
+        
+        assert [row[0] for row in rows] == [1000.1, 1_234_567_891.0, 0.3]
+    
+    def test_no_years_in_range(self, sample_carbon_data):
+        """A sheet with only out-of-range years should give an empty result."""
+        data = sample_carbon_data.rename({
+            f"gfw_forest_carbon_gross_emissions_{year}__Mg_CO2e": f"gfw_forest_carbon_gross_emissions_{year - 10}__Mg_CO2e"
+            for year in (2001, 2002, 2003)
+        })
+        
+        result = CarbonTransformer().transform(data)
+        
+        assert result.is_empty()
+        assert "carbon_emissions_mg_co2e" in result.columns
+    
+    def test_no_valid_thresholds(self, sample_carbon_data):
+        """Input without carbon thresholds should be rejected."""
+        data = sample_carbon_data.with_columns(
+            pl.lit(10).alias("umd_tree_cover_density_2000__threshold")
+        )
+        
+        with pytest.raises(ValueError):
+            CarbonTransformer().transform(data)
 
 
 class TestDataCleaner:
@@ -302,6 +398,29 @@ class TestDataCleaner:
         assert "Democratic Republic of the Congo" in countries  
         assert "Canada" in countries  # Trimmed
     
+    def test_clean_country_names_trims_before_mapping(self):
+        """Padded variants should be trimmed and then standardized."""
+        df = pl.DataFrame({
+            "country": [" USA ", "Ivory Coast", "United States", None]
+        })
+        
+        cleaner = DataCleaner()
+        result = cleaner.clean_country_names(df)
+        
+        assert result["country"].to_list() == [
+            "United States", "Côte d'Ivoire", "United States", None
+        ]
+        assert cleaner.get_cleaning_summary()["countries_standardized"] == 1
+    
+    def test_clean_country_names_skips_clean_column(self):
+        """An already standardized column should be returned without a rewrite."""
+        df = pl.DataFrame({"country": ["Brazil", "Peru", None, "Brazil"]})
+        
+        cleaner = DataCleaner()
+        
+        assert cleaner.clean_country_names(df) is df
+        assert cleaner.get_cleaning_summary()["countries_standardized"] == 0
+    
     def test_fix_negative_values(self):
         """Test fixing negative values."""
         df = pl.DataFrame({
@@ -317,6 +436,84 @@ class TestDataCleaner:
         
         # net_flux should keep negative (it's allowed)
         assert result["carbon_net_flux_annual_avg"].to_list()[1] == -50
+    
+    def test_fix_negative_values_multiple_columns(self):
+        """Negatives in several columns should be fixed and counted together."""
+        df = pl.DataFrame({
+            "tree_cover_loss_ha": [-1.0, 2.0, None],
+            "extent_2000_ha": [5.0, -3.0, -4.0],
+            "area_ha": [1.0, 2.0, 3.0],
+        })
+        
+        cleaner = DataCleaner()
+        result = cleaner.fix_negative_values(df, ["tree_cover_loss_ha", "extent_2000_ha", "area_ha"])
+        
+        assert result["tree_cover_loss_ha"].to_list() == [None, 2.0, None]
+        assert result["extent_2000_ha"].to_list() == [5.0, None, None]
+        assert result["area_ha"].to_list() == [1.0, 2.0, 3.0]
+        assert cleaner.get_cleaning_summary()["negative_values_fixed"] == 3
+    
+    def test_validate_thresholds_snaps_to_nearest(self):
+        """Invalid thresholds should round to the nearest valid one, ties going down."""
+        df = pl.DataFrame({"threshold": [30, 12, 13, 40, 41, 99, -5, None]})
+        
+        result = DataCleaner().validate_thresholds(df)
+        
+        assert result["threshold"].to_list() == [30, 10, 15, 30, 50, 75, 0, None]
+    
+    def test_cap_impossible_values(self):
+        """Loss above extent and rates above 100% should be capped and counted."""
+        df = pl.DataFrame({
+            "tree_cover_loss_ha": [5.0, 20.0, None, 3.0],
+            "extent_2000_ha": [10.0, 10.0, 1.0, 0.0],
+            "loss_rate_pct": [50.0, 150.0, None, 101.0],
+        })
+        
+        cleaner = DataCleaner()
+        result = cleaner.cap_impossible_values(df)
+        
+        assert result["tree_cover_loss_ha"].to_list() == [5.0, 10.0, None, 3.0]
+        assert result["loss_rate_pct"].to_list() == [50.0, 100.0, None, 100.0]
+        assert cleaner.get_cleaning_summary()["impossible_values_capped"] == 3
+    
+    def test_clean_matches_individual_steps(self):
+        """The fused lazy pipeline should match running each step in turn."""
+        df = pl.DataFrame({
+            "country": [" USA", "United States", "Peru", "Peru", "Peru"],
+            "year": [2001, 2001, 2000, 2002, 2002],
+            "threshold": [30, 12, 30, 30, 30],
+            "tree_cover_loss_ha": [-1.0, 20.0, 5.0, 3.0, 3.0],
+            "extent_2000_ha": [10.0, 10.0, 10.0, 1.0, 1.0],
+        })
+        keys = ["country", "year", "threshold"]
+        
+        stepwise = DataCleaner()
+        expected = stepwise.clean_country_names(df)
+        expected = stepwise.fix_negative_values(expected, ["tree_cover_loss_ha"])
+        expected = stepwise.cap_impossible_values(expected)
+        expected = stepwise.validate_thresholds(expected)
+        expected = stepwise.validate_years(expected)
+        expected = stepwise.remove_duplicates(expected, keys)
+        
+        fused = DataCleaner()
+        result = fused.clean(df, negative_columns=["tree_cover_loss_ha"], deduplicate_on=keys)
+        
+        assert result.equals(expected)
+        assert fused.get_cleaning_summary() == stepwise.get_cleaning_summary()
+    
+    def test_finalize_filters_years_then_deduplicates(self):
+        """finalize should match validate_years followed by remove_duplicates."""
+        df = pl.DataFrame({
+            "country": ["Peru", "Peru", "Peru", "Chile"],
+            "year": [2000, 2002, 2002, 2030],
+            "value": [1.0, 2.0, 3.0, 4.0],
+        })
+        
+        cleaner = DataCleaner()
+        result = cleaner.finalize(df, subset=["country", "year"])
+        
+        assert result.rows() == [("Peru", 2002, 2.0)]
+        assert cleaner.get_cleaning_summary()["duplicates_removed"] == 1
 
 
 class TestDataValidator:
@@ -0,0 +1,105 @@
+"""
+Unit tests for pipeline utility functions.
+"""
+import logging
+
+import polars as pl
+
+from nexus.data.pipeline import utils
+from nexus.data.pipeline.utils import (
+    create_summary_statistics,
+    log_dataframe_info,
+    numeric_columns,
+    save_results,
+    timer,
+)
+
+
+def test_log_dataframe_info(caplog):
+    """Types and per-column null counts should be logged."""
+    df = pl.DataFrame({
+        "country": ["Brazil", None, "Peru"],
+        "year": [2001, 2002, 2003],
+        "value": [1.0, None, None],
+    })
+
+    with caplog.at_level(logging.INFO, logger="nexus.data.pipeline.utils"):
+        log_dataframe_info(df, "facts")
+
+    assert "Column types: {'String': 1, 'Int64': 1, 'Float64': 1}" in caplog.text
+    assert "Columns with nulls: 2/3" in caplog.text
+    assert "country: 1 nulls" in caplog.text
+    assert "value: 2 nulls" in caplog.text
+
+
+def test_log_dataframe_info_disabled(caplog, monkeypatch):
+    """Below INFO the frame is not inspected at all."""
+    def fail(*args, **kwargs):
+        raise AssertionError("frame inspected while INFO is disabled")
+
+    monkeypatch.setattr(pl.DataFrame, "null_count", fail)
+    monkeypatch.setattr(pl.DataFrame, "estimated_size", fail)
+
+    with caplog.at_level(logging.WARNING, logger="nexus.data.pipeline.utils"):
+        log_dataframe_info(pl.DataFrame({"year": [2001]}), "facts")
+
+    assert caplog.records == []
+
+
+def test_create_summary_statistics():
+    """Summary should cover dtypes, nulls and numeric ranges."""
+    df = pl.DataFrame({
+        "country": ["Brazil", None, "Peru"],
+        "year": [2001, 2002, 2003],
+        "value": [1.0, None, 3.0],
+        "empty": pl.Series([None, None, None], dtype=pl.Float64),
+    })
+
+    stats = create_summary_statistics(df)
+
+    assert stats["row_count"] == 3
+    assert stats["columns"] == ["country", "year", "value", "empty"]
+    assert stats["null_counts"] == {"country": 1, "value": 1, "empty": 3}
+    assert stats["numeric_summary"]["value"] == {"min": 1.0, "max": 3.0, "mean": 2.0, "nulls": 1}
+    assert stats["numeric_summary"]["year"]["mean"] == 2002.0
+    assert "empty" not in stats["numeric_summary"]
+
+
+def test_numeric_columns():
+    """Only the numeric dtypes used by the pipeline are selected, in column order."""
+    schema = pl.Schema({
+        "country": pl.String,
+        "tree_cover_loss_ha": pl.Float32,
+        "year": pl.Int32,
+        "flag": pl.Boolean,
+        "extent_2000_ha": pl.Float64,
+    })
+
+    assert numeric_columns(schema) == ["tree_cover_loss_ha", "year", "extent_2000_ha"]
+
+
+def test_timer(caplog):
+    """The wrapped function's result is returned and its duration logged."""
+    @timer
+    def load(n):
+        return n * 2
+
+    with caplog.at_level(logging.INFO, logger="nexus.data.pipeline.utils"):
+        assert load(21) == 42
+
+    assert caplog.records[-1].getMessage() == "load took 0.00 seconds"
+
+
+def test_save_results_streams_large_frames(tmp_path, monkeypatch):
+    """Frames above the streaming threshold are sunk and read back unchanged."""
+    df = pl.DataFrame({"year": [2001, 2002, 2003], "value": [1.0, None, 3.0]})
+    monkeypatch.setattr(utils, "STREAMING_WRITE_ROWS", 2)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("large frame written in one buffer")
+
+    monkeypatch.setattr(pl.DataFrame, "write_parquet", fail)
+
+    save_results(df, tmp_path / "out" / "facts.parquet", row_group_size=2)
+
+    assert pl.read_parquet(tmp_path / "out" / "facts.parquet").equals(df)
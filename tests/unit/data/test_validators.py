@@ -93,6 +93,46 @@ class TestDataValidatorTreeCover:
         neg_errors = [r for r in results if "Negative values" in r.message]
         assert len(neg_errors) > 0
         assert neg_errors[0].severity == "error"
+    
+    def test_check_negative_values(self):
+        """Nulls are ignored and net flux / removals may be negative."""
+        df = pl.DataFrame({
+            'tree_cover_loss_ha': [None, 5.0],
+            'extent_2000_ha': [-1.0, None],
+            'carbon_net_flux_annual_avg': [-3.0, 2.0],
+        })
+        
+        validator = DataValidator()
+        columns = ['tree_cover_loss_ha', 'extent_2000_ha', 'carbon_net_flux_annual_avg', 'missing']
+        
+        assert validator.check_negative_values(df, columns) == ['extent_2000_ha']
+    
+    def test_check_data_completeness(self):
+        """Only nulls in numeric columns count against completeness."""
+        df = pl.DataFrame({
+            'country': [None, 'Peru'],
+            'tree_cover_loss_ha': [1.0, None],
+            'year': [2001, 2002],
+        })
+        
+        validator = DataValidator()
+        
+        assert validator.check_data_completeness(df) == 0.75
+        assert validator.check_data_completeness(df.select('country')) == 1.0
+    
+    def test_validate_year_columns(self):
+        """Years are read from column names; numbers outside 2000-2030 are ignored."""
+        df = pl.DataFrame({
+            'tc_loss_ha_2001': [1.0],
+            'tc_loss_ha_2002': [1.0],
+            'extent_1990_ha': [1.0],
+        })
+        
+        validator = DataValidator()
+        
+        assert validator.validate_year_columns(df, 2001, 2002)
+        assert not validator.validate_year_columns(df, 2001, 2003)
+        assert not validator.validate_year_columns(df, 1990, 1990)
 
 
 class TestDataValidatorPrimaryForest:
@@ -194,6 +234,20 @@ class TestDataValidatorCarbon:
         threshold_errors = [r for r in results if "Carbon thresholds should be" in r.message]
         assert len(threshold_errors) > 0
         assert threshold_errors[0].severity == "error"
+    
+    def test_validate_carbon_substituted_threshold(self):
+        """Three distinct thresholds are not enough if one is not a carbon threshold."""
+        df = pl.DataFrame({
+            'country': ['Brazil'] * 3,
+            'year': [2021] * 3,
+            'threshold': [30, 40, None],
+            'carbon_emissions_mg_co2e': [100, 90, 80]
+        })
+        
+        results = DataValidator().validate_carbon(df)
+        
+        threshold_errors = [r for r in results if "Carbon thresholds should be" in r.message]
+        assert threshold_errors[0].details["found_thresholds"] == [None, 30, 40]
 
 
 class TestDataValidatorRelationships:
@@ -277,4 +331,39 @@ def test_validate_all():
     
     # Check if any errors (determines success)
     has_errors = any(r.severity == "error" for r in results)
-    assert success == (not has_errors)
\ No newline at end of file
+    assert success == (not has_errors)
+
+def test_validate_all_matches_individual_checks():
+    """Batched validation should give the same results as the per-dataset validators."""
+    tree_cover = pl.DataFrame({
+        'country': ['Brazil', 'Peru'],
+        'year': [2001, 2024],
+        'threshold': [30, 40],
+        'tree_cover_loss_ha': [100.0, -5.0],
+        'extent_2000_ha': [1000.0, None]
+    })
+    primary = pl.DataFrame({
+        'country': ['Brazil', 'Canada'],
+        'year': [2002, 2023],
+        'threshold': [30, 30],
+        'primary_forest_loss_ha': [50.0, 10.0]
+    })
+    carbon = pl.DataFrame({
+        'country': ['Brazil', 'Brazil', 'Brazil'],
+        'year': [2021, 2021, 2021],
+        'threshold': [30, 50, 75],
+        'carbon_emissions_mg_co2e': [100.0, 90.0, 80.0],
+        'carbon_net_flux_annual_avg': [-1.0, 2.0, -3.0]
+    })
+    
+    _, batched = DataValidator().validate_all(tree_cover, primary, carbon)
+    
+    validator = DataValidator()
+    individual = (
+        validator.validate_tree_cover(tree_cover)
+        + validator.validate_primary_forest(primary)
+        + validator.validate_carbon(carbon)
+    )
+    
+    assert [(r.severity, r.message) for r in batched] == [(r.severity, r.message) for r in individual]
+    assert any("carbon sinks" in r.message for r in batched)
@@ -0,0 +1,166 @@
+"""
+Unit tests for the database view manager.
+"""
+import sqlite3
+
+import pytest
+
+from nexus.data.database.schema import SchemaManager
+from nexus.data.database.views import MATERIALIZED_VIEWS, ViewManager
+
+
+@pytest.fixture
+def view_manager(temp_db_path):
+    """Create a populated database and a view manager for it."""
+    SchemaManager(temp_db_path).create_all_tables()
+
+    conn = sqlite3.connect(temp_db_path)
+    conn.executemany(
+        "INSERT INTO fact_tree_cover_loss (country, year, threshold, tree_cover_loss_ha) VALUES (?, ?, ?, ?)",
+        [("Brazil", year, 30, 1000.0 + year) for year in range(2001, 2010)]
+        + [("Peru", 2001, 30, 500.0), ("Peru", 2002, 30, 400.0)],
+    )
+    conn.executemany(
+        "INSERT INTO fact_carbon (country, year, threshold, carbon_emissions_mg_co2e) VALUES (?, ?, ?, ?)",
+        [("Brazil", 2001, 30, 50.0), ("Peru", 2001, 30, 70.0), ("Peru", 2002, 30, 10.0)],
+    )
+    conn.execute(
+        "INSERT INTO fact_primary_forest (country, year, primary_forest_loss_ha) VALUES ('Brazil', 2002, 300.0)"
+    )
+    conn.commit()
+    conn.close()
+
+    return ViewManager(temp_db_path)
+
+
+class TestMaterializedViews:
+    """Test materialized aggregate views."""
+
+    def test_materialized_matches_plain_views(self, view_manager):
+        """Materialized views should return the same rows as the live queries."""
+        view_manager.create_all_views()
+        expected = {
+            view: sorted(tuple(row.values()) for row in view_manager.query_view(view))
+            for view in MATERIALIZED_VIEWS
+        }
+
+        view_manager.refresh_materialized_views()
+
+        for view, rows in expected.items():
+            assert sorted(tuple(row.values()) for row in view_manager.query_view(view)) == rows
+
+    def test_refresh_creates_backing_tables(self, view_manager, temp_db_path):
+        """Refreshing should create indexed mv_* tables behind the v_* names."""
+        view_manager.refresh_materialized_views()
+
+        conn = sqlite3.connect(temp_db_path)
+        try:
+            objects = dict(conn.execute("SELECT name, type FROM sqlite_master"))
+        finally:
+            conn.close()
+
+        assert objects["mv_country_summary"] == "table"
+        assert objects["mv_trend_analysis_country_year"] == "index"
+        assert objects["v_top_emitters"] == "view"
+
+    def test_drop_all_views_removes_backing_tables(self, view_manager):
+        """Dropping views should also drop their materialized tables."""
+        view_manager.refresh_materialized_views()
+        view_manager.drop_all_views()
+
+        assert view_manager.list_views() == []
+        with pytest.raises(sqlite3.OperationalError):
+            view_manager.query_view("v_country_summary")
+
+
+class TestQueryView:
+    """Test reading view results."""
+
+    def test_columnar_matches_rows(self, view_manager):
+        """Columnar output should hold the same values as the row dicts."""
+        view_manager.create_all_views()
+
+        rows = view_manager.query_view("v_annual_summary")
+        columns = view_manager.query_view("v_annual_summary", columnar=True)
+
+        assert list(columns) == list(rows[0])
+        assert columns["year"] == [row["year"] for row in rows]
+
+    def test_columnar_empty_result(self, view_manager, temp_db_path):
+        """Empty results still list every column."""
+        view_manager.create_all_views()
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("DELETE FROM fact_carbon")
+        conn.commit()
+        conn.close()
+
+        columns = view_manager.query_view("v_carbon_intensity", columnar=True)
+        assert columns["country"] == []
+        assert columns["carbon_role"] == []
+
+    def test_limit(self, view_manager):
+        """Limits are applied, including a limit of zero."""
+        view_manager.create_all_views()
+
+        assert len(view_manager.query_view("v_trend_analysis", limit=3)) == 3
+        assert view_manager.query_view("v_trend_analysis", limit=0) == []
+
+    def test_rejects_unknown_view(self, view_manager):
+        """Only managed views can be queried."""
+        for name in ["fact_carbon", "v_annual_summary; DROP TABLE fact_carbon"]:
+            with pytest.raises(ValueError):
+                view_manager.query_view(name)
+
+
+class TestConnectionPooling:
+    """Test connection reuse."""
+
+    def test_connection_reused_until_closed(self, view_manager):
+        """Calls on one thread share a connection until close()."""
+        first = view_manager._get_conn()
+        view_manager.list_views()
+        assert view_manager._get_conn() is first
+
+        view_manager.close()
+        assert view_manager._get_conn() is not first
+
+
+class TestIntensityViews:
+    """Test the combined intensity view and its wrappers."""
+
+    def test_wrappers_keep_original_rows(self, view_manager):
+        """Wrapper views should keep their original filters and join semantics."""
+        view_manager.create_all_views()
+
+        combined = view_manager.query_view("v_intensity")
+        carbon = view_manager.query_view("v_carbon_intensity")
+        primary = view_manager.query_view("v_primary_forest_percentage")
+
+        assert len(combined) == 11
+        assert len(primary) == 11
+        assert sorted((row["country"], row["year"]) for row in carbon) == [
+            ("Brazil", 2001), ("Peru", 2001), ("Peru", 2002)
+        ]
+        brazil_2002 = next(row for row in primary if row["country"] == "Brazil" and row["year"] == 2002)
+        assert brazil_2002["primary_percentage"] == round(300.0 / 3002.0 * 100, 2)
+        assert brazil_2002["loss_type"] == "Both"
+
+
+class TestTrendAnalysis:
+    """Test year-over-year trend calculations."""
+
+    def test_previous_and_five_year_values(self, view_manager):
+        """Lagged values come from the previous year and five years earlier."""
+        view_manager.create_all_views()
+
+        rows = {
+            (row["country"], row["year"]): row
+            for row in view_manager.query_view("v_trend_analysis")
+        }
+
+        brazil_2009 = rows[("Brazil", 2009)]
+        assert brazil_2009["prev_year_loss"] == 3008.0
+        assert brazil_2009["five_year_ago_loss"] == 3004.0
+        assert rows[("Brazil", 2001)]["prev_year_loss"] is None
+        assert rows[("Peru", 2002)]["yoy_change_percent"] == -20.0
+        assert rows[("Peru", 2002)]["trend_direction"] == "Decreasing"
@@ -0,0 +1,166 @@
+"""
+Unit tests for the parameterized query executor.
+"""
+import gc
+import sqlite3
+import weakref
+
+import pytest
+
+from nexus.data.database.query_executor import QueryExecutor
+
+
+@pytest.fixture
+def executor(temp_db_path):
+    """Create a small fact database and an executor pointing at it."""
+    conn = sqlite3.connect(temp_db_path)
+    conn.executescript("""
+        CREATE TABLE fact_tree_cover_loss (
+            country TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            threshold INTEGER NOT NULL,
+            tree_cover_loss_ha REAL,
+            PRIMARY KEY (country, year, threshold)
+        );
+
+        INSERT INTO fact_tree_cover_loss VALUES
+            ('Brazil', 2022, 30, 900.0),
+            ('Brazil', 2023, 30, 1000.0),
+            ('Indonesia', 2023, 30, 500.0);
+    """)
+    conn.commit()
+    conn.close()
+
+    return QueryExecutor(temp_db_path)
+
+
+class TestExecuteQuery:
+    """Test query execution."""
+
+    def test_rows_support_column_access(self, executor):
+        """Rows should be indexable by column name and convertible to dicts."""
+        results = executor.execute_query(
+            "SELECT country, year FROM fact_tree_cover_loss WHERE country = ? ORDER BY year",
+            ("Brazil",)
+        )
+
+        assert len(results) == 2
+        assert results[0]["year"] == 2022
+        assert dict(results[1]) == {"country": "Brazil", "year": 2023}
+
+    def test_table_stats(self, executor):
+        """Table statistics should be returned as a plain dictionary."""
+        stats = executor.get_table_stats("fact_tree_cover_loss")
+        assert stats == {"row_count": 3, "unique_countries": 2, "unique_years": 2}
+
+    def test_table_stats_rejects_unknown_table(self, executor):
+        """Only whitelisted tables can be inspected."""
+        with pytest.raises(ValueError):
+            executor.get_table_stats("sqlite_master")
+
+
+class TestBuildWhereClause:
+    """Test WHERE clause construction."""
+
+    def test_builds_parameterized_clause(self, executor):
+        """Scalars, lists and None should map to =, IN and IS NULL."""
+        where, params = executor.build_where_clause({
+            "country": ["Brazil", "Peru"],
+            "year": 2023,
+            "threshold": None,
+        })
+
+        assert where == "WHERE country IN (?,?) AND year = ? AND threshold IS NULL"
+        assert params == ("Brazil", "Peru", 2023)
+
+    def test_rejects_invalid_column(self, executor):
+        """Column names with SQL syntax should be rejected."""
+        for column in ["year; DROP TABLE x", "year\n", "1year", ""]:
+            with pytest.raises(ValueError):
+                executor.build_where_clause({column: 1})
+
+
+class TestConnectionModes:
+    """Test read-only and writable connections."""
+
+    def test_readonly_rejects_writes(self, executor):
+        """Read-only queries must not be able to modify the database."""
+        with pytest.raises(sqlite3.OperationalError):
+            executor.execute_query("DELETE FROM fact_tree_cover_loss")
+
+        assert executor.get_table_stats("fact_tree_cover_loss")["row_count"] == 3
+
+    def test_transaction_can_write(self, executor):
+        """Transactions open a writable connection."""
+        executor.execute_transaction([
+            ("INSERT INTO fact_tree_cover_loss VALUES (?, ?, ?, ?)", ("Peru", 2023, 30, 600.0)),
+        ])
+
+        assert executor.get_table_stats("fact_tree_cover_loss")["row_count"] == 4
+
+    def test_connection_reused_within_thread(self, executor):
+        """Repeated queries on one thread should share a connection."""
+        with executor.get_connection() as first:
+            pass
+        with executor.get_connection() as second:
+            pass
+
+        assert first is second
+        executor.close()
+
+        with executor.get_connection() as reopened:
+            assert reopened is not first
+
+    def test_discarded_executor_is_collected(self, temp_db_path, executor):
+        """Exit cleanup must not keep executors alive once they are dropped."""
+        other = QueryExecutor(temp_db_path)
+        other.execute_query("SELECT 1")
+        ref = weakref.ref(other)
+
+        del other
+        gc.collect()
+
+        assert ref() is None
+
+
+class TestBatchedQuery:
+    """Test streaming results in batches."""
+
+    def test_iter_batches(self, executor):
+        """Batched results should match the eager result."""
+        sql = "SELECT country, year FROM fact_tree_cover_loss ORDER BY country, year"
+
+        batches = list(executor.execute_query(sql, iter_batches=True, batch_size=2))
+
+        assert [len(batch) for batch in batches] == [2, 1]
+        assert [dict(row) for batch in batches for row in batch] == [
+            dict(row) for row in executor.execute_query(sql)
+        ]
+
+
+class TestTransactions:
+    """Test transactional writes."""
+
+    def test_grouped_operations_keep_order(self, executor):
+        """Repeated statements are batched without reordering operations."""
+        insert = "INSERT INTO fact_tree_cover_loss VALUES (?, ?, ?, ?)"
+        executor.execute_transaction([
+            (insert, ("Peru", 2022, 30, 600.0)),
+            (insert, ("Peru", 2023, 30, 650.0)),
+            ("DELETE FROM fact_tree_cover_loss WHERE country = ?", ("Brazil",)),
+            (insert, ("Brazil", 2024, 30, 700.0)),
+        ])
+
+        stats = executor.get_table_stats("fact_tree_cover_loss")
+        assert stats["row_count"] == 4
+
+    def test_failure_rolls_back(self, executor):
+        """A failing operation should undo the whole batch."""
+        insert = "INSERT INTO fact_tree_cover_loss VALUES (?, ?, ?, ?)"
+        with pytest.raises(sqlite3.IntegrityError):
+            executor.execute_transaction([
+                (insert, ("Peru", 2022, 30, 600.0)),
+                (insert, ("Brazil", 2023, 30, 1.0)),
+            ])
+
+        assert executor.get_table_stats("fact_tree_cover_loss")["row_count"] == 3
@@ -0,0 +1,36 @@
+# Copyright 2025 Daniel Berhane Araya
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Generate the prebuilt schema script shipped with nexus.data.database.
+
+Run (python tools/build_schema_sql.py) after editing the schema definitions
+and commit the result; tests/unit/data/test_schema.py fails while the
+committed file is out of date.
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+OUTPUT = ROOT / "src" / "nexus" / "data" / "database" / "_schema.sql"
+
+
+def build_schema_sql(output: Path = OUTPUT) -> Path:
+    """
+    Render the schema DDL and write it next to schema.py.
+    
+    Args:
+        output: Destination file
+        
+    Returns:
+        Path of the written file
+    """
+    sys.path.insert(0, str(ROOT / "src"))
+    from nexus.data.database.schema import render_schema_sql
+    
+    output.write_text(render_schema_sql())
+    return output
+
+
+if __name__ == "__main__":
+    print(f"Wrote {build_schema_sql()}")